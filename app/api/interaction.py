@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Path, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Path, Query, UploadFile, File, Form, HTTPException, Header, WebSocket, WebSocketDisconnect
+from typing import Optional
 from app.api.schemas import ChatRequestBody
 from app.services.redis_service import redis_service
 from app.services.mongo import mongo_service
 from app.services.orchestrator import orchestrator_service
+from app.services.status_fanout import status_fanout, stream_id_key
+from app.services.embedding import embedding_service
 from sse_starlette.sse import EventSourceResponse
 from app.services.prompts import get_filler_prompt
-from app.services.blob_storage_uploader_service import blob_storage_uploader_service
+from app.services.blob_storage_uploader_service import blob_storage_uploader_service, ALLOWED_UPLOAD_CONTENT_TYPES
+from app.core.config import settings
 import json
 import logging
 import asyncio
@@ -24,7 +28,20 @@ async def chat_request(
     """
     Initiate a chat request via Orchestrator.
     """
-    request_id = await orchestrator_service.handle_request(
+    request_id = await _start_chat(body, user_id)
+    
+    response = {"status": "accepted", "request_id": request_id}
+    
+    if body.fillers:
+        filler_msg = await _generate_filler(body, user_id)
+        if filler_msg:
+            response["filler"] = filler_msg
+            
+    return response
+
+
+async def _start_chat(body: ChatRequestBody, user_id: str) -> str:
+    return await orchestrator_service.handle_request(
         user_id, 
         body.message, 
         body.session_id, 
@@ -35,26 +52,24 @@ async def chat_request(
         body.selected_filters,
         body.image_url
     )
+
+
+async def _generate_filler(body: ChatRequestBody, user_id: str) -> Optional[str]:
+    history = await orchestrator_service.get_history(user_id, body.session_id)
+    session_summary = await redis_service.get_session_summary(user_id, body.session_id)
     
-    response = {"status": "accepted", "request_id": request_id}
+    summary_text = session_summary.model_dump_json() if session_summary else "No summary available."
     
-    if body.fillers:
-        history = await orchestrator_service.get_history(user_id, body.session_id)
-        session_summary = await redis_service.get_session_summary(user_id, body.session_id)
-        
-        summary_text = session_summary.model_dump_json() if session_summary else "No summary available."
-        
-        prompt = get_filler_prompt(history, body.message, summary_text)
-        
-        try:
-            filler_msg = await asyncio.to_thread(call_openai, prompt)
-            if filler_msg:
-                response["filler"] = filler_msg
-                logger.info(f"Generated filler: {filler_msg}")
-        except Exception as e:
-            logger.error(f"Failed to generate filler: {e}")
-            
-    return response
+    prompt = get_filler_prompt(history, body.message, summary_text)
+    
+    try:
+        filler_msg = await asyncio.to_thread(call_openai, prompt)
+        if filler_msg:
+            logger.info(f"Generated filler: {filler_msg}")
+        return filler_msg
+    except Exception as e:
+        logger.error(f"Failed to generate filler: {e}")
+        return None
 
     return response
 
@@ -73,12 +88,25 @@ async def chat_request_with_image(
         
         # Handle file upload if present
         if file:
-            content = await file.read()
-            url = blob_storage_uploader_service.upload_file(
-                content, 
-                file.filename, 
-                file.content_type
+            # Read once (bounded), then upload and embed the same buffer concurrently
+            content = await _read_upload(file, settings.MAX_IMAGE_BYTES)
+            url, embedding = await asyncio.gather(
+                blob_storage_uploader_service.upload_file_async(
+                    content,
+                    file.filename,
+                    file.content_type
+                ),
+                embedding_service.get_embedding(content),
+                return_exceptions=True
             )
+            if isinstance(url, Exception):
+                logger.error(f"Image upload raised: {url}")
+                url = None
+            if url and not isinstance(embedding, Exception):
+                await redis_service.save_image_embedding(url, embedding, ttl=settings.IMAGE_EMBEDDING_TTL)
+            elif isinstance(embedding, Exception):
+                # The search endpoint will retry from the URL and surface the error
+                logger.warning(f"Could not embed uploaded image: {embedding}")
             if url:
                 chat_body.image_url = url
                 logger.info(f"Uploaded image to {url}")
@@ -91,35 +119,248 @@ async def chat_request_with_image(
         # Reuse existing logic
         return await chat_request(chat_body, user_id)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error in chat_request_with_image: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """Read an UploadFile in blob-block sized chunks, rejecting it with 413 past `max_bytes`."""
+    content = bytearray()
+    while True:
+        chunk = await file.read(settings.BLOB_UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        content.extend(chunk)
+        if len(content) > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Image exceeds {max_bytes} bytes")
+    return bytes(content)
+
+
+@router.post("/{user_id}/request/image/upload_url", tags=["chat interaction"])
+async def get_image_upload_url(
+    user_id: str = Path(..., title="The ID of the user"),
+    content_type: str = Query("image/jpeg", description="Content type of the image to upload")
+):
+    """
+    Get a short-lived SAS URL to upload a chat image straight to blob storage.
+
+    PUT the file to `upload_url` with the returned headers, then send
+    `blob_url` as `image_url` on a regular chat request.
+    """
+    if content_type not in ALLOWED_UPLOAD_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported content type. Allowed: {', '.join(ALLOWED_UPLOAD_CONTENT_TYPES)}"
+        )
+    try:
+        return blob_storage_uploader_service.generate_upload_sas(content_type)
+    except Exception as e:
+        logger.exception(f"Error generating upload URL for {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate upload URL")
+
+
+def _is_final_event(msg: dict) -> bool:
+    """Last event of a request; speech answers end with their audio event instead."""
+    if msg.get("status") in ("AUDIO_READY", "AUDIO_FAILED"):
+        return True
+    if msg.get("final_answer") and not msg.get("audio_pending"):
+        return True
+    return bool(msg.get("error"))
+
+
+def _event_type(msg: dict) -> str:
+    if msg.get("status") == "AUDIO_FAILED":
+        return "audio_failed"
+    if "audio_segment" in msg:
+        return "audio_segment"
+    if "audio_clip" in msg or "audio_segments" in msg:
+        return "audio_ready"
+    if "delta" in msg:
+        return "delta"
+    return "message" if "step" in msg else "status"
+
+
+def _to_sse(msg: dict) -> dict:
+    event = {
+        "event": _event_type(msg),
+        "data": json.dumps(msg)
+    }
+    if msg.get("event_id"):
+        event["id"] = msg["event_id"]
+    return event
+
+
+async def stream_status_events(request_id: str, last_event_id: Optional[str] = None):
+    """
+    Yield a request's status events until the final one: first those already
+    in its status stream (after `last_event_id` if given), then live ones.
+    Shared by the SSE and WebSocket transports.
+    """
+    # Subscribe first so nothing published during the replay is lost
+    queue = await status_fanout.subscribe(request_id)
+    try:
+        last_seen = last_event_id
+        for msg in await redis_service.get_status_events(request_id, last_event_id):
+            last_seen = msg["event_id"]
+            yield msg
+            if _is_final_event(msg):
+                return
+
+        while True:
+            try:
+                msg = await asyncio.wait_for(queue.get(), timeout=settings.STATUS_STREAM_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                # The final event was lost (crashed job, failed publish); end the stream instead of hanging
+                logger.warning(f"Status stream for {request_id} idle for {settings.STATUS_STREAM_IDLE_TIMEOUT}s, closing")
+                yield {
+                    "request_id": request_id,
+                    "status": "STREAM_TIMEOUT",
+                    "error": "No status update received in time",
+                    "source": "orchestrator"
+                }
+                return
+
+            # Skip events already delivered by the replay
+            if last_seen and msg.get("event_id") and stream_id_key(msg["event_id"]) <= stream_id_key(last_seen):
+                continue
+            if msg.get("event_id"):
+                last_seen = msg["event_id"]
+
+            yield msg
+            if _is_final_event(msg):
+                break
+    finally:
+        status_fanout.unsubscribe(request_id, queue)
+
+
 @router.get("/status/{request_id}", tags=["chat interaction"])
 async def chat_status(
     request_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
 ):
     """
     Stream chat status and responses via SSE.
+    Events already emitted are replayed from the request's status stream,
+    starting after `Last-Event-ID` when the client reconnects.
     """
     async def event_generator():
-        async for msg in redis_service.listen(f"chat_status:{request_id}"):
-            if "step" in msg:
-                yield {
-                    "event": "message",
-                    "data": json.dumps(msg)
-                }
-            else:
-                yield {
-                    "event": "status",
-                    "data": json.dumps(msg)
-                }
-                if msg.get("final_answer") or msg.get("error"):
-                    break
+        async for msg in stream_status_events(request_id, last_event_id):
+            yield _to_sse(msg)
 
     return EventSourceResponse(event_generator())
 
+
+@router.websocket("/ws/{user_id}")
+async def chat_websocket(websocket: WebSocket, user_id: str):
+    """
+    Multiplexed chat over one WebSocket connection.
+
+    Client frames (JSON):
+      {"type": "chat", "body": {...ChatRequestBody...}, "client_ref": "..."}
+      {"type": "resume", "request_id": "...", "last_event_id": "..."}
+      {"type": "ping"}
+
+    Server frames (JSON), interleaved across requests and keyed by request_id:
+      {"type": "accepted", "request_id": "...", "client_ref": "..."}
+      {"type": "filler", "request_id": "...", "client_ref": "...", "filler": "..."}
+      {"type": "event", "event": "status" | "delta" | "message" | "audio_segment" | "audio_ready" | "audio_failed", "request_id": "...", "event_id": "...", "data": {...}}
+      {"type": "error", "client_ref": "...", "detail": "..."}
+      {"type": "pong"}
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    forwarders: dict[str, asyncio.Task] = {}
+    filler_tasks: set[asyncio.Task] = set()
+
+    async def send(payload: dict):
+        # Forwarder tasks share the socket, so sends must not interleave
+        async with send_lock:
+            await websocket.send_text(json.dumps(payload, default=str))
+
+    async def forward(request_id: str, last_event_id: Optional[str] = None):
+        try:
+            async for msg in stream_status_events(request_id, last_event_id):
+                await send({
+                    "type": "event",
+                    "event": _event_type(msg),
+                    "request_id": request_id,
+                    "event_id": msg.get("event_id"),
+                    "data": msg
+                })
+        except (WebSocketDisconnect, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            logger.error(f"WebSocket forwarder error for {request_id}: {e}")
+        finally:
+            # A resume may already have replaced this task under the same request_id
+            if forwarders.get(request_id) is asyncio.current_task():
+                forwarders.pop(request_id, None)
+
+    async def send_filler(body: ChatRequestBody, request_id: str, client_ref: Optional[str]):
+        try:
+            filler_msg = await _generate_filler(body, user_id)
+            if filler_msg:
+                await send({"type": "filler", "request_id": request_id, "client_ref": client_ref, "filler": filler_msg})
+        except (WebSocketDisconnect, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            logger.error(f"WebSocket filler error for {request_id}: {e}")
+
+    def start_forwarder(request_id: str, last_event_id: Optional[str] = None):
+        previous = forwarders.pop(request_id, None)
+        if previous:
+            previous.cancel()
+        forwarders[request_id] = asyncio.create_task(forward(request_id, last_event_id))
+
+    try:
+        while True:
+            try:
+                frame = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                await send({"type": "error", "detail": "Invalid JSON frame"})
+                continue
+            if not isinstance(frame, dict):
+                await send({"type": "error", "detail": "Frame must be a JSON object"})
+                continue
+
+            frame_type = frame.get("type")
+            client_ref = frame.get("client_ref")
+
+            if frame_type == "chat":
+                try:
+                    body = ChatRequestBody.model_validate(frame.get("body") or {})
+                    request_id = await _start_chat(body, user_id)
+                except Exception as e:
+                    await send({"type": "error", "client_ref": client_ref, "detail": str(e)})
+                    continue
+
+                await send({"type": "accepted", "status": "accepted", "request_id": request_id, "client_ref": client_ref})
+                # The stream replay covers events emitted before the forwarder subscribes
+                start_forwarder(request_id)
+                if body.fillers:
+                    # The filler is an LLM call; run it aside so the receive loop keeps serving frames
+                    task = asyncio.create_task(send_filler(body, request_id, client_ref))
+                    filler_tasks.add(task)
+                    task.add_done_callback(filler_tasks.discard)
+
+            elif frame_type == "resume" and frame.get("request_id"):
+                start_forwarder(frame["request_id"], frame.get("last_event_id"))
+
+            elif frame_type == "ping":
+                await send({"type": "pong"})
+
+            else:
+                await send({"type": "error", "client_ref": client_ref, "detail": f"Unknown frame type: {frame_type}"})
+
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket closed for user {user_id}")
+    finally:
+        for task in [*forwarders.values(), *filler_tasks]:
+            task.cancel()
+
 @router.get("/{user_id}/request/{request_id}", tags=["chat interaction"])
 async def get_chat_request_logs(
     request_id: str,
@@ -128,6 +369,11 @@ async def get_chat_request_logs(
     """
     Get the logs and details of a specific chat request from MongoDB.
     """
+    # In-flight requests are answered from the status stream without touching Mongo
+    last_event = await redis_service.get_last_status_event(request_id)
+    if last_event and not (last_event.get("final_answer") or _is_final_event(last_event)):
+        return {"status": "pending", "complete": False, "last_status": last_event.get("status")}
+
     log = await mongo_service.get_chat_log(user_id, request_id)
     if not log:
         return {"status": "pending", "complete": False}
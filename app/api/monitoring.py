@@ -1,5 +1,15 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from app.core.tracing import tracer
+from fastapi.responses import PlainTextResponse
 from app.services.metrics_service import metrics_service
+from app.services.orchestrator import orchestrator_service
+from app.services.status_fanout import status_fanout
+from app.services.audio_pipeline_service import audio_pipeline_service
+from app.utils.cache_persona import cache_persona
+from app.utils.person_profile_cache import person_profile_cache
+from app.api.profiles import search_single_flight
+from app.utils.search_cache import search_result_cache
 import asyncio
 
 router = APIRouter()
@@ -10,3 +20,83 @@ async def get_metrics():
     Get current application metrics snapshot.
     """
     return metrics_service.get_metrics_snapshot()
+
+@router.get("/prometheus", tags=["monitoring"], response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """
+    Counters, gauges and histograms in Prometheus text exposition format.
+    """
+    return PlainTextResponse(
+        metrics_service.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@router.get("/traces", tags=["monitoring"])
+async def get_traces(limit: int = 20, min_duration: float = 0.0, name: Optional[str] = None):
+    """
+    Get recent traces from the in-memory ring buffer, newest first.
+    Filter by root span name ("chat.request", "search.loopback") or minimum duration in seconds.
+    """
+    return {
+        "exported_total": tracer.traces_exported,
+        "dropped_total": tracer.traces_dropped,
+        "traces": tracer.get_traces(limit, min_duration, name)
+    }
+
+@router.get("/traces/{trace_id}", tags=["monitoring"])
+async def get_trace(trace_id: str):
+    """
+    Get one trace. Chat requests use their request_id as trace id.
+    """
+    trace = tracer.get_trace(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found (expired from the buffer or never recorded)")
+    return trace
+
+@router.get("/mcp", tags=["monitoring"])
+async def get_mcp_pool_stats():
+    """
+    Get MCP session pool health and per-session in-flight counts.
+    """
+    if not orchestrator_service._mcp_client:
+        return {"size": 0, "healthy": 0, "in_flight": 0, "sessions": []}
+    return orchestrator_service._mcp_client.get_pool_stats()
+
+@router.get("/status_streams", tags=["monitoring"])
+async def get_status_stream_stats():
+    """
+    Get shared status pub/sub connection count and per-request fan-out stats.
+    """
+    return status_fanout.get_stats()
+
+@router.get("/audio", tags=["monitoring"])
+async def get_audio_pipeline_stats():
+    """
+    Get background text-to-speech job counts.
+    """
+    return audio_pipeline_service.get_stats()
+
+@router.get("/persona_cache", tags=["monitoring"])
+async def get_persona_cache_stats():
+    """
+    Get persona cache size, tier hit counts and cross-replica invalidations.
+    """
+    return cache_persona.get_stats()
+
+@router.get("/person_profile_cache", tags=["monitoring"])
+async def get_person_profile_cache_stats():
+    """
+    Get connected-person profile near-cache hits, loads and refreshes.
+    """
+    return person_profile_cache.get_stats()
+
+
+@router.get("/search", tags=["monitoring"])
+async def get_search_stats():
+    """
+    Get profile search executions, coalesced duplicates and result cache hit rate.
+    """
+    return {
+        "single_flight": search_single_flight.get_stats(),
+        "result_cache": search_result_cache.get_stats(),
+    }
\ No newline at end of file
@@ -5,10 +5,17 @@ from app.services.mongo import mongo_service
 from app.services.redis_service import redis_service
 from app.services.embedding import embedding_service
 from app.utils.random_utils import generate_random_id
+from app.utils.person_profile_cache import person_profile_cache
+from app.utils.single_flight import SingleFlight, canonical_hash
+from app.utils.search_cache import search_result_cache
+from app.core.tracing import tracer
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Identical concurrent searches share one FT.SEARCH + Mongo hydration
+search_single_flight = SingleFlight()
+
 # Mapping from flat field name to MongoDB dot-notation path
 FIELD_MAPPING = {
     "gender": ["gender", "image_attributes.gender"], 
@@ -61,6 +68,7 @@ async def save_profile(
 
         # 3. Save/Index in Redis
         await redis_service.save_profile(user_id, profile.model_dump(mode='json'), profile.embeddings)
+        await search_result_cache.bump(user_id)
 
         logger.info(f"Successfully saved profile {profile.id} for user {user_id}")
         return {"status": "success", "id": profile.id, "message": "Profile saved and indexed."}
@@ -80,50 +88,103 @@ async def search_profiles(
     Search profiles.
     """
     try:
-        query_vector = None
-        if request.image_url:
-             query_vector = await embedding_service.get_embedding(request.image_url)
-
         logger.info("filters received")
         logger.info(request)
-        
-        results = await redis_service.search(
-            user_id=user_id,
-            query_vector=query_vector,
-            filters=request.filters,
-            geo_filter=request.geo_filter.model_dump() if request.geo_filter else None,
-            k=request.k,
-            page=request.page
-        )
-        
-        count = results.total
-        docs = results.docs
-        
-        results_list = []
-        projection = {
-            "_id": 1,
-            "customId": 1,
-            "image_url": 1,
-            "name": 1,
-            "gender": 1,
-            "tags": 1,
-            "address": 1,
-            "age": 1
-        }
-        
-        for doc in docs:
-            # fetch full profile from mongo
-            # trim id from redis
-            id = doc.id.split(":")[-1]
-            profile = await mongo_service.get_profile(user_id, id, projection)
-            if profile:
-                results_list.append(profile)
-        
-        return {"count": results.total, "docs": results_list}
+
+        # Usually called back over HTTP by the MCP search tool, so this starts its own trace
+        with tracer.trace("search.loopback", user_id=user_id, page=request.page, image=bool(request.image_url)):
+            query_hash = search_query_key(user_id, request)
+            version = await search_result_cache.get_version(user_id)
+
+            # Concurrent duplicates (retries, suggestion checks, same filter chip) share one run
+            return await search_single_flight.do(
+                f"{query_hash}:{version}",
+                lambda: _cached_search(user_id, request, query_hash, version)
+            )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def _canonical_filter_value(value):
+    # OR-lists match regardless of order
+    if isinstance(value, list) and all(isinstance(v, (str, int, float, bool)) for v in value):
+        return sorted(value, key=str)
+    return value
+
+
+def search_query_key(user_id: str, request: SearchRequest) -> str:
+    """
+    Canonical hash of everything that determines a search result.
+    The image embedding is keyed by its image URL.
+    """
+    filters = {
+        field: _canonical_filter_value(value)
+        for field, value in (request.filters or {}).items()
+        if value  # falsy filters are skipped by redis_service.search too
+    }
+    return canonical_hash({
+        "user_id": user_id,
+        "filters": filters,
+        "geo": request.geo_filter.model_dump() if request.geo_filter else None,
+        "image": request.image_url,
+        "k": request.k,
+        "page": request.page,
+    })
+
+
+async def _cached_search(user_id: str, request: SearchRequest, query_hash: str, version: int) -> dict:
+    cached = await search_result_cache.get(user_id, version, query_hash)
+    if cached is not None:
+        return cached
+
+    result = await _execute_search(user_id, request)
+    await search_result_cache.put(user_id, version, query_hash, result)
+    return result
+
+
+async def _execute_search(user_id: str, request: SearchRequest) -> dict:
+    query_vector = None
+    if request.image_url:
+        # Chat uploads are embedded from the uploaded bytes, reuse that vector
+        query_vector = await redis_service.get_image_embedding(request.image_url)
+        if query_vector is None:
+            query_vector = await embedding_service.get_embedding(request.image_url)
+
+    results = await redis_service.search(
+        user_id=user_id,
+        query_vector=query_vector,
+        filters=request.filters,
+        geo_filter=request.geo_filter.model_dump() if request.geo_filter else None,
+        k=request.k,
+        page=request.page
+    )
+    
+    count = results.total
+    docs = results.docs
+    
+    results_list = []
+    projection = {
+        "_id": 1,
+        "customId": 1,
+        "image_url": 1,
+        "name": 1,
+        "gender": 1,
+        "tags": 1,
+        "address": 1,
+        "age": 1
+    }
+    
+    for doc in docs:
+        # fetch full profile from mongo
+        # trim id from redis
+        id = doc.id.split(":")[-1]
+        profile = await mongo_service.get_profile(user_id, id, projection)
+        if profile:
+            results_list.append(profile)
+    
+    return {"count": results.total, "docs": results_list}
+
 @router.get("/{user_id}/search_by_name", tags=["profile search"])
 async def search_profiles_by_name(
     name: str,
@@ -219,6 +280,8 @@ async def delete_profile(
         
         # Delete from Redis
         redis_deleted = await redis_service.delete_doc(user_id, profile_id)
+        await person_profile_cache.invalidate(user_id, profile_id)
+        await search_result_cache.bump(user_id)
         
         if not mongo_deleted:
             raise HTTPException(status_code=404, detail="Profile not found in mongo")
@@ -243,6 +306,7 @@ async def delete_all_profiles(
     try:
         await mongo_service.delete_all(user_id)
         await redis_service.delete_index(user_id)
+        await search_result_cache.bump(user_id)
         return {"status": "deleted_all", "message": f"All data for user {user_id} deleted."}
     except Exception as e:
         logger.exception(f"Error deleting all profiles for user {user_id}: {e}")
@@ -264,6 +328,7 @@ async def update_profile(
              raise HTTPException(status_code=404, detail="Profile not found")
         
         await mongo_service.update_profile(user_id, profile_id, update_data)
+        await person_profile_cache.invalidate(user_id, profile_id)
         
         if "image_url" in update_data:
              # Logic to regen embedding
@@ -271,6 +336,7 @@ async def update_profile(
              update_data["embeddings"] = new_embedding
              
         await redis_service.save_profile(user_id, update_data, update_data.get("embeddings", existing.get("embeddings")))
+        await search_result_cache.bump(user_id)
         
         return {"status": "updated", "id": profile_id}
         
@@ -405,6 +471,7 @@ async def update_profile_attributes(
 
         # 2. Update Mongo
         await mongo_service.update_profile(user_id, profile_id, update_doc)
+        await person_profile_cache.invalidate(user_id, profile_id)
         
         # 3. Validation/Sync to Redis
         # Fetch updated document from Mongo to get the Full structure for Redis
@@ -428,6 +495,7 @@ async def update_profile_attributes(
              redis_profile_data["updated_at"] = redis_profile_data["updated_at"].isoformat()
         
         await redis_service.save_profile(user_id, redis_profile_data, embeddings)
+        await search_result_cache.bump(user_id)
         
         return {
             "status": "success", 
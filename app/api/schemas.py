@@ -127,6 +127,9 @@ class LLMRequest(BaseModel):
     json_response: Optional[bool] = False
     response_topic: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
+    # Set on dispatch, also sent as Kafka headers
+    dispatched_at: Optional[float] = None
+    trace_id: Optional[str] = None
 
 class LLMResponse(BaseModel):
     request_id: str
@@ -13,9 +13,35 @@ class Settings(BaseSettings):
     KAFKA_STATUS_TOPIC: str
     LOG_LEVEL: str
     MCP_SERVER_SCRIPT: str
+    MCP_POOL_SIZE: int = 4
+    MCP_HEALTH_CHECK_INTERVAL: float = 15.0
+    MCP_CALL_TIMEOUT: float = 30.0
+    STATUS_QUEUE_SIZE: int = 100
+    STATUS_STREAM_MAXLEN: int = 200
+    STATUS_STREAM_TTL: int = 3600
+    STATUS_STREAM_IDLE_TIMEOUT: float = 120.0
+    AUDIO_MAX_CONCURRENCY: int = 4
+    TTS_CACHE_TTL: int = 604800
+    PERSONA_CACHE_SIZE: int = 1000
+    PERSONA_CACHE_TTL: float = 300.0
+    PERSONA_REDIS_TTL: int = 3600
+    PERSON_PROFILE_CACHE_SIZE: int = 2000
+    PERSON_PROFILE_LOCAL_TTL: float = 30.0
+    PERSON_PROFILE_REDIS_TTL: int = 86400
+    SEARCH_CACHE_TTL: int = 300
+    # Off by default: when on, a span wraps every Redis and Mongo call and each request keeps a trace dict
+    TRACING_ENABLED: bool = False
+    TRACE_BUFFER_SIZE: int = 1000
+    TRACE_JSONL_PATH: str = ""
+    TTS_PROGRESSIVE: bool = True
+    TTS_SEGMENT_MAX_CHARS: int = 250
     ELEVEN_LABS_API_KEY: str
     AZURE_STORAGE_CONNECTION_STRING: str
     AZURE_STORAGE_CONTAINER_NAME: str
+    BLOB_UPLOAD_CHUNK_SIZE: int = 4 * 1024 * 1024
+    BLOB_SAS_TTL: int = 900
+    MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+    IMAGE_EMBEDDING_TTL: int = 3600
     AZURE_OPENAI_ENDPOINT : str
     AZURE_DEPLOYMENT : str
     AZURE_API_KEY : str
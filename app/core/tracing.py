@@ -0,0 +1,221 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start", "duration", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.monotonic()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start - self.trace.start, 6),
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    def __init__(self, trace_id: str, name: str):
+        self.trace_id = trace_id
+        self.name = name
+        self.start = time.monotonic()
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        root = self.spans[0] if self.spans else None
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration": root.duration if root else None,
+            "spans": [s.to_dict() for s in self.spans],
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    In-process tracing with contextvars propagation.
+
+    `trace()` opens a root span. `span()` opens a child of whatever span is
+    current in this task, and does nothing when there is none, so library
+    code can be instrumented unconditionally. Finished traces go to an
+    in-memory ring buffer (served by /monitoring/traces) and optionally to a
+    JSONL file. No external collector is needed.
+
+    JSONL lines are batched and appended from a worker thread, so file I/O
+    never runs on the event loop. At most `buffer_size` lines wait for the
+    writer; beyond that the oldest are dropped.
+    """
+
+    def __init__(self, enabled: bool = True, buffer_size: int = 1000, jsonl_path: Optional[str] = None):
+        self.enabled = enabled
+        self.jsonl_path = jsonl_path
+        self.buffer: deque = deque(maxlen=buffer_size)
+        self._pending_lines: deque = deque(maxlen=buffer_size)
+        self._writer: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.traces_exported: int = 0
+        self.traces_dropped: int = 0
+
+    @contextmanager
+    def trace(self, name: str, trace_id: Optional[str] = None, **attributes):
+        """Root span. Nested inside another trace, it acts as a plain child span."""
+        if not self.enabled:
+            yield None
+            return
+        if _current_span.get() is not None:
+            with self.span(name, **attributes) as s:
+                yield s
+            return
+
+        trace = Trace(trace_id or uuid.uuid4().hex, name)
+        try:
+            with self._run_span(trace, name, None, attributes) as s:
+                yield s
+        finally:
+            self._export(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = _current_span.get() if self.enabled else None
+        if parent is None:
+            yield None
+            return
+        with self._run_span(parent.trace, name, parent.span_id, attributes) as s:
+            yield s
+
+    @contextmanager
+    def _run_span(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        s = Span(trace, name, parent_id, attributes)
+        trace.spans.append(s)
+        token = _current_span.set(s)
+        try:
+            yield s
+        except BaseException as e:
+            s.error = repr(e)
+            raise
+        finally:
+            s.duration = time.monotonic() - s.start
+            _current_span.reset(token)
+
+    def current_trace_id(self) -> Optional[str]:
+        s = _current_span.get()
+        return s.trace.trace_id if s else None
+
+    def _export(self, trace: Trace):
+        data = trace.to_dict()
+        self.buffer.append(data)
+        self.traces_exported += 1
+        if not self.jsonl_path:
+            return
+
+        if len(self._pending_lines) == self._pending_lines.maxlen:
+            self.traces_dropped += 1
+        self._pending_lines.append(json.dumps(data, default=str) + "\n")
+        if self._writer is None or self._writer.done():
+            try:
+                self._writer = asyncio.get_running_loop().create_task(self._write_pending())
+            except RuntimeError:
+                # No loop (scripts, shutdown): write inline
+                self._write_lines(self._take_pending())
+
+    def _take_pending(self) -> List[str]:
+        lines = list(self._pending_lines)
+        self._pending_lines.clear()
+        return lines
+
+    async def _write_pending(self):
+        while self._pending_lines:
+            await asyncio.to_thread(self._write_lines, self._take_pending())
+
+    def _write_lines(self, lines: List[str]):
+        try:
+            with open(self.jsonl_path, "a") as f:
+                f.writelines(lines)
+        except OSError as e:
+            logger.error(f"Failed to write {len(lines)} traces to {self.jsonl_path}: {e}")
+
+    async def stop(self):
+        """Flush traces still waiting for the JSONL writer."""
+        if self._writer and not self._writer.done():
+            await self._writer
+        if self._pending_lines:
+            await asyncio.to_thread(self._write_lines, self._take_pending())
+
+    def get_traces(self, limit: int = 50, min_duration: float = 0.0, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        traces = [
+            t for t in reversed(self.buffer)
+            if (t["duration"] or 0) >= min_duration and (name is None or t["name"] == name)
+        ]
+        return traces[:limit]
+
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        for t in reversed(self.buffer):
+            if t["trace_id"] == trace_id:
+                return t
+        return None
+
+
+tracer = Tracer(
+    enabled=settings.TRACING_ENABLED,
+    buffer_size=settings.TRACE_BUFFER_SIZE,
+    jsonl_path=settings.TRACE_JSONL_PATH or None
+)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator: run an async function inside a child span."""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with tracer.span(span_name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_methods(prefix: str):
+    """Class decorator: wrap every public coroutine method in a `{prefix}.{method}` span."""
+    def decorator(cls):
+        for attr, fn in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.iscoroutinefunction(fn):
+                continue
+            setattr(cls, attr, traced(f"{prefix}.{attr}")(fn))
+        return cls
+    return decorator
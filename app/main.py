@@ -24,6 +24,11 @@ app.add_middleware(
 import logging
 from app.services.mongo import mongo_service
 from app.services.redis_service import redis_service
+from app.services.status_fanout import status_fanout
+from app.services.audio_pipeline_service import audio_pipeline_service
+from app.services.blob_storage_uploader_service import blob_storage_uploader_service
+from app.utils.cache_persona import cache_persona
+from app.core.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +54,7 @@ async def startup_event():
         await kafka_service.start()
         logger.info("✅ Kafka Producer Started")
         await orchestrator_service.start()
+        await cache_persona.start()
     except Exception as e:
         exit_check = True
         logger.error(f"❌ Kafka/Orchestrator Startup Failed: {e}")
@@ -63,6 +69,11 @@ async def shutdown_event():
     logger.info("Shutting down application...")
     await kafka_service.stop()
     await orchestrator_service.stop()
+    await status_fanout.stop()
+    await audio_pipeline_service.stop()
+    await cache_persona.stop()
+    await tracer.stop()
+    await blob_storage_uploader_service.close()
     await redis_service.close()
 
 app.include_router(router, prefix="/api/v1")
@@ -13,6 +13,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
 from app.services.celeb_search import get_celebrity_image_pipeline
+from app.utils.recommendation_store import RecommendationStore, RECOMMENDATIONS_PATH
 
 
 LOGGING_FORMAT = "[%(asctime)s] %(levelname)s %(name)s:%(lineno)d - %(message)s"
@@ -459,22 +460,30 @@ async def search_person_by_name(
 
 
 
-def load_recommendations():
-    """Load recommendations from the JSON file."""
-    try:
-        # Construct path relative to this file
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        json_path = os.path.join(current_dir, 'recommendations.json')
-        
-        if not os.path.exists(json_path):
-            logger.error(f"Recommendations file not found at: {json_path}")
-            return {}
-            
-        with open(json_path, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading recommendations: {e}")
-        return {}
+RECOMMENDATION_INSTRUCTION = """You are a Recommendation Agent.
+                    Your task is to present predefined profiles to the user and ask them to choose which one matches their type.
+                    Rules:
+                    Only use the profiles provided to you.
+                    Do not create new profiles.
+                    Keep descriptions short (2–3 lines each).
+                    After listing them, ask the user to choose.
+                    After listing them, clearly tell the user they must choose
+                    Do not be overly descriptive or explicit.
+                    Keep it funny.
+                    Keep the tone friendly and casual."
+                    EXAMPLE: Hey who looks cute for you? choose among these matches.
+                     """
+
+NO_RECOMMENDATIONS_RESPONSE = {
+    "message": "No specific style recommendations found. Try keywords like 'traditional', 'modern', 'cute'.",
+    "docs": []
+}
+
+# Loaded once, indexed by (style, gender) and reloaded only when the file changes
+recommendation_store = RecommendationStore(
+    RECOMMENDATIONS_PATH,
+    response_extras={"instruction": RECOMMENDATION_INSTRUCTION}
+)
 
 @mcp.tool()
 async def get_profile_recommendations(
@@ -510,54 +519,26 @@ async def get_profile_recommendations(
         - Try to map to the search_profile tool as much as possible. If you arent sure, use this tool.
         - This tool is only used for recommending profiles to the user. 
     """
-    target_styles = []
-    target_styles.append(query)
-    
-    # Load recommendations data dynamically
-    RECOMMENDATIONS = load_recommendations()
-    
-    recommendations = []
+    target_styles = query if isinstance(query, list) else [query]
+
+    # Single style: serve the precomputed response as-is
+    if len(target_styles) == 1:
+        return recommendation_store.get_response(target_styles[0], gender) or NO_RECOMMENDATIONS_RESPONSE
 
     # Collect recommendations
+    recommendations = []
     for style in target_styles:
-        if style in RECOMMENDATIONS:
-            style_data = RECOMMENDATIONS[style]
-            
-            # If gender is known, return only that gender
-            if gender and gender in style_data:
-                 recommendations.extend(style_data[gender])
-            
-            # If gender is unknown, return both
-            elif not gender:
-                 if "female" in style_data:
-                     recommendations.extend(style_data["female"])
-                 if "male" in style_data:
-                     recommendations.extend(style_data["male"])
+        recommendations.extend(recommendation_store.get_by_style(style, gender))
 
     if not recommendations:
         # Fallback if no specific style matches, maybe return a mix or ask for clarification?
         # For this tool, better to return empty or a suggestion message.
-        return {
-            "message": "No specific style recommendations found. Try keywords like 'traditional', 'modern', 'cute'.",
-            "docs": []
-        }
-        
+        return NO_RECOMMENDATIONS_RESPONSE
+
     return {
         "recommendation": True,
         "docs": recommendations,
-        "instruction": """You are a Recommendation Agent.
-                    Your task is to present predefined profiles to the user and ask them to choose which one matches their type.
-                    Rules:
-                    Only use the profiles provided to you.
-                    Do not create new profiles.
-                    Keep descriptions short (2–3 lines each).
-                    After listing them, ask the user to choose.
-                    After listing them, clearly tell the user they must choose
-                    Do not be overly descriptive or explicit.
-                    Keep it funny.
-                    Keep the tone friendly and casual."
-                    EXAMPLE: Hey who looks cute for you? choose among these matches.
-                     """
+        "instruction": RECOMMENDATION_INSTRUCTION
     }
 
 # @mcp.tool()
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Set
+
+from app.core.config import settings
+from app.services.redis_service import redis_service
+from app.services.mongo import mongo_service
+from app.services.eleven_labs_audio_gen_service import eleven_labs_audio_gen_service
+from app.services.blob_storage_uploader_service import blob_storage_uploader_service
+from app.services.tts_cache_service import tts_cache_service
+from app.utils.tts_segments import split_for_tts
+
+logger = logging.getLogger(__name__)
+
+
+class AudioPipelineService:
+    """
+    Text-to-speech off the request path.
+
+    A job synthesizes the answer with ElevenLabs, streams the MP3 chunks
+    straight into blob storage and then emits an AUDIO_READY (or
+    AUDIO_FAILED) event on the request's status channel. The blocking SDK
+    calls run in a worker thread, and a semaphore caps concurrent jobs.
+
+    In progressive mode the answer is split into sentences instead. All
+    segments are queued for synthesis at once and published in order as
+    AUDIO_SEGMENT events, so the client can start playing the first sentence
+    while the rest are still being generated. AUDIO_READY then carries the
+    ordered segment URLs.
+    """
+
+    def __init__(self, max_concurrency: int = 4, progressive: bool = True, segment_max_chars: int = 250):
+        self.progressive = progressive
+        self.segment_max_chars = segment_max_chars
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._jobs: Set[asyncio.Task] = set()
+        # Requests whose AUDIO_READY / AUDIO_FAILED went out
+        self._finalized: Set[str] = set()
+
+        # Metrics
+        self.jobs_submitted: int = 0
+        self.jobs_failed: int = 0
+        self.last_duration: float = 0.0
+        self.last_first_segment_latency: float = 0.0
+        self.segments_published: int = 0
+
+    def submit(self, request_id: str, user_id: str, text: str, voice_id: Optional[str]) -> asyncio.Task:
+        self.jobs_submitted += 1
+        run = self._run_progressive if self.progressive else self._run
+        task = asyncio.create_task(self._job(run, request_id, user_id, text, voice_id))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+        return task
+
+    async def _job(self, run, request_id: str, user_id: str, text: str, voice_id: Optional[str]):
+        """
+        Clients keep their stream open until the final audio event (audio_pending),
+        so one is published even when the job crashes or is cancelled.
+        """
+        try:
+            await run(request_id, user_id, text, voice_id)
+        except asyncio.CancelledError:
+            await self._ensure_final(request_id, "Audio generation cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Audio pipeline crashed for {request_id}: {e}")
+            await self._ensure_final(request_id, str(e))
+        finally:
+            self._finalized.discard(request_id)
+
+    async def _ensure_final(self, request_id: str, error: str):
+        if request_id in self._finalized:
+            return
+        self.jobs_failed += 1
+        await self._publish_final(request_id, {
+            "request_id": request_id,
+            "status": "AUDIO_FAILED",
+            "audio_error": error,
+            "extra": {},
+            "source": "orchestrator"
+        })
+
+    async def _publish_final(self, request_id: str, msg: dict):
+        self._finalized.add(request_id)
+        await self._publish(request_id, msg)
+
+    def _synthesize_and_upload(self, text: str, voice_id: Optional[str]) -> Optional[str]:
+        # Iterating the ElevenLabs stream inside upload_blob keeps only one block in memory
+        audio_stream = eleven_labs_audio_gen_service.text_to_audio(text, voice_id)
+        if not audio_stream:
+            return None
+        return blob_storage_uploader_service.generate_url(audio_stream)
+
+    async def synthesize(self, text: str, voice_id: Optional[str]) -> Optional[str]:
+        """Audio URL for text, served from the TTS cache when the same phrase was voiced before."""
+        async def run():
+            async with self._semaphore:
+                return await asyncio.to_thread(self._synthesize_and_upload, text, voice_id)
+
+        return await tts_cache_service.get_or_synthesize(
+            text, voice_id, eleven_labs_audio_gen_service.MODEL_ID, run
+        )
+
+    async def prewarm(self, voice_ids: List[str], texts: List[str]):
+        """Synthesize every (voice, text) pair that isn't cached yet."""
+        logger.info(f"Prewarming TTS cache for {len(voice_ids)} voices x {len(texts)} phrases")
+        for voice_id in voice_ids:
+            for text in texts:
+                try:
+                    await self.synthesize(text, voice_id)
+                except Exception as e:
+                    logger.error(f"TTS prewarm failed for voice {voice_id}: {e}")
+        logger.info("TTS cache prewarm completed")
+
+    async def _run(self, request_id: str, user_id: str, text: str, voice_id: Optional[str]):
+        audio_url = None
+        try:
+            t0 = time.time()
+            audio_url = await self.synthesize(text, voice_id)
+            self.last_duration = time.time() - t0
+        except Exception as e:
+            logger.error(f"Audio pipeline failed for {request_id}: {e}")
+
+        if not audio_url:
+            self.jobs_failed += 1
+
+        msg = {
+            "request_id": request_id,
+            "status": "AUDIO_READY" if audio_url else "AUDIO_FAILED",
+            "audio_clip": audio_url or "",
+            "extra": {},
+            "source": "orchestrator"
+        }
+        await self._publish_final(request_id, msg)
+        if audio_url:
+            try:
+                await mongo_service.save_chat_log(user_id, {"request_id": request_id, "voice_clip": audio_url})
+            except Exception as e:
+                logger.error(f"Failed to save audio clip for {request_id}: {e}")
+
+    async def _run_progressive(self, request_id: str, user_id: str, text: str, voice_id: Optional[str]):
+        segments = split_for_tts(text, self.segment_max_chars)
+        if len(segments) <= 1:
+            return await self._run(request_id, user_id, text, voice_id)
+
+        t0 = time.time()
+        # Every segment is queued now; the semaphore lets them through in order
+        tasks = [asyncio.create_task(self.synthesize(segment, voice_id)) for segment in segments]
+        urls = []
+        try:
+            for index, (segment, task) in enumerate(zip(segments, tasks)):
+                try:
+                    url = await task
+                except Exception as e:
+                    logger.error(f"Audio segment {index} failed for {request_id}: {e}")
+                    url = None
+                if not url:
+                    # A gap would garble the reply, so stop at the first failure
+                    break
+
+                if index == 0:
+                    self.last_first_segment_latency = time.time() - t0
+                urls.append(url)
+                await self._publish(request_id, {
+                    "request_id": request_id,
+                    "status": "AUDIO_SEGMENT",
+                    "audio_segment": {"index": index, "total": len(segments), "url": url, "text": segment},
+                    "extra": {},
+                    "source": "orchestrator"
+                })
+                self.segments_published += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        self.last_duration = time.time() - t0
+        complete = len(urls) == len(segments)
+        if not complete:
+            self.jobs_failed += 1
+
+        await self._publish_final(request_id, {
+            "request_id": request_id,
+            "status": "AUDIO_READY" if complete else "AUDIO_FAILED",
+            "audio_segments": urls,
+            "extra": {},
+            "source": "orchestrator"
+        })
+        if complete:
+            try:
+                await mongo_service.save_chat_log(user_id, {"request_id": request_id, "voice_clips": urls})
+            except Exception as e:
+                logger.error(f"Failed to save audio segments for {request_id}: {e}")
+
+    async def _publish(self, request_id: str, msg: dict):
+        try:
+            await redis_service.publish_status_event(
+                request_id,
+                msg,
+                maxlen=settings.STATUS_STREAM_MAXLEN,
+                ttl=settings.STATUS_STREAM_TTL
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish audio event for {request_id}: {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            "in_flight": len(self._jobs),
+            "jobs_submitted": self.jobs_submitted,
+            "jobs_failed": self.jobs_failed,
+            "last_duration": self.last_duration,
+            "last_first_segment_latency": self.last_first_segment_latency,
+            "segments_published": self.segments_published,
+            "tts_cache": tts_cache_service.get_stats(),
+        }
+
+    async def stop(self):
+        jobs = list(self._jobs)
+        for task in jobs:
+            task.cancel()
+        # Let cancelled jobs publish their AUDIO_FAILED before Redis is closed
+        if jobs:
+            await asyncio.wait(jobs, timeout=5)
+        self._jobs.clear()
+
+
+audio_pipeline_service = AudioPipelineService(
+    max_concurrency=settings.AUDIO_MAX_CONCURRENCY,
+    progressive=settings.TTS_PROGRESSIVE,
+    segment_max_chars=settings.TTS_SEGMENT_MAX_CHARS
+)
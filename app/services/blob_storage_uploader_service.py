@@ -1,39 +1,127 @@
-from azure.storage.blob import BlobServiceClient, ContentSettings
-from io import BytesIO
+from azure.storage.blob import BlobServiceClient, ContentSettings, BlobSasPermissions, generate_blob_sas
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterable, Iterable, Optional, Union
 import uuid
 from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Content types clients may request a direct-upload SAS for
+ALLOWED_UPLOAD_CONTENT_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+
 class BlobStorageUploaderService:
     def __init__(self):
         self.blob_service_client = BlobServiceClient.from_connection_string(settings.AZURE_STORAGE_CONNECTION_STRING)
         self.container_client = self.blob_service_client.get_container_client(settings.AZURE_STORAGE_CONTAINER_NAME)
+
+        # One async client per process, created on first use inside the event loop
+        self._async_service_client: Optional[AsyncBlobServiceClient] = None
+        self._async_container_client = None
+
+    def _get_async_container_client(self):
+        if self._async_container_client is None:
+            self._async_service_client = AsyncBlobServiceClient.from_connection_string(
+                settings.AZURE_STORAGE_CONNECTION_STRING,
+                max_block_size=settings.BLOB_UPLOAD_CHUNK_SIZE,
+                max_single_put_size=settings.BLOB_UPLOAD_CHUNK_SIZE
+            )
+            self._async_container_client = self._async_service_client.get_container_client(
+                settings.AZURE_STORAGE_CONTAINER_NAME
+            )
+        return self._async_container_client
     
     def generate_url(self, audio_stream):
-        try:
-            audio_bytes = BytesIO()
-            for chunk in audio_stream:
-                audio_bytes.write(chunk)
-            audio_bytes.seek(0)
+        return self.upload_stream(audio_stream, "mp3", "audio/mpeg")
 
-            file_name = f"{uuid.uuid4().hex}.mp3"
+    def upload_stream(self, chunks: Iterable[bytes], extension: str, content_type: str) -> str | None:
+        """
+        Upload an iterable of byte chunks without buffering the whole payload.
+        The SDK stages one block per max_block_size as chunks arrive.
+        Blocking: call via asyncio.to_thread from async code.
+        """
+        try:
+            file_name = f"{uuid.uuid4().hex}.{extension}"
 
-            # Upload to blob
             blob_client = self.container_client.get_blob_client(file_name)
             blob_client.upload_blob(
-                audio_bytes.getvalue(),
+                chunks,
                 overwrite=True,
-                content_settings=ContentSettings(content_type="audio/mpeg")
+                content_settings=ContentSettings(content_type=content_type)
             )
 
-            # Return URL
             return blob_client.url
         except Exception as e:
-            logger.error(f"Error uploading audio to blob storage: {e}")
+            logger.error(f"Error uploading stream to blob storage: {e}")
             return None
 
+    async def upload_file_async(
+        self,
+        data: Union[bytes, AsyncIterable[bytes]],
+        file_name: str,
+        content_type: str = "image/jpeg"
+    ) -> str | None:
+        """
+        Upload on the async SDK. `data` may be an async iterator of chunks,
+        which the SDK stages as blocks of BLOB_UPLOAD_CHUNK_SIZE without
+        holding the whole file.
+        """
+        try:
+            extension = file_name.split(".")[-1] if file_name and "." in file_name else "jpg"
+            unique_file_name = f"{uuid.uuid4().hex}.{extension}"
+
+            blob_client = self._get_async_container_client().get_blob_client(unique_file_name)
+            await blob_client.upload_blob(
+                data,
+                overwrite=True,
+                content_settings=ContentSettings(content_type=content_type)
+            )
+            return blob_client.url
+        except Exception as e:
+            logger.error(f"Error uploading file to blob storage: {e}")
+            return None
+
+    def generate_upload_sas(self, content_type: str) -> dict | None:
+        """
+        Short-lived, create-only SAS URL for a new blob, so clients can PUT
+        the file straight to storage and send us only the blob URL.
+
+        The SAS can't restrict what gets uploaded: `content_type` only sets the
+        response header on reads, and blob size isn't limited. Consumers of the
+        resulting image_url must validate both (see EmbeddingService.get_image_from_url).
+        """
+        extension = ALLOWED_UPLOAD_CONTENT_TYPES.get(content_type)
+        if not extension:
+            return None
+
+        blob_name = f"{uuid.uuid4().hex}.{extension}"
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.BLOB_SAS_TTL)
+        credential = self.blob_service_client.credential
+
+        sas_token = generate_blob_sas(
+            account_name=self.blob_service_client.account_name,
+            container_name=settings.AZURE_STORAGE_CONTAINER_NAME,
+            blob_name=blob_name,
+            account_key=credential.account_key,
+            # create only: the blob can be written once, not overwritten later
+            permission=BlobSasPermissions(create=True),
+            expiry=expires_at,
+            content_type=content_type
+        )
+        blob_url = self.container_client.get_blob_client(blob_name).url
+        return {
+            "upload_url": f"{blob_url}?{sas_token}",
+            "blob_url": blob_url,
+            "method": "PUT",
+            "headers": {"x-ms-blob-type": "BlockBlob", "Content-Type": content_type},
+            "expires_at": expires_at.isoformat()
+        }
+
     def upload_file(self, file_data: bytes, file_name: str, content_type: str = "image/jpeg") -> str | None:
         try:
             # Generate unique filename if not provided or to ensure uniqueness? 
@@ -53,4 +141,10 @@ class BlobStorageUploaderService:
             logger.error(f"Error uploading file to blob storage: {e}")
             return None
 
+    async def close(self):
+        if self._async_service_client:
+            await self._async_service_client.close()
+            self._async_service_client = None
+            self._async_container_client = None
+
 blob_storage_uploader_service = BlobStorageUploaderService()
@@ -5,6 +5,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 class ElevenLabsAudioGenService:
+    MODEL_ID = "eleven_multilingual_v2"
+    OUTPUT_FORMAT = "mp3_44100_128"
+
     def __init__(self):
         self.elevenlabs = ElevenLabs(api_key=settings.ELEVEN_LABS_API_KEY)
     
@@ -21,8 +24,8 @@ class ElevenLabsAudioGenService:
             audio_stream = self.elevenlabs.text_to_speech.convert(
                 text=text,
                 voice_id=voice_id,
-                model_id="eleven_multilingual_v2",
-                output_format="mp3_44100_128"
+                model_id=self.MODEL_ID,
+                output_format=self.OUTPUT_FORMAT
             )
 
             return audio_stream
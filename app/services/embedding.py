@@ -1,8 +1,15 @@
+import asyncio
 import insightface
 import numpy as np
 import cv2
 import httpx
+from typing import Union
 from insightface.app import FaceAnalysis
+from app.core.tracing import tracer
+from app.core.config import settings
+
+# A URL to download, encoded image bytes, or an already decoded/encoded numpy buffer
+ImageSource = Union[str, bytes, bytearray, memoryview, np.ndarray]
 
 class EmbeddingService:
     def __init__(self):
@@ -16,32 +23,65 @@ class EmbeddingService:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=headers, follow_redirects=True)
-            resp.raise_for_status()
-            image_array = np.asarray(bytearray(resp.content), dtype="uint8")
-            image = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
-            return image
+            async with client.stream("GET", url, headers=headers, follow_redirects=True) as resp:
+                resp.raise_for_status()
+
+                # image_url may point at a client-uploaded blob, whose type and size nothing enforced.
+                # The decoder is the real type check; this rejects obvious non-images early.
+                content_type = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+                if content_type and not (content_type.startswith("image/") or content_type == "application/octet-stream"):
+                    raise ValueError(f"URL is not an image (content type {content_type})")
+                if int(resp.headers.get("content-length") or 0) > settings.MAX_IMAGE_BYTES:
+                    raise ValueError(f"Image larger than {settings.MAX_IMAGE_BYTES} bytes")
+
+                data = bytearray()
+                async for chunk in resp.aiter_bytes():
+                    data.extend(chunk)
+                    if len(data) > settings.MAX_IMAGE_BYTES:
+                        raise ValueError(f"Image larger than {settings.MAX_IMAGE_BYTES} bytes")
+            return self.decode_image(data)
+
+    def decode_image(self, data: Union[bytes, bytearray, memoryview, np.ndarray]) -> np.ndarray:
+        """
+        Decode encoded image bytes (JPEG/PNG/...) into a BGR array.
+        A decoded HxWx3 array is returned as-is.
+        """
+        if isinstance(data, np.ndarray) and data.ndim == 3:
+            return data
+        # frombuffer wraps the bytes without copying them
+        image_array = np.frombuffer(data, dtype=np.uint8)
+        return cv2.imdecode(image_array, cv2.IMREAD_COLOR)
 
-    async def get_embedding(self, image_url: str) -> list[float]:
+    def _embed(self, img: np.ndarray) -> list[float]:
+        # FaceAnalysis inference
+        faces = self.app.get(img)
+        
+        if not faces:
+            raise ValueError("No face detected in the image")
+        
+        # Assuming we take the first face or the most prominent one
+        # InsightFace sorts by detection score usually, or we can sort by area
+        # For this task, taking the first valid face is standard practice
+        embedding = faces[0].embedding
+        
+        # Normalize? ArcFace embeddings are typically normalized.
+        # Convert to list for JSON serialization/Redis storage
+        return embedding.tolist()
+
+    async def get_embedding(self, image: ImageSource) -> list[float]:
         try:
-            img = await self.get_image_from_url(image_url)
+            if isinstance(image, str):
+                with tracer.span("embedding.download"):
+                    img = await self.get_image_from_url(image)
+            else:
+                with tracer.span("embedding.decode"):
+                    img = await asyncio.to_thread(self.decode_image, image)
             if img is None:
                raise ValueError("Could not decode image")
             
-            # FaceAnalysis inference
-            faces = self.app.get(img)
-            
-            if not faces:
-                raise ValueError("No face detected in the image")
-            
-            # Assuming we take the first face or the most prominent one
-            # InsightFace sorts by detection score usually, or we can sort by area
-            # For this task, taking the first valid face is standard practice
-            embedding = faces[0].embedding
-            
-            # Normalize? ArcFace embeddings are typically normalized.
-            # Convert to list for JSON serialization/Redis storage
-            return embedding.tolist()
+            # Inference is CPU bound, keep it off the event loop
+            with tracer.span("embedding.infer"):
+                return await asyncio.to_thread(self._embed, img)
         except Exception as e:
             print(f"Error generating embedding: {e}")
             raise e
@@ -3,6 +3,7 @@ from app.core.config import settings
 import json
 import logging
 import asyncio
+from typing import List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +24,13 @@ class KafkaService:
             await self.producer.stop()
             logger.info("Kafka Producer stopped")
 
-    async def send_request(self, topic: str, request_data: dict):
+    async def send_request(self, topic: str, request_data: dict, headers: Optional[List[Tuple[str, bytes]]] = None):
         if not self.producer:
              # In case start wasn't called (e.g. dev mode without startup event)
              await self.start()
         
         try:
-            await self.producer.send_and_wait(topic, request_data)
+            await self.producer.send_and_wait(topic, request_data, headers=headers)
         except Exception as e:
             logger.error(f"Error sending to Kafka: {e}")
             raise e
@@ -1,18 +1,154 @@
 import sys
 import json
 import inspect
+import logging
 from contextlib import AsyncExitStack
-from typing import Any, Awaitable, Callable, ClassVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 import asyncio
+import time
 import traceback
 
+from app.services.metrics_service import metrics_service
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class MCPSession:
+    """
+    One MCP server subprocess and its ClientSession.
+
+    The stdio transport is entered and exited inside a dedicated runner task,
+    because anyio requires its cancel scopes to be closed by the task that
+    opened them. Restarting a session therefore means stopping that task and
+    spawning a fresh one.
+    """
+
+    def __init__(self, index: int, server_path: str):
+        self.index = index
+        self.server_path = server_path
+        self.session: Optional[ClientSession] = None
+
+        # Metrics
+        self.in_flight: int = 0
+        self.total_calls: int = 0
+        self.failed_calls: int = 0
+        self.restarts: int = 0
+        self.last_error: Optional[str] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._lock = asyncio.Lock()
+        # Set when a call hangs; the subprocess may still answer pings
+        self._failed = False
+
+    @property
+    def healthy(self) -> bool:
+        return not self._failed and self.session is not None and self._task is not None and not self._task.done()
+
+    def mark_unhealthy(self, reason: str):
+        """Take the session out of dispatch until it is restarted."""
+        self._failed = True
+        self.last_error = reason
+
+    async def start(self):
+        self._failed = False
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if not self.healthy:
+            raise RuntimeError("Error: Failed to connect to server")
+
+    async def _run(self):
+        try:
+            async with AsyncExitStack() as stack:
+                read, write = await stack.enter_async_context(
+                    stdio_client(
+                        server=StdioServerParameters(
+                            command="sh",
+                            args=["-c", f"{sys.executable} {self.server_path} 2>/dev/null"],
+                            env=None,
+                        )
+                    )
+                )
+                client_session = await stack.enter_async_context(
+                    ClientSession(read, write)
+                )
+                await client_session.initialize()
+
+                self.session = client_session
+                self._ready.set()
+                await self._stop.wait()
+
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.last_error = repr(e)
+            logger.error(f"MCP session {self.index} terminated: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=5.0)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self._task.cancel()
+        except Exception:
+            pass
+        self._task = None
+        self.session = None
+
+    async def restart(self):
+        async with self._lock:
+            # Another checker may have restarted it while this one waited for the lock
+            if await self.ping():
+                return
+            logger.warning(f"Restarting MCP session {self.index}")
+            self.restarts += 1
+            await self.stop()
+            await self.start()
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        if not self.healthy:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+            return True
+        except Exception as e:
+            self.last_error = repr(e)
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "total_calls": self.total_calls,
+            "failed_calls": self.failed_calls,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+        }
+
+
 class MCPClient:
-    """MCP client that fetches tool metadata and stores it as JSON."""
+    """
+    MCP client that fetches tool metadata and stores it as JSON.
 
-    client_session: ClassVar[ClientSession]
+    Tool calls are spread over a pool of MCP server subprocesses, each
+    request going to the healthy session with the fewest calls in flight.
+    A background loop pings every session and restarts dead ones. A call
+    that exceeds `call_timeout` marks its session unhealthy and restarts it,
+    since a hung subprocess can still answer pings.
+    """
 
     # Stores final results to send to DeepSeek
     members: dict = {
@@ -21,38 +157,72 @@ class MCPClient:
         "resources": []
     }
 
-    def __init__(self, server_path: str):
+    def __init__(self, server_path: str, pool_size: int = 1, health_check_interval: float = 15.0, call_timeout: float = 30.0):
         self.server_path = server_path
-        self.exit_stack = AsyncExitStack()
+        self.health_check_interval = health_check_interval
+        self.call_timeout = call_timeout
+        self.sessions: List[MCPSession] = [
+            MCPSession(i, server_path) for i in range(max(1, pool_size))
+        ]
+        self._health_task: Optional[asyncio.Task] = None
+
+        # Prompt fragments derived from the tool list, rebuilt per tools_version
+        self.tools_version: int = 0
+        self._fragments: Dict[str, Any] = {"version": -1}
 
     async def __aenter__(self):
-        type(self).client_session = await self._connect_to_server()
+        await asyncio.gather(*(s.start() for s in self.sessions))
+        self._health_task = asyncio.create_task(self._health_check_loop())
+        logger.info(f"MCP session pool started with {len(self.sessions)} sessions")
         return self
 
     async def __aexit__(self, *_) -> None:
-        await self.exit_stack.aclose()
-
-    async def _connect_to_server(self) -> ClientSession:
-        try:
-            read, write = await self.exit_stack.enter_async_context(
-                stdio_client(
-                    server=StdioServerParameters(
-                        command="sh",
-                        args=["-c", f"{sys.executable} {self.server_path} 2>/dev/null"],
-                        env=None,
-                    )
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        await asyncio.gather(*(s.stop() for s in self.sessions), return_exceptions=True)
+
+    @property
+    def client_session(self) -> ClientSession:
+        return self._acquire_session().session
+
+    def _acquire_session(self) -> MCPSession:
+        """Least-loaded dispatch over the healthy sessions."""
+        candidates = [s for s in self.sessions if s.healthy]
+        if not candidates:
+            raise RuntimeError("Error: No healthy MCP session available")
+        return min(candidates, key=lambda s: s.in_flight)
+
+    async def _health_check_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.health_check_interval)
+                await asyncio.gather(
+                    *(self._check_session(s) for s in self.sessions),
+                    return_exceptions=True
                 )
-            )
-
-            client_session = await self.exit_stack.enter_async_context(
-                ClientSession(read, write)
-            )
-
-            await client_session.initialize()
-            return client_session
-
-        except Exception:
-            raise RuntimeError("Error: Failed to connect to server")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"MCP Health Check Error: {e}")
+
+    async def _check_session(self, mcp_session: MCPSession):
+        if await mcp_session.ping():
+            return
+        try:
+            await mcp_session.restart()
+        except Exception as e:
+            mcp_session.last_error = repr(e)
+            logger.error(f"Failed to restart MCP session {mcp_session.index}: {e}")
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        sessions = [s.get_stats() for s in self.sessions]
+        return {
+            "size": len(sessions),
+            "healthy": sum(1 for s in sessions if s["healthy"]),
+            "in_flight": sum(s["in_flight"] for s in sessions),
+            "sessions": sessions,
+        }
 
     def clean_schema(self, schema: dict) -> dict:
         """
@@ -114,6 +284,9 @@ class MCPClient:
         except Exception as e:
             self.members[section] = {"error": str(e)}
 
+        if section == "tools":
+            self.tools_version += 1
+
     # ---------- Public method ----------
     async def fetch_all_members(self) -> dict:
         """Fetch all tool/prompt/resource metadata and store in JSON structure."""
@@ -133,6 +306,63 @@ class MCPClient:
     def get_sections(self, type:str):
         return self.members.get(type, [])
 
+    # ---------- Precomputed prompt fragments ----------
+    def _get_fragments(self) -> Dict[str, Any]:
+        """
+        Build the per-tool prompt fragments once per tools_version.
+        Tools only change when fetch_all_members runs, so every LLM step
+        can reuse the same strings instead of re-rendering them.
+        """
+        if self._fragments["version"] == self.tools_version:
+            return self._fragments
+
+        tool_list = self.get_sections("tools")
+        if not isinstance(tool_list, list):
+            tool_list = []
+
+        meta_by_name = {}
+        schema_json = {}
+        enum_sets = {}
+        for tool in tool_list:
+            name = tool.get("name")
+            input_schema = tool.get("input_schema", {})
+            meta_by_name[name] = tool
+            schema_json[name] = json.dumps(input_schema, indent=2)
+            enum_sets[name] = {
+                arg_name: frozenset(arg_details["enum"])
+                for arg_name, arg_details in input_schema.get("properties", {}).items()
+                if isinstance(arg_details, dict) and "enum" in arg_details
+            }
+
+        self._fragments = {
+            "version": self.tools_version,
+            "tool_descriptions": self.format_tool_descriptions_for_llm(tool_list),
+            "tools_for_llm": self.format_tools_for_llm(tool_list),
+            "meta_by_name": meta_by_name,
+            "schema_json": schema_json,
+            "enum_sets": enum_sets,
+        }
+        return self._fragments
+
+    def get_tool_descriptions(self) -> str:
+        """Cached output of format_tool_descriptions_for_llm for the current tools."""
+        return self._get_fragments()["tool_descriptions"]
+
+    def get_tools_for_llm(self) -> str:
+        """Cached output of format_tools_for_llm for the current tools."""
+        return self._get_fragments()["tools_for_llm"]
+
+    def get_tool_meta(self, tool_name: str) -> Optional[dict]:
+        return self._get_fragments()["meta_by_name"].get(tool_name)
+
+    def get_tool_schema_json(self, tool_name: str) -> str:
+        """Pretty-printed input schema of a tool, as embedded in the args prompt."""
+        return self._get_fragments()["schema_json"].get(tool_name, "{}")
+
+    def get_tool_enum_sets(self, tool_name: str) -> Dict[str, frozenset]:
+        """Allowed enum values per argument, used by validate_and_clean_tool_args."""
+        return self._get_fragments()["enum_sets"].get(tool_name, {})
+
     # ---------- Helper: export JSON string ----------
     def get_json(self, pretty=True) -> str:
         return json.dumps(self.members, indent=2 if pretty else None)
@@ -148,12 +378,21 @@ class MCPClient:
         Returns:
             dict: result from the MCP server
         """
+        mcp_session = None
+        t0 = time.monotonic()
+        success = False
         try:
-            result = await self.client_session.call_tool(
-                name=tool_name,
-                arguments=arguments
-            )
+            mcp_session = self._acquire_session()
+            mcp_session.in_flight += 1
+            mcp_session.total_calls += 1
+
+            with tracer.span("mcp.call_tool", tool=tool_name, session=mcp_session.index):
+                result = await asyncio.wait_for(
+                    mcp_session.session.call_tool(name=tool_name, arguments=arguments),
+                    timeout=self.call_timeout
+                )
 
+            success = True
             return {
                 "success": True,
                 "tool": tool_name,
@@ -162,15 +401,25 @@ class MCPClient:
             }
 
         except Exception as e:
+            if mcp_session:
+                mcp_session.failed_calls += 1
+                mcp_session.last_error = repr(e)
+                if isinstance(e, asyncio.TimeoutError):
+                    logger.error(f"MCP session {mcp_session.index} timed out on {tool_name} after {self.call_timeout}s")
+                    mcp_session.mark_unhealthy(f"{tool_name} timed out after {self.call_timeout}s")
+                if not mcp_session.healthy:
+                    asyncio.create_task(self._check_session(mcp_session))
             return {
                 "success": False,
                 "tool": tool_name,
                 "input": arguments,
                 "error": repr(e),
                 "traceback": traceback.format_exc(),
-                "error": repr(e),
-                "traceback": traceback.format_exc(),
             }
+        finally:
+            if mcp_session:
+                mcp_session.in_flight -= 1
+            metrics_service.record_tool_call(tool_name, time.monotonic() - t0, success)
 
     def format_tools_for_llm(self, tools_list: list) -> str:
         """
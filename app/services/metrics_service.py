@@ -1,35 +1,155 @@
 import time
 import asyncio
-from typing import Dict, Any, List
-from collections import deque
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Tuple
+
+# Upper bounds (seconds) of latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, float("inf"))
+
+# Upper bounds (tokens) of the prompt-size histogram buckets
+PROMPT_SIZE_BUCKETS = (500, 1000, 2000, 4000, 8000, 16000, float("inf"))
+
+TOKENS_PER_SECOND_BUCKETS = (5, 10, 20, 40, 80, 160, float("inf"))
+
+METRIC_PREFIX = "smrit_"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram: O(log buckets) observe, mergeable across
+    replicas by summing buckets, quantiles interpolated inside a bucket.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts: List[int] = [0] * len(buckets)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i]
+                if upper == float("inf"):
+                    # Nothing to interpolate towards; report the last finite bound
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-2]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "histogram": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(self.buckets, self.counts)
+            },
+        }
+
 
 class MetricsService:
+    """
+    Process-local counters, gauges and histograms.
+
+    Everything runs on the event loop thread, so recording is plain
+    arithmetic with no locks. Histograms use fixed buckets, so the
+    Prometheus output can be aggregated across replicas at query time.
+    """
+
     def __init__(self):
         # Counters
         self.incoming_requests: int = 0
         self.completed_requests: int = 0
         self.failed_requests: int = 0
         self.tokens_generated: int = 0
-        
+
         # Gauges
         self.active_requests: int = 0
         self.active_llm_jobs: int = 0
         self.requests_in_queue: int = 0 # Not fully implemented in orchestrator yet, but good to have
-        
-        # Histograms / Lists (Store recent N for stats)
-        # We'll store simple lists of recent values to calculate avg/p95 on read
-        self.latency_history: deque = deque(maxlen=100)
-        self.step_processing_history: Dict[str, deque] = {} # "step_name": deque
-        self.llm_processing_history: deque = deque(maxlen=100)
-        self.tokens_per_second_history: deque = deque(maxlen=100)
-        
+
         # Last Values
         self.last_tokens_per_second: float = 0.0
 
-    def _get_step_deque(self, step: str) -> deque:
-        if step not in self.step_processing_history:
-            self.step_processing_history[step] = deque(maxlen=100)
-        return self.step_processing_history[step]
+        # name -> help text, buckets
+        self._histogram_defs: Dict[str, Tuple[str, Tuple[float, ...]]] = {
+            "request_duration_seconds": ("End-to-end chat request latency", LATENCY_BUCKETS),
+            "step_duration_seconds": ("Orchestration step latency", LATENCY_BUCKETS),
+            "llm_processing_seconds": ("LLM worker processing time reported in usage", LATENCY_BUCKETS),
+            "tool_call_seconds": ("MCP tool call latency", LATENCY_BUCKETS),
+            "stage_duration_seconds": ("Request timeline stage duration", LATENCY_BUCKETS),
+            "llm_queue_seconds": ("Producer to worker time of an LLM request, including Kafka lag and worker queueing", LATENCY_BUCKETS),
+            "llm_compute_seconds": ("LLM worker compute time per step, from usage", LATENCY_BUCKETS),
+            "llm_delivery_seconds": ("Worker to orchestrator time of an LLM response", LATENCY_BUCKETS),
+            "tokens_per_second": ("LLM generation speed", TOKENS_PER_SECOND_BUCKETS),
+            "prompt_tokens": ("Estimated prompt size per step", PROMPT_SIZE_BUCKETS),
+            "prompt_section_tokens": ("Estimated prompt section size per step", PROMPT_SIZE_BUCKETS),
+        }
+        self._counter_help: Dict[str, str] = {
+            "llm_requests_total": "LLM requests dispatched",
+            "decisions_total": "Tool-check decisions",
+            "tool_calls_total": "MCP tool calls",
+            "prompts_trimmed_total": "Prompts trimmed to fit their token budget",
+        }
+
+        # name -> label key -> value
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {name: {} for name in self._histogram_defs}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {name: {} for name in self._counter_help}
+
+    # --------------------------
+    # Primitives
+    # --------------------------
+    def observe(self, name: str, value: float, **labels):
+        series = self._histograms[name]
+        key = _label_key(labels)
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = Histogram(self._histogram_defs[name][1])
+        hist.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        series = self._counters[name]
+        key = _label_key(labels)
+        series[key] = series.get(key, 0) + amount
+
+    def _series(self, name: str, label: str) -> Dict[str, Histogram]:
+        """Histograms of `name` keyed by the value of a single label."""
+        return {dict(key).get(label, ""): hist for key, hist in self._histograms[name].items()}
 
     # --------------------------
     # Async Record Methods (Fire and Forget)
@@ -44,59 +164,160 @@ class MetricsService:
             self.failed_requests += 1
         else:
             self.completed_requests += 1
-        self.latency_history.append(duration)
+        self.observe("request_duration_seconds", duration, status="error" if error else "ok")
 
     def record_step_duration(self, step: str, duration: float):
-        d = self._get_step_deque(step)
-        d.append(duration)
+        self.observe("step_duration_seconds", duration, step=step)
+
+    def record_prompt_size(self, step: str, tokens: int, sections: Dict[str, int] = None, trimmed: bool = False):
+        self.observe("prompt_tokens", tokens, step=step)
+        for name, size in (sections or {}).items():
+            self.observe("prompt_section_tokens", size, step=step, section=name)
+        if trimmed:
+            self.inc("prompts_trimmed_total", step=step)
+
+    def record_request_timeline(self, stages: List[Dict[str, Any]]):
+        for stage in stages:
+            self.observe("stage_duration_seconds", stage["duration"], stage=stage["name"])
+
+    def record_llm_timing(self, step: str, queue: Optional[float], compute: Optional[float], delivery: Optional[float]):
+        # Parts that couldn't be derived (no usage, no record timestamp) are skipped
+        for name, value in (("llm_queue_seconds", queue), ("llm_compute_seconds", compute), ("llm_delivery_seconds", delivery)):
+            if value is not None:
+                self.observe(name, value, step=step)
+
+    def record_llm_request(self, step: str):
+        self.inc("llm_requests_total", step=step)
+
+    def record_decision(self, decision: str):
+        self.inc("decisions_total", decision=decision or "none")
+
+    def record_tool_call(self, tool: str, duration: float, success: bool):
+        self.inc("tool_calls_total", tool=tool, status="ok" if success else "error")
+        self.observe("tool_call_seconds", duration, tool=tool)
 
     def record_llm_job_start(self):
         self.active_llm_jobs += 1
 
     def record_llm_job_end(self, duration: float, tokens: int = 0):
         self.active_llm_jobs = max(0, self.active_llm_jobs - 1)
-        self.llm_processing_history.append(duration)
-        if tokens > 0:
-            self.tokens_generated += 1 # We might want total count, not just "1 request"
-            # Wait, user asked for "Tokens Generated – Total tokens". 
-            # I should add the actual count.
-            # But here tokens is passed as int.
-            pass
+        self.observe("llm_processing_seconds", duration)
 
     def increment_tokens(self, count: int, duration: float):
         self.tokens_generated += count
         if duration > 0:
             tps = count / duration
             self.last_tokens_per_second = tps
-            self.tokens_per_second_history.append(tps)
+            self.observe("tokens_per_second", tps)
 
     # --------------------------
     # helpers
     # --------------------------
-    def _safe_avg(self, data: deque) -> float:
-        if not data: return 0.0
-        return sum(data) / len(data)
+    def _merged(self, name: str) -> Histogram:
+        merged = Histogram(self._histogram_defs[name][1])
+        for hist in list(self._histograms[name].values()):
+            merged.counts = [a + b for a, b in zip(merged.counts, hist.counts)]
+            merged.sum += hist.sum
+            merged.count += hist.count
+        return merged
 
     def get_metrics_snapshot(self) -> Dict[str, Any]:
         """Return all metrics as a dictionary"""
+        llm = self._merged("llm_processing_seconds").summary()
+        tps = self._merged("tokens_per_second").summary()
+        section_hists: Dict[str, Dict[str, Histogram]] = {}
+        for key, hist in list(self._histograms["prompt_section_tokens"].items()):
+            labels = dict(key)
+            section_hists.setdefault(labels["step"], {})[labels["section"]] = hist
+        trimmed = {dict(key)["step"]: value for key, value in self._counters["prompts_trimmed_total"].items()}
+
         return {
             "requests": {
                 "incoming_total": self.incoming_requests,
                 "active_now": self.active_requests,
                 "completed_total": self.completed_requests,
                 "failed_total": self.failed_requests,
-                "latency_avg_last_100": self._safe_avg(self.latency_history)
+                "latency": self._merged("request_duration_seconds").summary()
             },
             "llm": {
                 "active_jobs": self.active_llm_jobs,
-                "processing_time_avg_last_100": self._safe_avg(self.llm_processing_history),
+                "processing_time": llm,
                 "tokens_generated_total": self.tokens_generated,
                 "tokens_per_second_last": self.last_tokens_per_second,
-                "tokens_per_second_avg_last_100": self._safe_avg(self.tokens_per_second_history)
+                "tokens_per_second_avg": tps["avg"],
+                "requests_by_step": {
+                    dict(key).get("step", ""): value for key, value in self._counters["llm_requests_total"].items()
+                },
+                "breakdown_by_step": {
+                    part: {step: hist.summary() for step, hist in self._series(f"llm_{part}_seconds", "step").items()}
+                    for part in ("queue", "compute", "delivery")
+                }
+            },
+            "steps": {
+                step: hist.summary() for step, hist in self._series("step_duration_seconds", "step").items()
+            },
+            "stages": {
+                stage: hist.summary() for stage, hist in self._series("stage_duration_seconds", "stage").items()
+            },
+            "decisions": {
+                dict(key).get("decision", ""): value for key, value in self._counters["decisions_total"].items()
+            },
+            "tools": {
+                tool: {
+                    **hist.summary(),
+                    "errors": self._counters["tool_calls_total"].get(_label_key({"status": "error", "tool": tool}), 0)
+                }
+                for tool, hist in self._series("tool_call_seconds", "tool").items()
             },
-            "steps_avg_duration": {
-                step: self._safe_avg(d) for step, d in self.step_processing_history.items()
+            "prompt_tokens": {
+                step: {
+                    **hist.summary(),
+                    "sections_avg": {
+                        name: sh.sum / sh.count if sh.count else 0.0
+                        for name, sh in section_hists.get(step, {}).items()
+                    },
+                    "trimmed_total": trimmed.get(step, 0)
+                }
+                for step, hist in self._series("prompt_tokens", "step").items()
             }
         }
 
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+
+        def scalar(name: str, kind: str, help_text: str, value: float):
+            lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+            lines.append(f"{METRIC_PREFIX}{name} {value}")
+
+        scalar("requests_incoming_total", "counter", "Chat requests received", self.incoming_requests)
+        scalar("requests_completed_total", "counter", "Chat requests answered", self.completed_requests)
+        scalar("requests_failed_total", "counter", "Chat requests answered with a fallback", self.failed_requests)
+        scalar("tokens_generated_total", "counter", "Tokens generated by the LLM workers", self.tokens_generated)
+        scalar("requests_active", "gauge", "Chat requests in flight", self.active_requests)
+        scalar("llm_jobs_active", "gauge", "LLM jobs awaiting a response", self.active_llm_jobs)
+        scalar("tokens_per_second_last", "gauge", "Generation speed of the last LLM response", self.last_tokens_per_second)
+
+        for name, help_text in self._counter_help.items():
+            full = f"{METRIC_PREFIX}{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} counter")
+            for key, value in list(self._counters[name].items()):
+                lines.append(f"{full}{_format_labels(key)} {value}")
+
+        for name, (help_text, _) in self._histogram_defs.items():
+            full = f"{METRIC_PREFIX}{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} histogram")
+            for key, hist in list(self._histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"{full}_bucket{_format_labels(key, ('le', _format_bound(bound)))} {cumulative}")
+                lines.append(f"{full}_sum{_format_labels(key)} {hist.sum}")
+                lines.append(f"{full}_count{_format_labels(key)} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
 metrics_service = MetricsService()
@@ -1,11 +1,13 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import DuplicateKeyError
 from app.core.config import settings
+from app.core.tracing import trace_methods
 import re
 import datetime
 import logging
 
 
+@trace_methods("mongo")
 class MongoService:
     def __init__(self):
         self.client = AsyncIOMotorClient(settings.MONGO_URI)
@@ -155,6 +157,17 @@ class MongoService:
         cursor = collection.find({}, {"_id": 0})
         return await cursor.to_list(length=10)
 
+    async def list_persona_voice_ids(self) -> list[str]:
+        """
+        Distinct voice_ids across every user's personas.
+        """
+        voice_ids = set()
+        for user_id in await self.personality_db.list_collection_names():
+            voice_ids.update(
+                v for v in await self.personality_db[user_id].distinct("voice_id") if v
+            )
+        return list(voice_ids)
+
     async def delete_all_personality(self, user_id: str):
         collection = self.personality_db[user_id]
         await collection.drop()
@@ -4,7 +4,7 @@ import json
 import os
 import time
 import random
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from aiokafka import AIOKafkaConsumer
 import json
 
@@ -16,11 +16,18 @@ from app.api.schemas import LLMRequest, SessionSummary, SessionType
 from app.services.prompts import get_summary_update_prompt, get_tool_check_prompt, get_tool_selection_prompt, get_tool_args_prompt, format_history_for_prompt, get_no_tool_summary_prompt, get_clarification_summary_prompt, get_base_prompt, get_tool_summary_prompt, get_inappropriate_summary_prompt, get_gibberish_summary_prompt, get_about_agent_prompt
 from app.services.mcp_service import MCPClient
 from app.services.metrics_service import metrics_service
-from app.utils.random_utils import generate_random_id, deep_clean_tool_args, validate_and_clean_tool_args, get_tool_specific_prompt, persona_json_to_system_prompt, normalize_decision_tool
+from app.services.prompt_assembler import prompt_assembler
+from app.utils.random_utils import generate_random_id, deep_clean_tool_args, merge_tool_args, validate_and_clean_tool_args, get_tool_specific_prompt, normalize_decision_tool
 from app.utils.filter_suggestions import generate_filter_suggestions
-from app.utils.cache_persona import cache_persona
-from app.services.eleven_labs_audio_gen_service import eleven_labs_audio_gen_service
-from app.services.blob_storage_uploader_service import blob_storage_uploader_service
+from app.utils.cache_persona import cache_persona, DEFAULT_LANGUAGE_PROMPT
+from app.utils.person_profile_cache import person_profile_cache
+from app.utils.recommendation_store import recommendation_store
+from app.utils.tool_result_digest import digest_tool_result
+from app.utils.request_timeline import RequestTimeline
+from app.utils.llm_timing import encode_headers, decode_headers, llm_timing_breakdown, HEADER_TRACE_ID, HEADER_STEP, HEADER_DISPATCHED_AT
+from app.core.tracing import tracer
+from contextlib import contextmanager, nullcontext
+from app.services.audio_pipeline_service import audio_pipeline_service
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +52,15 @@ class OrchestratorService:
         self._pending: Dict[str, asyncio.Future] = {}
         self._lock = asyncio.Lock()
 
+        # Per-request stage timelines, removed when the request completes
+        self._timelines: Dict[str, RequestTimeline] = {}
+        # Requests whose final event was published, until their orchestration task ends
+        self._completed: Set[str] = set()
+        # request_id -> (step, monotonic dispatch time, wall-clock dispatch time) of the outstanding LLM call
+        self._llm_dispatched: Dict[str, tuple] = {}
+        # request_id -> queue/compute/delivery split of a response not yet picked up by its waiter
+        self._llm_timings: Dict[str, Dict[str, Any]] = {}
+
     async def start(self):
         if self.running: return
         self.running = True
@@ -58,6 +74,9 @@ class OrchestratorService:
         
         # 3. Start Ping Scheduler
         self._tasks.append(asyncio.create_task(self._ping_loop()))
+
+        # 4. Prewarm TTS cache with fallback replies in every persona voice
+        self._tasks.append(asyncio.create_task(self._prewarm_tts_cache()))
         
         logger.info("OrchestratorService started")
 
@@ -77,9 +96,23 @@ class OrchestratorService:
             
         logger.info("OrchestratorService stopped")
 
+    async def _prewarm_tts_cache(self):
+        try:
+            voice_ids = await mongo_service.list_persona_voice_ids()
+            await audio_pipeline_service.prewarm(voice_ids, FALLBACK_MESSAGES)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"TTS Prewarm Error: {e}")
+
     async def init_mcp(self):
         logger.info("MCP Initialization")
-        self._mcp_client = MCPClient(settings.MCP_SERVER_SCRIPT)
+        self._mcp_client = MCPClient(
+            settings.MCP_SERVER_SCRIPT,
+            pool_size=settings.MCP_POOL_SIZE,
+            health_check_interval=settings.MCP_HEALTH_CHECK_INTERVAL,
+            call_timeout=settings.MCP_CALL_TIMEOUT
+        )
         await self._mcp_client.__aenter__()
         await self._mcp_client.fetch_all_members()
         logger.info("MCP Initialization Completed")
@@ -95,9 +128,17 @@ class OrchestratorService:
             "extra": extra or {},
             "source": "orchestrator"
         }
-        # Send to response topic so SSE picks it up
-        # NOTE: SSE listens to Redis channel f"chat_status:{request_id}"
-        await redis_service.publish(f"chat_status:{request_id}", msg)
+        # Appended to the replayable stream chat_events:{request_id}
+        # and published live on f"chat_status:{request_id}" for SSE
+        await self._publish_event(request_id, msg)
+
+    async def _publish_event(self, request_id: str, msg: Dict):
+        await redis_service.publish_status_event(
+            request_id,
+            msg,
+            maxlen=settings.STATUS_STREAM_MAXLEN,
+            ttl=settings.STATUS_STREAM_TTL
+        )
 
     async def _wait_for_llm(self, request_id: str) -> Optional[Dict]:
         """Create a future and wait for consumer to resolve it"""
@@ -106,9 +147,13 @@ class OrchestratorService:
         async with self._lock:
             self._pending[request_id] = fut
         
+        resp = None
         try:
             # Wait for response with timeout
-            resp = await asyncio.wait_for(fut, timeout=60.0)
+            with tracer.span("llm.wait") as span:
+                resp = await asyncio.wait_for(fut, timeout=60.0)
+                if span and resp:
+                    span.set(compute=((resp.get("usage") or {}).get("total_duration")))
             return resp
         except asyncio.TimeoutError:
             logger.error(f"Timeout waiting for LLM: {request_id}")
@@ -116,10 +161,72 @@ class OrchestratorService:
         finally:
             async with self._lock:
                 self._pending.pop(request_id, None)
+            self._record_llm_stage(request_id, resp)
+
+    def _record_llm_stage(self, request_id: str, resp: Optional[Dict]):
+        """Add the LLM round trip, split by the consumer into queue/compute/delivery, to the timeline."""
+        # Still present when the response never arrived
+        dispatched = self._llm_dispatched.pop(request_id, None)
+        timing = self._llm_timings.pop(request_id, None)
+        timeline = self._timelines.get(request_id)
+        if not timeline:
+            return
+        if timing:
+            step, t0, wall = timing["step"], timing["t0"], timing["wall"]
+        elif dispatched:
+            step, t0, _ = dispatched
+            wall = time.monotonic() - t0
+        else:
+            return
+
+        split = {
+            part: round(timing[part], 4) if timing and timing.get(part) is not None else None
+            for part in ("queue", "compute", "delivery")
+        }
+        timeline.add(f"llm:{step}", wall, started_at=t0, step=step, **split, timed_out=resp is None)
+
+    def _record_llm_response_timing(self, request_id: str, data: Dict, msg) -> Optional[Dict[str, Any]]:
+        """Called by the consumer on arrival of an awaited response, before the waiting task resumes."""
+        dispatched = self._llm_dispatched.pop(request_id, None)
+        if not dispatched:
+            return None
+        step, t0, dispatched_at = dispatched
+        wall = time.monotonic() - t0
+        timing = llm_timing_breakdown(
+            dispatched_at,
+            data.get("usage"),
+            headers=decode_headers(msg.headers),
+            record_timestamp_ms=msg.timestamp,
+            record_timestamp_type=msg.timestamp_type,
+        )
+        metrics_service.record_llm_timing(step, timing["queue"], timing["compute"], timing["delivery"])
+        return {"step": step, "t0": t0, "wall": wall, **timing}
+
+    @contextmanager
+    def _stage(self, request_id: str, name: str):
+        timeline = self._timelines.get(request_id)
+        with (timeline.stage(name) if timeline else nullcontext()):
+            yield
 
-    async def _dispatch_llm_request(self, req: LLMRequest):
+    async def _dispatch_llm_request(self, req: LLMRequest, awaited: bool = True):
+        """Send an LLM step to the workers. Only `awaited` requests are timed, fire-and-forget ones have no waiter."""
         metrics_service.record_llm_job_start()
-        await kafka_service.send_request(settings.KAFKA_CHAT_TOPIC, req.model_dump())
+        metrics_service.record_llm_request(req.step)
+        req.dispatched_at = time.time()
+        req.trace_id = tracer.current_trace_id() or req.request_id
+        if awaited:
+            self._llm_dispatched[req.request_id] = (req.step, time.monotonic(), req.dispatched_at)
+        headers = encode_headers({
+            HEADER_TRACE_ID: req.trace_id,
+            HEADER_STEP: req.step,
+            HEADER_DISPATCHED_AT: req.dispatched_at,
+        })
+        try:
+            with tracer.span("llm.dispatch", step=req.step):
+                await kafka_service.send_request(settings.KAFKA_CHAT_TOPIC, req.model_dump(), headers=headers)
+        except Exception:
+            self._llm_dispatched.pop(req.request_id, None)
+            raise
 
     # --------------------------
     # Core Logic
@@ -130,10 +237,13 @@ class OrchestratorService:
         If selected_filters is provided, bypasses LLM steps and directly executes search.
         """
         request_id = f"REQCHAT-{generate_random_id(user_id)}"
+        timeline = RequestTimeline()
         
         # Store initial history
         user_msg = {"role": "user", "content": query}
         await self.append_history(user_id, user_msg, session_id)
+        # Registered only once the orchestration task that removes it is sure to start
+        self._timelines[request_id] = timeline
         
         # Metrics: Start Request
         metrics_service.record_request_start()
@@ -144,6 +254,11 @@ class OrchestratorService:
         return request_id
 
     async def _orchestrate(self, request_id: str, user_id: str, query: str, session_id: Optional[str] = None, person_id: Optional[str] = None, personality_id: Optional[str] = None, session_type: Optional[str] = None, recommendation_ids: Optional[List[str]] = None, selected_filters: Optional[dict] = None, image_url: Optional[str] = None):
+        # The request_id doubles as trace id: /monitoring/traces/{request_id}
+        with tracer.trace("chat.request", trace_id=request_id, user_id=user_id, session_type=session_type):
+            await self._run_orchestration(request_id, user_id, query, session_id, person_id, personality_id, session_type, recommendation_ids, selected_filters, image_url)
+
+    async def _run_orchestration(self, request_id: str, user_id: str, query: str, session_id: Optional[str] = None, person_id: Optional[str] = None, personality_id: Optional[str] = None, session_type: Optional[str] = None, recommendation_ids: Optional[List[str]] = None, selected_filters: Optional[dict] = None, image_url: Optional[str] = None):
         tool_result_str = ""
         tool_args = None
         structured_result = None
@@ -154,35 +269,18 @@ class OrchestratorService:
             logger.info(f"Orchestration started for {request_id} and user {user_id} and session {session_id}")
             await self._send_status(request_id, "RECEIVED")
             
-            # 1. Prepare Context
-            history, session_summary, session = await self._prepare_context(user_id, session_id)
-
-            # 1.1 Fetch Person Profile if person_id provided
-            user_profile = None
-            if person_id:
-                try:
-                    # 1. Check Redis Cache
-                    user_profile = await redis_service.get_person_profile(user_id, person_id)
-                    
-                    if user_profile:
-                        logger.info(f"Cache hit for person profile {person_id}")
-                    else:
-                        # 2. Fetch from Mongo
-                        logger.info(f"Cache miss for person profile {person_id}, fetching from Mongo")
-                        projection = {"name": 1, "age": 1, "gender": 1, "address": 1, "country": 1, "tags": 1}
-                        user_profile = await mongo_service.get_profile(user_id, person_id, projection)
-                        
-                        if user_profile:
-                            # 3. Save to Redis Cache (TTL 1 day)
-                            # Convert _id to str if present to ensure JSON serialization
-                             if "_id" in user_profile:
-                                 user_profile["_id"] = str(user_profile["_id"])
-                                 
-                             await redis_service.save_person_profile_cache(user_id, person_id, user_profile)
-                             logger.info(f"Cached person profile for {person_id}")
-
-                except Exception as e:
-                    logger.error(f"Failed to fetch person profile {person_id}: {e}")
+            with self._stage(request_id, "context_load"):
+                # 1. Prepare Context
+                history, session_summary, session = await self._prepare_context(user_id, session_id)
+
+                # 1.1 Fetch Person Profile if person_id provided
+                user_profile = None
+                if person_id:
+                    try:
+                        # Near-cache -> Redis -> Mongo
+                        user_profile = await person_profile_cache.get(user_id, person_id)
+                    except Exception as e:
+                        logger.error(f"Failed to fetch person profile {person_id}: {e}")
 
             
             
@@ -229,6 +327,7 @@ class OrchestratorService:
                 # normalize_decision_tool returns a dict.
                 if not decision:
                      decision = tool_required.get("decision", "no_tool")
+                metrics_service.record_decision(decision)
 
                 logger.info(f"Step 1 result: Tool Required Decision - {decision} and type is {type(decision)}")
 
@@ -297,43 +396,40 @@ class OrchestratorService:
 
         except Exception as e:
             logger.exception(f"Orchestration Error {request_id}: {e}")
-            await self._handle_error_response(request_id, user_id, session_id, query, str(e))
+            await self._handle_error_response(request_id, user_id, session_id, query, str(e), session_type, personality_id)
+        finally:
+            # Left behind when a step failed between dispatching and waiting
+            self._llm_dispatched.pop(request_id, None)
+            self._llm_timings.pop(request_id, None)
+            timeline = self._timelines.pop(request_id, None)
+            if timeline and request_id not in self._completed:
+                # Neither the answer nor the fallback got published
+                metrics_service.record_request_complete(duration=timeline.elapsed(), error=True)
+            self._completed.discard(request_id)
 
     # --------------------------
     # Orchestration Steps
     # --------------------------
     def _get_recommendation_details(self, recommendation_ids: List[str]) -> str:
         try:
-            file_path = os.path.abspath("app/mcp/recommendations.json")
-            if not os.path.exists(file_path):
-                logger.error(f"Recommendations file not found at {file_path}")
-                return ""
-
-            with open(file_path, "r") as f:
-                data = json.load(f)
-
             combined_attributes = {}
 
-            # Traverse JSON
-            for category, genders in data.items():
-                for gender, profiles in genders.items():
-                    for profile in profiles:
-                        if profile.get("id") in recommendation_ids:
-                            logger.info(f"profile {profile}")
+            for profile in recommendation_store.get_profiles(recommendation_ids):
+                logger.info(f"profile {profile}")
 
-                            image_attributes = profile.get("image_attributes", {})
+                image_attributes = profile.get("image_attributes", {})
 
-                            for key, value in image_attributes.items():
-                                if not value:
-                                    continue
+                for key, value in image_attributes.items():
+                    if not value:
+                        continue
 
-                                # Normalize key formatting
-                                key_clean = key.replace("_", " ")
+                    # Normalize key formatting
+                    key_clean = key.replace("_", " ")
 
-                                if key_clean not in combined_attributes:
-                                    combined_attributes[key_clean] = set()
+                    if key_clean not in combined_attributes:
+                        combined_attributes[key_clean] = set()
 
-                                combined_attributes[key_clean].add(value)
+                    combined_attributes[key_clean].add(value)
 
             if not combined_attributes:
                 return ""
@@ -373,11 +469,13 @@ class OrchestratorService:
     async def _step_check_tool(self, request_id: str, user_id: str, query: str, history: List[Dict], session: Any) -> bool:
         """Step 1: Determine if tool is required."""
         # Inject History
-        tool_list = self._mcp_client.get_sections("tools")
-        formatted_history=format_history_for_prompt(history)
-
-        formatted_tool_descriptions = self._mcp_client.format_tool_descriptions_for_llm(tool_list)
-        check_system_prompt = get_tool_check_prompt(formatted_history, formatted_tool_descriptions)
+        formatted_tool_descriptions = self._mcp_client.get_tool_descriptions()
+        check_system_prompt = prompt_assembler.assemble(
+            "check_tool_required",
+            lambda h, s, t: get_tool_check_prompt(h, t),
+            history=history,
+            tool_text=formatted_tool_descriptions
+        )
 
         llm_req = LLMRequest(
             request_id=request_id,
@@ -407,11 +505,14 @@ class OrchestratorService:
 
     async def _step_select_required_tool(self, request_id: str, user_id: str, query: str, history: List[Dict], session: Any, session_id: Optional[str] = None) -> Optional[str]:
         """Step 2: If tool is required, select the most appropriate tool."""
-        tool_list = self._mcp_client.get_sections("tools")
-        formatted_tool_descriptions = self._mcp_client.format_tool_descriptions_for_llm(tool_list)
+        formatted_tool_descriptions = self._mcp_client.get_tool_descriptions()
 
-        formatted_history = format_history_for_prompt(history)
-        selection_prompt = get_tool_selection_prompt(formatted_tool_descriptions, formatted_history)
+        selection_prompt = prompt_assembler.assemble(
+            "select_tool",
+            lambda h, s, t: get_tool_selection_prompt(t, h),
+            history=history,
+            tool_text=formatted_tool_descriptions
+        )
 
         llm_req = LLMRequest(
             request_id=request_id,
@@ -438,7 +539,7 @@ class OrchestratorService:
         return resp.get("selected_tool")
     
     def _get_selected_tool_meta(self, tool_list, selected_tool):
-        meta = next((t for t in tool_list if t.get("name") == selected_tool), None)
+        meta = self._mcp_client.get_tool_meta(selected_tool)
         if not meta:
             raise Exception(f"Selected tool {selected_tool} not found in MCP tools")
         return meta
@@ -476,7 +577,9 @@ class OrchestratorService:
         final_tool_args["page"] = final_tool_args.get("page", 1)
 
         # Validate & clean
-        final_tool_args = validate_and_clean_tool_args(final_tool_args, tool_schema)
+        final_tool_args = validate_and_clean_tool_args(
+            final_tool_args, tool_schema, self._mcp_client.get_tool_enum_sets(selected_tool)
+        )
 
         # Persist cleaned state
         full_state = await redis_service.get_tool_state(user_id, session_id)
@@ -606,18 +709,23 @@ class OrchestratorService:
         structured_result = None
 
         tool_list = self._mcp_client.get_sections("tools")
-        selected_tool_meta = next((t for t in tool_list if t.get("name") == selected_tool), None)
+        selected_tool_meta = self._mcp_client.get_tool_meta(selected_tool)
         
         if not selected_tool_meta:
             raise Exception(f"Selected tool {selected_tool} not found in MCP tools")
 
-        tool_schema = json.dumps(selected_tool_meta.get("input_schema", {}), indent=2)
+        tool_schema = self._mcp_client.get_tool_schema_json(selected_tool)
         formatted_history = format_history_for_prompt(history)
         
         # Get Prompt for targeted argument extraction
         tool_specific_prompt = get_tool_specific_prompt(selected_tool)
 
-        args_system_prompt = get_tool_args_prompt(selected_tool, tool_specific_prompt, tool_schema, formatted_history)
+        # The schema is never trimmed here, only history
+        args_system_prompt = prompt_assembler.assemble(
+            "get_tool_args",
+            lambda h, s, t: get_tool_args_prompt(selected_tool, tool_specific_prompt, tool_schema, h),
+            history=history
+        )
         
         logger.info(f"DEBUG HISTORY FOR TOOL ARGS:\n{formatted_history}")
 
@@ -681,21 +789,24 @@ class OrchestratorService:
                 
                 logger.info(f"Executing tool {selected_tool} with args {final_tool_args}")
 
-                res_mcp = await self._mcp_client.call_tool(selected_tool, final_tool_args)
+                with self._stage(request_id, "tool_call"):
+                    res_mcp = await self._mcp_client.call_tool(selected_tool, final_tool_args)
 
                 structured_result = self._parse_mcp_output(res_mcp)
 
         
-                structured_result = await self._handle_auto_reset_and_pagination(
-                    structured_result,
-                    selected_tool,
-                    user_id,
-                    session_id,
-                    final_tool_args
-                )
+                with self._stage(request_id, "tool_followup"):
+                    structured_result = await self._handle_auto_reset_and_pagination(
+                        structured_result,
+                        selected_tool,
+                        user_id,
+                        session_id,
+                        final_tool_args
+                    )
 
-                tool_result_str = json.dumps(structured_result, default=str)
-                logger.info(f"Tool execution completed for {selected_tool}. Result: {tool_result_str}")
+                # Summarize only needs a digest; the full result goes to the client
+                tool_result_str = digest_tool_result(structured_result, final_tool_args)
+                logger.info(f"Tool execution completed for {selected_tool}. Result digest: {tool_result_str}")
 
                 await self.append_history(
                     user_id,
@@ -731,19 +842,21 @@ class OrchestratorService:
             await self._send_status(request_id, f"TOOL_SELECTED: {selected_tool}")
             
             # Execute tool
-            res_mcp = await self._mcp_client.call_tool(selected_tool, final_tool_args)
+            with self._stage(request_id, "tool_call"):
+                res_mcp = await self._mcp_client.call_tool(selected_tool, final_tool_args)
             structured_result = self._parse_mcp_output(res_mcp)
             
             # Handle pagination and auto-reset
-            structured_result = await self._handle_auto_reset_and_pagination(
-                structured_result,
-                selected_tool,
-                user_id,
-                session_id,
-                final_tool_args
-            )
+            with self._stage(request_id, "tool_followup"):
+                structured_result = await self._handle_auto_reset_and_pagination(
+                    structured_result,
+                    selected_tool,
+                    user_id,
+                    session_id,
+                    final_tool_args
+                )
             
-            tool_result_str = json.dumps(structured_result, default=str)
+            tool_result_str = digest_tool_result(structured_result, final_tool_args)
             logger.info(f"Direct tool execution completed for {selected_tool}")
             
             # Save to history
@@ -765,30 +878,27 @@ class OrchestratorService:
 
     async def _step_summarize(self, request_id: str, user_id: str, query: str, history: List[Dict], session_summary: Any, tool_result_str: Optional[str], tool_args: Any, structured_result: Any, session_id: Optional[str] = None, tool_required: bool = False, decision: Optional[str] = None, user_profile: Optional[Dict] = None, personality_id: Optional[str] = None, session_type: Optional[str] = None, selected_tool: Optional[str] = None):
         """Step 3: Generate final answer."""
+        t_prepare = time.monotonic()
         # Prepare Context
 
-        tool_list = self._mcp_client.get_sections("tools")
-
-        formatted_history = format_history_for_prompt(history)
-        formatted_tool_descriptions = self._mcp_client.format_tool_descriptions_for_llm(tool_list)
+        formatted_tool_descriptions = self._mcp_client.get_tool_descriptions()
 
         personality = get_base_prompt()
         voice_id = None
-        language=""
-        identity=None
+        LANGUAGE_PROMPT = DEFAULT_LANGUAGE_PROMPT
         filter_suggestions = None
         if personality_id:
-            persona = await cache_persona.get_persona(user_id, personality_id)
-            if persona:
-                logger.info(f"Personality found for {user_id} and {personality_id}")
-                personality = persona_json_to_system_prompt(persona.get("personality"))
-                voice_id = persona.get("voice_id")
-                identity = persona.get("personality", {}).get("identity", {})
-                if identity:
-                    language = f"- Languages: {', '.join(identity['languages'])}"
-
+            # System prompt and language directive are compiled once per persona version
+            compiled = await cache_persona.get_compiled_persona(user_id, personality_id)
+            logger.info(f"Personality found for {user_id} and {personality_id}")
+            personality = compiled["system_prompt"]
+            voice_id = compiled["voice_id"]
+            LANGUAGE_PROMPT = compiled["language_prompt"]
+
+        # Each branch picks a renderer; the assembler fills history, summary and tool text under budget
+        tool_text = formatted_tool_descriptions
         if decision == 'ask_clarification':
-            default_prompt = get_clarification_summary_prompt(formatted_history, personality, session_summary, user_profile,formatted_tool_descriptions)
+            render = lambda h, s, t: get_clarification_summary_prompt(h, personality, s, user_profile, t)
         elif decision == 'tool':
             if structured_result and isinstance(structured_result, dict):
                 is_tool_result_check = len(structured_result.get("docs", [])) > 0
@@ -807,23 +917,27 @@ class OrchestratorService:
                 except Exception as e:
                     logger.error(f"Error generating filter suggestions: {e}")
             
-            default_prompt = get_tool_summary_prompt(formatted_history, is_tool_result_check, tool_result_str, personality, session_summary, user_profile)
+            # Tool summary prompt doesn't embed tool descriptions
+            tool_text = None
+            render = lambda h, s, t: get_tool_summary_prompt(h, is_tool_result_check, tool_result_str, personality, s, user_profile)
         elif decision == 'inappropriate_block':
-            default_prompt = get_inappropriate_summary_prompt(formatted_history, personality, session_summary, user_profile,formatted_tool_descriptions)
+            render = lambda h, s, t: get_inappropriate_summary_prompt(h, personality, s, user_profile, t)
         elif decision == 'gibberish':
-            default_prompt = get_gibberish_summary_prompt(formatted_history, personality, session_summary, user_profile,formatted_tool_descriptions)
+            render = lambda h, s, t: get_gibberish_summary_prompt(h, personality, s, user_profile, t)
         elif decision == 'about_agent':
-            default_prompt = get_about_agent_prompt(formatted_history, personality, session_summary, user_profile,formatted_tool_descriptions)
+            render = lambda h, s, t: get_about_agent_prompt(h, personality, s, user_profile, t)
         else:
-            default_prompt = get_no_tool_summary_prompt(formatted_history, personality, session_summary, user_profile,formatted_tool_descriptions)
+            render = lambda h, s, t: get_no_tool_summary_prompt(h, personality, s, user_profile, t)
+
+        default_prompt = prompt_assembler.assemble(
+            "summarize",
+            render,
+            history=history,
+            session_summary=session_summary,
+            tool_text=tool_text
+        )
 
         SHORT_ANSWER_PROMPT="MANDATORY: ANSWER IN ONE SENTENCE. IF ABSOLUTELY NECESSARY, USE TWO SENTENCES. DO NOT ELABORATE OR PROVIDE UNNECESSARY DETAILS."
-        # LANGUAGE_PROMPT=f"MANDATORY: RESPOND ONLY IN {language}. DO NOT USE ANY OTHER LANGUAGE OR MIX LANGUAGES IN YOUR RESPONSE."
-        if language:
-            LANGUAGE_PROMPT = f"MANDATORY: SPEAK ONLY IN {', '.join(identity['languages'])}. DO NOT USE ANY OTHER LANGUAGE OR MIX LANGUAGES IN YOUR RESPONSE."
-        else:
-            LANGUAGE_PROMPT = "MANDATORY: SPEAK ONLY IN ENGLISH. DO NOT USE ANY OTHER LANGUAGE OR MIX LANGUAGES IN YOUR RESPONSE."
-
         default_prompt=default_prompt+SHORT_ANSWER_PROMPT+LANGUAGE_PROMPT
 
         llm_req = LLMRequest(
@@ -835,6 +949,10 @@ class OrchestratorService:
             response_topic=settings.KAFKA_RESPONSE_TOPIC,
             metadata={"user_id": user_id}
         )
+        timeline = self._timelines.get(request_id)
+        if timeline:
+            # Persona, suggestions and prompt assembly before the summarize LLM call
+            timeline.add("summarize_prepare", time.monotonic() - t_prepare, started_at=t_prepare)
         t0 = time.time()
         await self._dispatch_llm_request(llm_req)
         await self._send_status(request_id, "LLM_SUMMARIZING")
@@ -851,7 +969,7 @@ class OrchestratorService:
             await self._complete_request(user_id, request_id, resp.get("final_answer"), structured_result, tool_args, session_id, query, tool_required, None, session_type, voice_id, selected_tool, suggestions_to_pass)
         else:
             await self._send_status(request_id, "NO_SUMMARY")
-            await self._handle_error_response(request_id, user_id, session_id, query, "No Summary Generated")
+            await self._handle_error_response(request_id, user_id, session_id, query, "No Summary Generated", session_type, personality_id)
 
     async def _complete_request(self, user_id: str, request_id: str, answer: str, structured, tool_args=None, session_id: Optional[str] = None, query: str = None, tool_required: bool = False, error: Optional[str] = None, session_type: Optional[str] = None, voice_id: Optional[str] = None, selected_tool: Optional[str] = None, filter_suggestions: Optional[List[dict]] = None):
         # Save to history
@@ -870,15 +988,22 @@ class OrchestratorService:
         # Include filter suggestions if available
         if filter_suggestions:
             msg["filter_suggestions"] = filter_suggestions
-        await redis_service.publish(f"chat_status:{request_id}", msg)
+
+        # Speech sessions get the audio later as a separate AUDIO_READY event
+        if session_type == "2":
+            msg["audio_pending"] = True
+
+        # Completion is counted once, even if an error path tries to complete again
+        timeline = self._timelines.pop(request_id, None)
+
+        t_publish = time.monotonic()
+        await self._publish_event(request_id, msg)
+        self._completed.add(request_id)
+        if timeline:
+            timeline.add("publish", time.monotonic() - t_publish, started_at=t_publish)
         logger.info(f"Completed request {request_id}")
         if session_type == "2":
-            # msg["audio_clip"]=text_to_audio(answer,voice_id)
-            audio_stream = eleven_labs_audio_gen_service.text_to_audio(answer, voice_id)
-            if audio_stream:
-                audio_url = blob_storage_uploader_service.generate_url(audio_stream)
-                if audio_url:
-                    msg["audio_clip"] = audio_url
+            audio_pipeline_service.submit(request_id, user_id, answer, voice_id)
         
         # Log to MongoDB
         log_data = {
@@ -893,22 +1018,21 @@ class OrchestratorService:
             "complete": True,
             "final_answer": answer,
             "tool_result": structured,
-            "voice_clip": msg.get("audio_clip", ""),
             "error": error,
             "metadata": {"user_id": user_id},
             "filter_suggestions": filter_suggestions if filter_suggestions else None,
+            "timeline": timeline.to_dict() if timeline else None,
             "timestamp": time.time()
         }
+        if session_type != "2":
+            # For speech sessions the audio pipeline sets voice_clip when the upload finishes
+            log_data["voice_clip"] = ""
         asyncio.create_task(mongo_service.save_chat_log(user_id, log_data))
         
-        # Metrics: Complete
-        # We don't have exact duration here easily unless we passed start time. 
-        # For end-to-end, we can track it if we stored start time in a map or context.
-        # But for now let's just mark completion to balance active_requests.
-        # Ideally, we should add `timestamp` to `handle_request` return or separate tracking.
-        # Let's assume we want E2E. Logic: `time.time() - log_data['timestamp']` (approx, since timestamp is creation time)
-        
-        metrics_service.record_request_complete(duration=0.0) # Placeholder duration or calc if possible
+        # Metrics: Complete (end-to-end from handle_request, monotonic)
+        if timeline:
+            metrics_service.record_request_complete(duration=log_data["timeline"]["total"], error=bool(error))
+            metrics_service.record_request_timeline(timeline.stages)
         
         # Trigger Background Summary Update
         asyncio.create_task(self._background_summary_update(user_id, query, answer, session_id))
@@ -941,7 +1065,7 @@ class OrchestratorService:
                 response_topic=settings.KAFKA_RESPONSE_TOPIC,
                 metadata={"user_id": user_id, "type": "session_update", "session_id": session_id}                                                                                                         
             )
-            await self._dispatch_llm_request(llm_req)
+            await self._dispatch_llm_request(llm_req, awaited=False)
             logger.info("Summary Update Dispatched")
             # The response will verify in _response_consumer_loop? 
             # Yes, we need to handle it there.
@@ -994,6 +1118,9 @@ class OrchestratorService:
                     async with self._lock:
                         fut = self._pending.get(rid)
                         if fut and not fut.done():
+                            timing = self._record_llm_response_timing(rid, data, msg)
+                            if timing:
+                                self._llm_timings[rid] = timing
                             fut.set_result(data)
                             
                             # Metrics: LLM Job End
@@ -1003,6 +1130,9 @@ class OrchestratorService:
                             duration = usage.get("total_duration", 0) if usage else 0
                             metrics_service.increment_tokens(tokens, duration)
                             metrics_service.record_llm_job_end(duration, tokens)
+                        else:
+                            # Late or duplicate response, or one nobody waits on: not timed
+                            self._llm_dispatched.pop(rid, None)
 
                 # Check for Session Update Response
                 if rid and rid.startswith("SUMMARY-") and data.get("custom_response"):
@@ -1072,10 +1202,22 @@ class OrchestratorService:
         except Exception as e:
             logger.error(f"Failed to save session summary: {e}", exc_info=True)
 
-    async def _handle_error_response(self, request_id: str, user_id: str, session_id: Optional[str], query: str, error_msg: str):
+    async def _handle_error_response(self, request_id: str, user_id: str, session_id: Optional[str], query: str, error_msg: str, session_type: Optional[str] = None, personality_id: Optional[str] = None):
         """Handle orchestration errors by sending a fallback response."""
+        if request_id in self._completed:
+            logger.warning(f"Request {request_id} already completed, not sending fallback for: {error_msg}")
+            return
+
         fallback_msg = random.choice(FALLBACK_MESSAGES)
         logger.info(f"Sending fallback response for {request_id}: {fallback_msg}")
+
+        # Speech sessions still get the fallback voiced (prewarmed in the TTS cache)
+        voice_id = None
+        if session_type == "2" and personality_id:
+            try:
+                voice_id = (await cache_persona.get_compiled_persona(user_id, personality_id))["voice_id"]
+            except Exception as e:
+                logger.error(f"Failed to load persona voice for fallback: {e}")
         
         # We reuse _complete_request to ensure logs, history, and status events are consistent
         # We pass tool_required=False and empty structured result
@@ -1088,65 +1230,22 @@ class OrchestratorService:
             session_id=session_id,
             query=query,
             tool_required=False,
-            error=error_msg
+            error=error_msg,
+            session_type=session_type,
+            voice_id=voice_id
         )
-        metrics_service.record_request_complete(duration=0.0, error=True)
 
     async def _merge_tool_args(self, user_id: str, session_id: Optional[str], selected_tool: str, new_args: dict) -> dict:
         """
         Helper method to merge new tool args with persisted state.
         Returns the final merged dictionary for the SPECIFIC tool.
         """
-        final_tool_args = {}
-        final_tool_args = new_args.copy()  # Start with what LLM extracted
-
         # 1. Load full nested state
         full_state = await redis_service.get_tool_state(user_id, session_id)
-        
+
         # 2. Extract specific tool section
         current_tool_args = full_state.get(selected_tool, {})
 
-        # 🔹 NEW: Normalize page intent
-        if "page" in final_tool_args:
-            prev_page = current_tool_args.get("page", 1)
-
-            if final_tool_args["page"] > 0:
-                # Next page intent
-                final_tool_args["page"] = prev_page + 1
-            elif final_tool_args["page"] == 0:
-                # page: 0 or anything else → reset
-                final_tool_args["page"] = 1
-        
-        # 3. Check for Reset
-        if new_args.get("_reset"):  # Reset if _reset is present
-            current_tool_args = {}
-            final_tool_args.pop("_reset", None)
-        
-        # 4. Merge Logic
-        # Start with current (baseline for this tool)
-        merged = current_tool_args.copy()
-        
-        # Apply updates from LLM (new_args)
-        for k, v in final_tool_args.items():
-            if v is None:
-                # Explicit removal
-                merged.pop(k, None)
-            else:
-                # Update/Add
-                merged[k] = v
-        
-        # 5. Check for Filter Changes (Reset Page)
-        # If any attribute changed EXCEPT 'page' or '_reset' or 'user_id', we must reset page to 1.
-        filters_changed = False
-        for k in final_tool_args:
-            if k in ["page", "_reset", "user_id"]:
-                continue
-            filters_changed = True
-            break
-        
-        if filters_changed:
-            merged["page"] = 1
-        
-        return merged
+        return merge_tool_args(current_tool_args, new_args)
 
 orchestrator_service = OrchestratorService()
\ No newline at end of file
@@ -0,0 +1,148 @@
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.prompts import format_history_for_prompt
+from app.services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio for English prompt text
+CHARS_PER_TOKEN = 4
+
+# Per-step input budgets (tokens). Steps not listed fall back to DEFAULT_TOKEN_BUDGET.
+STEP_TOKEN_BUDGETS = {
+    "check_tool_required": 4000,
+    "select_tool": 3000,
+    "get_tool_args": 6000,
+    "summarize": 4000,
+}
+DEFAULT_TOKEN_BUDGET = 4000
+
+TRUNCATION_MARKER = "\n...(truncated)"
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _summary_tokens(
+    render: Callable[[str, Any, Optional[str]], str],
+    history_str: str,
+    session_summary: Any,
+    tool_text: Optional[str],
+    prompt: Optional[str] = None,
+) -> int:
+    """
+    Tokens the template spends on the summary: the prompt rendered with it
+    minus the prompt rendered without it. Templates format the summary
+    differently, so it is measured rather than rebuilt here.
+    """
+    if not session_summary:
+        return 0
+    if prompt is None:
+        prompt = render(history_str, session_summary, tool_text)
+    chars = len(prompt) - len(render(history_str, None, tool_text))
+    return chars // CHARS_PER_TOKEN + 1 if chars > 0 else 0
+
+
+class PromptAssembler:
+    """
+    Builds step prompts under a token budget.
+
+    `render(history_str, session_summary, tool_text)` is a closure around one
+    of the prompt builders in prompts.py. The assembler renders it once with
+    the full sections, and if the estimate is over budget it trims, in order:
+    the oldest history messages, the oldest session summary points, and
+    finally the tool text. Persona and fixed instructions are never trimmed.
+    """
+
+    def assemble(
+        self,
+        step: str,
+        render: Callable[[str, Any, Optional[str]], str],
+        history: Optional[List[Dict]] = None,
+        session_summary: Any = None,
+        tool_text: Optional[str] = None,
+        budget: Optional[int] = None,
+    ) -> str:
+        budget = budget or STEP_TOKEN_BUDGETS.get(step, DEFAULT_TOKEN_BUDGET)
+        history = list(history or [])
+
+        history_str = format_history_for_prompt(history)
+        prompt = render(history_str, session_summary, tool_text)
+        total = estimate_tokens(prompt)
+
+        sections = {
+            "history": estimate_tokens(history_str),
+            "summary": _summary_tokens(render, history_str, session_summary, tool_text, prompt),
+            "tools": estimate_tokens(tool_text),
+        }
+        trimmed = False
+
+        if total > budget:
+            trimmed = True
+            # Everything that isn't a trimmable section stays as-is
+            overhead = total - sum(sections.values())
+            available = max(0, budget - overhead)
+
+            # 1. History: drop oldest messages, always keep the latest one
+            while len(history) > 1 and sum(sections.values()) > available:
+                history = history[1:]
+                history_str = format_history_for_prompt(history)
+                sections["history"] = estimate_tokens(history_str)
+
+            # 2. Session summary: drop oldest points, then the summary entirely
+            if session_summary and sum(sections.values()) > available:
+                session_summary = self._trim_summary(
+                    session_summary,
+                    available - sections["history"] - sections["tools"],
+                    lambda summary: _summary_tokens(render, history_str, summary, tool_text),
+                )
+                sections["summary"] = _summary_tokens(render, history_str, session_summary, tool_text)
+
+            # 3. Tool text: hard truncate to what's left
+            if tool_text and sum(sections.values()) > available:
+                remaining = max(0, available - sections["history"] - sections["summary"])
+                tool_text = tool_text[:remaining * CHARS_PER_TOKEN] + TRUNCATION_MARKER
+                sections["tools"] = estimate_tokens(tool_text)
+
+            prompt = render(history_str, session_summary, tool_text)
+            total = estimate_tokens(prompt)
+            logger.info(
+                f"Prompt for step {step} trimmed to ~{total} tokens (budget {budget}, sections {sections})"
+            )
+
+        metrics_service.record_prompt_size(step, total, sections, trimmed)
+        return prompt
+
+    def _trim_summary(self, session_summary: Any, max_tokens: int, cost: Callable[[Any], int]) -> Any:
+        """Drop the oldest points until `cost(summary)` fits, or return None when nothing useful does."""
+        if max_tokens <= 0:
+            return None
+
+        important_points = list(session_summary.important_points)
+        user_details = list(session_summary.user_details)
+
+        def size():
+            return cost(session_summary.model_copy(
+                update={"important_points": important_points, "user_details": user_details}
+            ))
+
+        # The prompt builders only render a summary that has important points,
+        # so user details go first and the newest important point is kept
+        while user_details and size() > max_tokens:
+            user_details.pop(0)
+        while len(important_points) > 1 and size() > max_tokens:
+            important_points.pop(0)
+
+        if not important_points or size() > max_tokens:
+            return None
+
+        return session_summary.model_copy(
+            update={"important_points": important_points, "user_details": user_details}
+        )
+
+
+prompt_assembler = PromptAssembler()
@@ -834,7 +834,7 @@ Personality (primary source of agent information):
 {personality}
 
 Session Summary:
-{session_summary}
+{session_summary if session_summary else ""}
 
 User Profile:
 {user_profile or ""}
@@ -5,12 +5,158 @@ from redis.commands.search.index_definition import IndexDefinition, IndexType
 from redis.commands.search.query import Query
 from app.core.config import settings
 from app.api.schemas import SessionSummary
+from app.core.tracing import trace_methods
 import numpy as np
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def build_filter_query(filters: dict = None, geo_filter: dict = None) -> str:
+    """RediSearch pre-filter expression for the profile index, "*" when unfiltered."""
+    query_parts = []
+
+    # 1. Attribute Filters
+    if filters is not None:
+        for field, value in filters.items():
+            if value:
+                 if isinstance(value, dict) and ("min" in value or "max" in value):
+                     # Numeric Range: @field:[min max]
+                     min_val = value.get("min", "-inf")
+                     max_val = value.get("max", "+inf")
+                     query_parts.append(f"@{field}:[{min_val} {max_val}]")
+                 elif isinstance(value, list):
+                     # OR-query for list of values: @field:{v1 | v2 ...}
+                     # Escape values if needed, but assuming simple alphanumeric for now
+                     val_str = " | ".join(str(v) for v in value)
+                     query_parts.append(f"@{field}:{{{val_str}}}")
+                 else:
+                     # Simple TAG support: @field:{value}
+                     query_parts.append(f"@{field}:{{{value}}}")
+    # 2. Geo Filter
+    if geo_filter:
+        # Syntax: @geo_field:[lon lat radius unit]
+        # unit: m, km, ft, mi
+        query_parts.append(
+            f"@geo_location:[{geo_filter['longitude']} {geo_filter['latitude']} {geo_filter['radius_km']} km]"
+        )
+
+    # Combine filters or default to *
+    return " ".join(query_parts) if query_parts else "*"
+
+
+def profile_document(profile_data: dict, embedding: list[float]) -> dict:
+    """
+    The RedisJSON document stored for a profile (modifies `profile_data`).
+    """
+    # Prepare data for RedisJSON
+    # We need to make sure the embedding is part of the JSON document
+    # And geo_location is formatted correctly for Redis (lon, lat string) OR RedisJSON supports object
+    # RedisJSON supports object if mapped to GeoField: "13.11,12.11" string format is common for older versions, 
+    # but modern RediSearch with JSON supports GeoJSON or "lon, lat" string.
+    # Let's ensure geo_location is in a compatible format for query if needed, 
+    # but pure JSON object {"latitude": x, "longitude": y} might need transformation for GEO indexing if the backend expects "lon,lat".
+    # Standard Redis Geo uses "lon,lat". Let's inject a "lon,lat" string field for simpler usage if standard JSON object fails,
+    # but for now let's hope the mapping works or convert it.
+    # Actually, for RediSearch on JSON, GeoField expects a string "lon,lat".
+    
+    geo = profile_data.get('geo_location', {})
+    if geo:
+         # Add a specific field for indexing if the object structure doesn't match auto-detection
+         # But we mapped "$.geo_location" to GeoField. 
+         # If `geo_location` is `{"latitude": 12, "longitude": 13}`, RediSearch JSON might not auto-parse that to GEO.
+         # Safe bet: transform it to string "lon,lat" for a specific index field, or rely on client side convention.
+         # Let's convert the object to a string format for safe indexing:
+         profile_data['geo_location'] = f"{geo.get('longitude')},{geo.get('latitude')}"
+        
+    profile_data['embeddings'] = embedding
+    return profile_data
+
+
+def profile_index_schema(algorithm: str = "FLAT", vector_params: dict = None) -> list:
+    """
+    RediSearch schema of a tenant's profile index. `algorithm` and
+    `vector_params` (e.g. HNSW's M / EF_CONSTRUCTION) only change the vector field.
+    """
+    return [
+        # Vector Field
+        VectorField(
+            "$.embeddings",
+            algorithm,
+            {
+                "TYPE": "FLOAT32",
+                "DIM": 512, 
+                "DISTANCE_METRIC": "COSINE",
+                **(vector_params or {})
+            },
+            as_name="embeddings"
+        ),
+        # Geo Location
+        GeoField("$.geo_location", as_name="geo_location"),
+
+        # Numeric Age
+        NumericField("$.age", as_name="age"),
+        
+        # Name (Root level)
+        TagField("$.name", as_name="name"),
+        
+        # Image Attributes - Flattened Indexing
+        TagField("$.image_attributes.face_shape", as_name="face_shape"),
+        TagField("$.image_attributes.head_hair", as_name="head_hair"),
+        TagField("$.image_attributes.beard", as_name="beard"),
+        TagField("$.image_attributes.mustache", as_name="mustache"),
+        TagField("$.image_attributes.ethnicity", as_name="ethnicity"),
+        TagField("$.image_attributes.emotion", as_name="emotion"),
+        TagField("$.image_attributes.age_group", as_name="age_group"),
+        TagField("$.image_attributes.gender", as_name="gender"),
+        
+        # Nested Attributes
+        TagField("$.image_attributes.hair.hair_color", as_name="hair_color"),
+        TagField("$.image_attributes.hair.hair_style", as_name="hair_style"),
+        TagField("$.image_attributes.eye_color", as_name="eye_color"),
+        TagField("$.image_attributes.face_geometry.fore_head_height", as_name="fore_head_height"),
+        TagField("$.image_attributes.accessories.eyewear", as_name="eyewear"),
+        TagField("$.image_attributes.accessories.headwear", as_name="headwear"),
+        TagField("$.image_attributes.facial_features.Eyebrow", as_name="eyebrow"),
+        TagField("$.image_attributes.facial_features.mole", as_name="mole"),
+        TagField("$.image_attributes.facial_features.scars", as_name="scars"),
+        TagField("$.image_attributes.accessories.earrings", as_name="earrings"),
+
+        # New Numeric Fields
+        NumericField("$.image_attributes.height", as_name="height"),
+        NumericField("$.image_attributes.weight", as_name="weight"),
+        NumericField("$.image_attributes.annual_income", as_name="annual_income"),
+        NumericField("$.image_attributes.brothers", as_name="brothers"),
+        NumericField("$.image_attributes.sisters", as_name="sisters"),
+
+        # New Tag Fields 
+        TagField("$.image_attributes.attire", as_name="attire"),
+        TagField("$.image_attributes.body_shape", as_name="body_shape"),
+        TagField("$.image_attributes.lip_stick", as_name="lip_stick"),
+        TagField("$.image_attributes.skin_color", as_name="skin_color"),
+        TagField("$.image_attributes.eye_size", as_name="eye_size"),
+        TagField("$.image_attributes.face_size", as_name="face_size"),
+        TagField("$.image_attributes.face_structure", as_name="face_structure"),
+        TagField("$.image_attributes.hair_length", as_name="hair_length"),
+        TagField("$.image_attributes.diet", as_name="diet"),
+        TagField("$.image_attributes.drinking", as_name="drinking"),
+        TagField("$.image_attributes.smoking", as_name="smoking"),
+        TagField("$.image_attributes.family_type", as_name="family_type"),
+        TagField("$.image_attributes.family_values", as_name="family_values"),
+        TagField("$.image_attributes.father_occupation", as_name="father_occupation"),
+        TagField("$.image_attributes.mother_occupation", as_name="mother_occupation"),
+        TagField("$.image_attributes.highest_qualification", as_name="highest_qualification"),
+        TagField("$.image_attributes.marital_status", as_name="marital_status"),
+        TagField("$.image_attributes.mother_tongue", as_name="mother_tongue"),
+        TagField("$.image_attributes.profession", as_name="profession"),
+        TagField("$.image_attributes.religion", as_name="religion"),
+        TagField("$.image_attributes.speaking_languages", as_name="speaking_languages"),
+        TagField("$.tags", as_name="tags")
+    ]
+
+
+@trace_methods("redis")
 class RedisService:
     def __init__(self):
         self.client = redis.from_url(settings.REDIS_URL, decode_responses=True)
@@ -30,80 +176,7 @@ class RedisService:
             # Index exists
         except:
             # Create index
-            schema = [
-                # Vector Field
-                VectorField(
-                    "$.embeddings",
-                    "FLAT",
-                    {
-                        "TYPE": "FLOAT32",
-                        "DIM": 512, 
-                        "DISTANCE_METRIC": "COSINE"
-                    },
-                    as_name="embeddings"
-                ),
-                # Geo Location
-                GeoField("$.geo_location", as_name="geo_location"),
-
-                # Numeric Age
-                NumericField("$.age", as_name="age"),
-                
-                # Name (Root level)
-                TagField("$.name", as_name="name"),
-                
-                # Image Attributes - Flattened Indexing
-                TagField("$.image_attributes.face_shape", as_name="face_shape"),
-                TagField("$.image_attributes.head_hair", as_name="head_hair"),
-                TagField("$.image_attributes.beard", as_name="beard"),
-                TagField("$.image_attributes.mustache", as_name="mustache"),
-                TagField("$.image_attributes.ethnicity", as_name="ethnicity"),
-                TagField("$.image_attributes.emotion", as_name="emotion"),
-                TagField("$.image_attributes.age_group", as_name="age_group"),
-                TagField("$.image_attributes.gender", as_name="gender"),
-                
-                # Nested Attributes
-                TagField("$.image_attributes.hair.hair_color", as_name="hair_color"),
-                TagField("$.image_attributes.hair.hair_style", as_name="hair_style"),
-                TagField("$.image_attributes.eye_color", as_name="eye_color"),
-                TagField("$.image_attributes.face_geometry.fore_head_height", as_name="fore_head_height"),
-                TagField("$.image_attributes.accessories.eyewear", as_name="eyewear"),
-                TagField("$.image_attributes.accessories.headwear", as_name="headwear"),
-                TagField("$.image_attributes.facial_features.Eyebrow", as_name="eyebrow"),
-                TagField("$.image_attributes.facial_features.mole", as_name="mole"),
-                TagField("$.image_attributes.facial_features.scars", as_name="scars"),
-                TagField("$.image_attributes.accessories.earrings", as_name="earrings"),
-
-                # New Numeric Fields
-                NumericField("$.image_attributes.height", as_name="height"),
-                NumericField("$.image_attributes.weight", as_name="weight"),
-                NumericField("$.image_attributes.annual_income", as_name="annual_income"),
-                NumericField("$.image_attributes.brothers", as_name="brothers"),
-                NumericField("$.image_attributes.sisters", as_name="sisters"),
-
-                # New Tag Fields 
-                TagField("$.image_attributes.attire", as_name="attire"),
-                TagField("$.image_attributes.body_shape", as_name="body_shape"),
-                TagField("$.image_attributes.lip_stick", as_name="lip_stick"),
-                TagField("$.image_attributes.skin_color", as_name="skin_color"),
-                TagField("$.image_attributes.eye_size", as_name="eye_size"),
-                TagField("$.image_attributes.face_size", as_name="face_size"),
-                TagField("$.image_attributes.face_structure", as_name="face_structure"),
-                TagField("$.image_attributes.hair_length", as_name="hair_length"),
-                TagField("$.image_attributes.diet", as_name="diet"),
-                TagField("$.image_attributes.drinking", as_name="drinking"),
-                TagField("$.image_attributes.smoking", as_name="smoking"),
-                TagField("$.image_attributes.family_type", as_name="family_type"),
-                TagField("$.image_attributes.family_values", as_name="family_values"),
-                TagField("$.image_attributes.father_occupation", as_name="father_occupation"),
-                TagField("$.image_attributes.mother_occupation", as_name="mother_occupation"),
-                TagField("$.image_attributes.highest_qualification", as_name="highest_qualification"),
-                TagField("$.image_attributes.marital_status", as_name="marital_status"),
-                TagField("$.image_attributes.mother_tongue", as_name="mother_tongue"),
-                TagField("$.image_attributes.profession", as_name="profession"),
-                TagField("$.image_attributes.religion", as_name="religion"),
-                TagField("$.image_attributes.speaking_languages", as_name="speaking_languages"),
-                TagField("$.tags", as_name="tags")
-            ]
+            schema = profile_index_schema()
             
             definition = IndexDefinition(prefix=[prefix], index_type=IndexType.JSON)
             await self.client.ft(index_name).create_index(schema, definition=definition)
@@ -112,27 +185,7 @@ class RedisService:
         # Ensure index exists
         await self.create_index(user_id)
         
-        # Prepare data for RedisJSON
-        # We need to make sure the embedding is part of the JSON document
-        # And geo_location is formatted correctly for Redis (lon, lat string) OR RedisJSON supports object
-        # RedisJSON supports object if mapped to GeoField: "13.11,12.11" string format is common for older versions, 
-        # but modern RediSearch with JSON supports GeoJSON or "lon, lat" string.
-        # Let's ensure geo_location is in a compatible format for query if needed, 
-        # but pure JSON object {"latitude": x, "longitude": y} might need transformation for GEO indexing if the backend expects "lon,lat".
-        # Standard Redis Geo uses "lon,lat". Let's inject a "lon,lat" string field for simpler usage if standard JSON object fails,
-        # but for now let's hope the mapping works or convert it.
-        # Actually, for RediSearch on JSON, GeoField expects a string "lon,lat".
-        
-        geo = profile_data.get('geo_location', {})
-        if geo:
-             # Add a specific field for indexing if the object structure doesn't match auto-detection
-             # But we mapped "$.geo_location" to GeoField. 
-             # If `geo_location` is `{"latitude": 12, "longitude": 13}`, RediSearch JSON might not auto-parse that to GEO.
-             # Safe bet: transform it to string "lon,lat" for a specific index field, or rely on client side convention.
-             # Let's convert the object to a string format for safe indexing:
-             profile_data['geo_location'] = f"{geo.get('longitude')},{geo.get('latitude')}"
-            
-        profile_data['embeddings'] = embedding
+        profile_data = profile_document(profile_data, embedding)
         
         key = f"doc:{user_id}:{profile_data['id']}"
         await self.client.json().set(key, "$", profile_data)
@@ -143,36 +196,7 @@ class RedisService:
         # Base Query
         # If vector presnet: KNN
         # If filters present: Pre-filter
-        
-        query_parts = []
-        
-        # 1. Attribute Filters
-        if filters is not None:
-            for field, value in filters.items():
-                if value:
-                     if isinstance(value, dict) and ("min" in value or "max" in value):
-                         # Numeric Range: @field:[min max]
-                         min_val = value.get("min", "-inf")
-                         max_val = value.get("max", "+inf")
-                         query_parts.append(f"@{field}:[{min_val} {max_val}]")
-                     elif isinstance(value, list):
-                         # OR-query for list of values: @field:{v1 | v2 ...}
-                         # Escape values if needed, but assuming simple alphanumeric for now
-                         val_str = " | ".join(str(v) for v in value)
-                         query_parts.append(f"@{field}:{{{val_str}}}")
-                     else:
-                         # Simple TAG support: @field:{value}
-                         query_parts.append(f"@{field}:{{{value}}}")
-        # 2. Geo Filter
-        if geo_filter:
-            # Syntax: @geo_field:[lon lat radius unit]
-            # unit: m, km, ft, mi
-            query_parts.append(
-                f"@geo_location:[{geo_filter['longitude']} {geo_filter['latitude']} {geo_filter['radius_km']} km]"
-            )
-        
-        # Combine filters or default to *
-        filter_str = " ".join(query_parts) if query_parts else "*"
+        filter_str = build_filter_query(filters, geo_filter)
         print(filter_str)
         # 2. Vector Search
         # Query: filter_str => [KNN k @embeddings $vec_blob AS score]
@@ -196,6 +220,22 @@ class RedisService:
             
         return res
 
+    async def get_search_version(self, user_id: str) -> int:
+        """
+        Current search result version of a tenant (0 until the first write).
+        """
+        version = await self.client.get(f"search_version:{user_id}")
+        return int(version) if version else 0
+
+    async def bump_search_version(self, user_id: str) -> int:
+        return await self.client.incr(f"search_version:{user_id}")
+
+    async def get_search_cache(self, user_id: str, version: int, query_hash: str) -> str:
+        return await self.client.get(f"search_cache:{user_id}:{version}:{query_hash}")
+
+    async def save_search_cache(self, user_id: str, version: int, query_hash: str, result_json: str, ttl: int = 300):
+        await self.client.set(f"search_cache:{user_id}:{version}:{query_hash}", result_json, ex=ttl)
+
     async def get_doc(self, user_id: str, doc_id: str):
         key = f"doc:{user_id}:{doc_id}"
         return await self.client.json().get(key)
@@ -220,6 +260,52 @@ class RedisService:
         """Publish a message to a specific Redis channel"""
         await self.client.publish(channel, json.dumps(message))
 
+    async def publish_status_event(self, request_id: str, message: dict, maxlen: int = 200, ttl: int = 3600) -> str:
+        """
+        Append a status event to the capped per-request stream, then publish it
+        (tagged with its stream id) for live subscribers.
+        Stream key: chat_events:{request_id}
+        """
+        stream_key = f"chat_events:{request_id}"
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.xadd(stream_key, {"data": json.dumps(message)}, maxlen=maxlen, approximate=True)
+            pipe.expire(stream_key, ttl)
+            event_id, _ = await pipe.execute()
+
+        await self.client.publish(f"chat_status:{request_id}", json.dumps({**message, "event_id": event_id}))
+        return event_id
+
+    async def get_status_events(self, request_id: str, after_id: str = None) -> list[dict]:
+        """
+        Replay status events for a request, optionally only those after `after_id`.
+        """
+        stream_key = f"chat_events:{request_id}"
+        min_id = f"({after_id}" if after_id else "-"
+        try:
+            entries = await self.client.xrange(stream_key, min=min_id, max="+")
+        except Exception as e:
+            logger.error(f"Failed to read status stream {stream_key}: {e}")
+            return []
+
+        events = []
+        for event_id, fields in entries:
+            try:
+                events.append({**json.loads(fields["data"]), "event_id": event_id})
+            except (KeyError, json.JSONDecodeError):
+                continue
+        return events
+
+    async def get_last_status_event(self, request_id: str) -> dict:
+        stream_key = f"chat_events:{request_id}"
+        entries = await self.client.xrevrange(stream_key, max="+", min="-", count=1)
+        if not entries:
+            return None
+        event_id, fields = entries[0]
+        try:
+            return {**json.loads(fields["data"]), "event_id": event_id}
+        except (KeyError, json.JSONDecodeError):
+            return None
+
     async def save_session_summary(self, user_id: str, summary: SessionSummary, session_id: str = None):
         key = f"session_summary:{user_id}"
         print("user_id sessin summary save", user_id)
@@ -412,6 +498,25 @@ class RedisService:
                 pass
         return None
 
+    async def get_person_profile_with_ttl(self, user_id: str, person_id: str) -> tuple[dict | None, int]:
+        """
+        Get cached person profile and its remaining TTL in seconds (-2 if missing).
+        """
+        key = f"person_profile:{user_id}:{person_id}"
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.ttl(key)
+            data, ttl = await pipe.execute()
+        if data:
+            try:
+                return json.loads(data), ttl
+            except:
+                pass
+        return None, -2
+
+    async def delete_person_profile_cache(self, user_id: str, person_id: str):
+        await self.client.delete(f"person_profile:{user_id}:{person_id}")
+
     async def save_person_profile_cache(self, user_id: str, person_id: str, profile_data: dict, ttl: int = 86400):
         """
         Cache person profile with TTL (default 1 day).
@@ -419,6 +524,49 @@ class RedisService:
         key = f"person_profile:{user_id}:{person_id}"
         await self.client.set(key, json.dumps(profile_data), ex=ttl)
     
+    async def get_persona_cache(self, cache_key: str) -> str:
+        """
+        Get the shared cached persona JSON for "{user_id}:{personality_id}".
+        """
+        return await self.client.get(f"persona_cache:{cache_key}")
+
+    async def save_persona_cache(self, cache_key: str, persona_json: str, ttl: int = 3600):
+        await self.client.set(f"persona_cache:{cache_key}", persona_json, ex=ttl)
+
+    async def delete_persona_cache(self, cache_key: str):
+        await self.client.delete(f"persona_cache:{cache_key}")
+
+    async def get_tts_cache(self, cache_key: str) -> str:
+        """
+        Get the blob URL of previously synthesized audio.
+        """
+        return await self.client.get(f"tts_cache:{cache_key}")
+
+    async def save_tts_cache(self, cache_key: str, audio_url: str, ttl: int = 604800):
+        """
+        Map a content hash of (voice, model, text) to its audio blob URL.
+        """
+        await self.client.set(f"tts_cache:{cache_key}", audio_url, ex=ttl)
+
+    async def get_image_embedding(self, image_url: str) -> list[float] | None:
+        """
+        Get an embedding computed from the uploaded bytes of image_url.
+        """
+        data = await self.client.get(f"image_embedding:{image_url}")
+        if data:
+            try:
+                return json.loads(data)
+            except:
+                pass
+        return None
+
+    async def save_image_embedding(self, image_url: str, embedding: list[float], ttl: int = 3600):
+        """
+        Cache the embedding of a freshly uploaded chat image under its blob URL,
+        so the search endpoint doesn't download and decode it again.
+        """
+        await self.client.set(f"image_embedding:{image_url}", json.dumps(embedding), ex=ttl)
+
     async def close(self):
         if self.client:
             logger.info("Redis Connection Stopped")
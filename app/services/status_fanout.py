@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+from app.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+STATUS_CHANNEL_PREFIX = "chat_status:"
+STATUS_CHANNEL_PATTERN = f"{STATUS_CHANNEL_PREFIX}*"
+
+
+def stream_id_key(event_id: str):
+    """Order Redis stream ids ("<ms>-<seq>") numerically."""
+    try:
+        ms, seq = event_id.split("-")
+        return int(ms), int(seq)
+    except (AttributeError, ValueError):
+        return 0, 0
+
+
+class StatusFanoutService:
+    """
+    One shared Redis pattern subscription (chat_status:*) per process.
+
+    Every SSE stream registers a bounded asyncio.Queue for its request_id and
+    the single reader task fans messages out to them, instead of each stream
+    opening its own pubsub connection. When a queue is full the oldest event
+    is dropped so a slow client can't stall the reader.
+
+    Events published while the subscription is down are lost to pub/sub, so
+    after resubscribing the reader replays each subscribed request's status
+    stream from the last event id it delivered. Consumers skip event ids
+    they already saw.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        # request_id -> newest event id delivered to its queues
+        self._last_event_ids: Dict[str, str] = {}
+        self.reconnect_delay: float = 1.0
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+
+        # Metrics
+        self.redis_connections: int = 0
+        self.messages_received: int = 0
+        self.messages_delivered: int = 0
+        self.messages_dropped: int = 0
+        self.messages_replayed: int = 0
+        self.reconnects: int = 0
+
+    async def _ensure_started(self):
+        if self._task and not self._task.done():
+            return
+        async with self._start_lock:
+            if self._task and not self._task.done():
+                return
+            # Subscribe before returning so the caller can't miss early events
+            self._pubsub = redis_service.client.pubsub()
+            await self._pubsub.psubscribe(STATUS_CHANNEL_PATTERN)
+            self.redis_connections = 1
+            self._task = asyncio.create_task(self._reader_loop())
+            logger.info(f"Status fan-out subscribed to {STATUS_CHANNEL_PATTERN}")
+
+    async def _reader_loop(self):
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    self.messages_received += 1
+                    request_id = message["channel"][len(STATUS_CHANNEL_PREFIX):]
+                    if request_id not in self._subscribers:
+                        continue
+                    try:
+                        data = json.loads(message["data"])
+                    except json.JSONDecodeError:
+                        continue
+                    self._deliver(request_id, data)
+                # listen() only returns once the connection is gone
+                raise ConnectionError("Status pubsub connection closed")
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Status fan-out reader error: {e}, resubscribing")
+                self.reconnects += 1
+                await asyncio.sleep(self.reconnect_delay)
+                try:
+                    await self._pubsub.close()
+                except Exception:
+                    pass
+                try:
+                    self._pubsub = redis_service.client.pubsub()
+                    await self._pubsub.psubscribe(STATUS_CHANNEL_PATTERN)
+                except Exception as e:
+                    logger.error(f"Status fan-out resubscribe failed: {e}")
+                    continue
+                await self._replay_missed()
+
+    async def _replay_missed(self):
+        """Deliver what was published while the subscription was down, from each request's status stream."""
+        for request_id in list(self._subscribers):
+            events = await redis_service.get_status_events(request_id, self._last_event_ids.get(request_id))
+            for data in events:
+                if request_id not in self._subscribers:
+                    break
+                self._deliver(request_id, data)
+                self.messages_replayed += 1
+
+    def _deliver(self, request_id: str, data: dict):
+        event_id = data.get("event_id")
+        last = self._last_event_ids.get(request_id)
+        if event_id and (not last or stream_id_key(event_id) > stream_id_key(last)):
+            self._last_event_ids[request_id] = event_id
+        for queue in self._subscribers.get(request_id, ()):
+            self._offer(queue, data)
+
+    def _offer(self, queue: asyncio.Queue, data: dict):
+        if queue.full():
+            try:
+                queue.get_nowait()
+                self.messages_dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(data)
+        self.messages_delivered += 1
+
+    async def subscribe(self, request_id: str) -> asyncio.Queue:
+        await self._ensure_started()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(request_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, request_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(request_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            self._subscribers.pop(request_id, None)
+            self._last_event_ids.pop(request_id, None)
+
+    async def listen(self, request_id: str):
+        """
+        Async generator yielding status messages for one request,
+        drop-in replacement for redis_service.listen(f"chat_status:{request_id}").
+        """
+        queue = await self.subscribe(request_id)
+        try:
+            while True:
+                yield await queue.get()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.unsubscribe(request_id, queue)
+
+    def get_stats(self) -> dict:
+        return {
+            "redis_connections": self.redis_connections,
+            "active_requests": len(self._subscribers),
+            "active_streams": sum(len(q) for q in self._subscribers.values()),
+            "messages_received": self.messages_received,
+            "messages_delivered": self.messages_delivered,
+            "messages_dropped": self.messages_dropped,
+            "messages_replayed": self.messages_replayed,
+            "reconnects": self.reconnects,
+        }
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._pubsub:
+            try:
+                await self._pubsub.punsubscribe(STATUS_CHANNEL_PATTERN)
+                await self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+        self.redis_connections = 0
+
+
+status_fanout = StatusFanoutService(queue_size=settings.STATUS_QUEUE_SIZE)
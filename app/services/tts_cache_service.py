@@ -0,0 +1,77 @@
+import hashlib
+import logging
+import re
+import unicodedata
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_tts_text(text: str) -> str:
+    # Case is kept on purpose: CAPITALS change how the voice emphasises words
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+class TTSCacheService:
+    """
+    Content-addressed cache of synthesized audio.
+
+    Keys are sha256(voice_id, model_id, normalized text) and values are blob
+    URLs, stored in Redis so every replica shares them. Repeated phrases such
+    as fallback or refusal replies skip ElevenLabs entirely.
+    """
+
+    def __init__(self, ttl: int = 604800):
+        self.ttl = ttl
+
+        # Metrics
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def make_key(self, voice_id: Optional[str], model_id: str, text: str) -> str:
+        raw = f"{voice_id or ''}\x1f{model_id}\x1f{normalize_tts_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get_or_synthesize(
+        self,
+        text: str,
+        voice_id: Optional[str],
+        model_id: str,
+        synthesize: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        cache_key = self.make_key(voice_id, model_id, text)
+
+        try:
+            cached = await redis_service.get_tts_cache(cache_key)
+        except Exception as e:
+            logger.error(f"TTS cache lookup failed: {e}")
+            cached = None
+
+        if cached:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        audio_url = await synthesize()
+        if audio_url:
+            try:
+                await redis_service.save_tts_cache(cache_key, audio_url, ttl=self.ttl)
+            except Exception as e:
+                logger.error(f"TTS cache store failed: {e}")
+        return audio_url
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+tts_cache_service = TTSCacheService(ttl=settings.TTS_CACHE_TTL)
@@ -1,38 +1,271 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
 from app.services.personality_service import personality_service
+from app.services.redis_service import redis_service
 from app.api.schemas import PersonalityModel
+from app.utils.random_utils import persona_json_to_system_prompt
+from app.utils.single_flight import LoadGenerations, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+PERSONA_INVALIDATION_CHANNEL = "persona_invalidate"
+
+DEFAULT_LANGUAGE_PROMPT = "MANDATORY: SPEAK ONLY IN ENGLISH. DO NOT USE ANY OTHER LANGUAGE OR MIX LANGUAGES IN YOUR RESPONSE."
+
+
+def persona_version(persona: dict) -> str:
+    """updated_at changes on every write; personas without it fall back to a content hash."""
+    if persona.get("updated_at"):
+        return str(persona["updated_at"])
+    return hashlib.sha256(json.dumps(persona, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def compile_persona(persona: dict) -> dict:
+    """Everything the summarize step derives from a persona, built once per version."""
+    personality = persona.get("personality") or {}
+    languages = (personality.get("identity") or {}).get("languages")
+    if languages:
+        language_prompt = f"MANDATORY: SPEAK ONLY IN {', '.join(languages)}. DO NOT USE ANY OTHER LANGUAGE OR MIX LANGUAGES IN YOUR RESPONSE."
+    else:
+        language_prompt = DEFAULT_LANGUAGE_PROMPT
+    return {
+        "version": persona_version(persona),
+        "system_prompt": persona_json_to_system_prompt(personality),
+        "language_prompt": language_prompt,
+        "voice_id": persona.get("voice_id"),
+    }
+
 
 class CachePersona:
-    def __init__(self):
-        self.cache = {}
-    
-    async def get_persona(self, user_id, personality_id):
-        cache_key = f"{user_id}:{personality_id}"  # composite key
+    """
+    Two-tier persona cache.
+
+    Tier 1 is a per-process LRU with a TTL, bounded to `max_size` entries.
+    Tier 2 is Redis (persona_cache:{user_id}:{personality_id}), shared by
+    every replica. Updates and deletes write through to Redis and publish
+    the key on `persona_invalidate`, so other replicas drop their local copy
+    instead of serving it until restart. Concurrent misses for the same key
+    share a single Mongo load. A load that an update, delete or remote
+    invalidation overtook is returned to its callers but not cached.
+
+    Each local entry also carries the compiled persona (system prompt,
+    language directive, voice_id). It is rebuilt only when the persona's
+    version (updated_at) changes, not on every TTL refresh.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 300.0, redis_ttl: int = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+
+        # cache_key -> (expires_at, persona, compiled)
+        self.cache: "OrderedDict[str, tuple[float, dict, dict]]" = OrderedDict()
+        self._single_flight = SingleFlight()
+        self._generations = LoadGenerations()
+        self._instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self._running = False
+
+        # Metrics
+        self.local_hits: int = 0
+        self.redis_hits: int = 0
+        self.loads: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+        self.compilations: int = 0
 
-        if cache_key not in self.cache:
+    # --------------------------
+    # Local tier
+    # --------------------------
+    def _get_local(self, cache_key: str) -> Optional[tuple]:
+        entry = self.cache.get(cache_key)
+        # Expired entries stay until replaced so their compiled prompt can be reused
+        if not entry or entry[0] < time.monotonic():
+            return None
+        self.cache.move_to_end(cache_key)
+        return entry
+
+    def _set_local(self, cache_key: str, persona: dict) -> tuple:
+        previous = self.cache.get(cache_key)
+        version = persona_version(persona)
+        if previous and previous[2]["version"] == version:
+            compiled = previous[2]
+        else:
+            compiled = compile_persona(persona)
+            self.compilations += 1
+
+        entry = (time.monotonic() + self.ttl, persona, compiled)
+        self.cache[cache_key] = entry
+        self.cache.move_to_end(cache_key)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    # --------------------------
+    # Loading
+    # --------------------------
+    async def _load(self, user_id, personality_id, cache_key: str) -> tuple:
+        with self._generations.track(cache_key) as generation:
+            try:
+                data = await redis_service.get_persona_cache(cache_key)
+            except Exception as e:
+                logger.error(f"Persona cache Redis lookup failed: {e}")
+                data = None
+
+            if not data:
+                return await self._load_from_db(user_id, personality_id, cache_key)
+
+            self.redis_hits += 1
+            persona = PersonalityModel.model_validate_json(data).model_dump()
+            return self._store(cache_key, persona, generation)
+
+    async def _load_from_db(self, user_id, personality_id, cache_key: str) -> tuple:
+        with self._generations.track(cache_key) as generation:
+            self.loads += 1
             data = await personality_service.get(user_id, personality_id)
 
             if not data:
                 raise ValueError("Personality not found")
 
-            self.cache[cache_key] = PersonalityModel(**data).model_dump()
+            model = PersonalityModel(**data)
+            persona = model.model_dump()
+            if self._generations.is_current(cache_key, generation):
+                try:
+                    await redis_service.save_persona_cache(cache_key, model.model_dump_json(), ttl=self.redis_ttl)
+                except Exception as e:
+                    logger.error(f"Persona cache Redis store failed: {e}")
+                if not self._generations.is_current(cache_key, generation):
+                    # Overtaken during the write; the newer writer's Redis change may have landed first
+                    await self._delete_redis(cache_key)
+            return self._store(cache_key, persona, generation)
 
-        return self.cache[cache_key]
-    
-    async def update_persona(self, user_id, personality_id):
-        cache_key = f"{user_id}:{personality_id}"
+    def _store(self, cache_key: str, persona: dict, generation: int) -> tuple:
+        if self._generations.is_current(cache_key, generation):
+            return self._set_local(cache_key, persona)
+        # Overtaken by an update or delete: serve it to this load's callers only
+        return (time.monotonic(), persona, compile_persona(persona))
 
-        data = await personality_service.get(user_id, personality_id)
+    async def _delete_redis(self, cache_key: str):
+        try:
+            await redis_service.delete_persona_cache(cache_key)
+        except Exception as e:
+            logger.error(f"Persona cache Redis delete failed: {e}")
 
-        if not data:
-            raise ValueError("Personality not found")
+    def _invalidate_local(self, cache_key: str) -> bool:
+        """Drop the local entry and stop in-flight loads of the key from writing back."""
+        self._generations.invalidate(cache_key)
+        self._single_flight.forget(cache_key)
+        return self.cache.pop(cache_key, None) is not None
 
-        self.cache[cache_key] = PersonalityModel(**data).model_dump()
+    async def get_persona(self, user_id, personality_id):
+        entry = await self._get_entry(user_id, personality_id)
+        return entry[1]
 
-        return self.cache[cache_key]
+    async def get_compiled_persona(self, user_id, personality_id) -> dict:
+        """
+        Compiled view of a persona: system_prompt, language_prompt, voice_id
+        and the version they were built from.
+        """
+        entry = await self._get_entry(user_id, personality_id)
+        return entry[2]
+
+    async def _get_entry(self, user_id, personality_id) -> tuple:
+        cache_key = f"{user_id}:{personality_id}"  # composite key
+
+        entry = self._get_local(cache_key)
+        if entry is not None:
+            self.local_hits += 1
+            return entry
+
+        # Single-flight: later callers wait on the first caller's load
+        return await self._single_flight.do(
+            cache_key, lambda: self._load(user_id, personality_id, cache_key)
+        )
+
+    async def update_persona(self, user_id, personality_id):
+        cache_key = f"{user_id}:{personality_id}"
+
+        self._invalidate_local(cache_key)
+        entry = await self._load_from_db(user_id, personality_id, cache_key)
+        await self._publish_invalidation(cache_key)
+
+        return entry[1]
 
     async def delete_persona(self, user_id, personality_id):
         cache_key = f"{user_id}:{personality_id}"
-        self.cache.pop(cache_key, None)  
+        self._invalidate_local(cache_key)
+        await self._delete_redis(cache_key)
+        await self._publish_invalidation(cache_key)
+
+    # --------------------------
+    # Cross-replica invalidation
+    # --------------------------
+    async def _publish_invalidation(self, cache_key: str):
+        try:
+            await redis_service.publish(
+                PERSONA_INVALIDATION_CHANNEL,
+                {"key": cache_key, "origin": self._instance_id}
+            )
+        except Exception as e:
+            logger.error(f"Persona invalidation publish failed: {e}")
+
+    async def start(self):
+        if not self._listener or self._listener.done():
+            self._running = True
+            self._listener = asyncio.create_task(self._invalidation_loop())
+
+    async def _invalidation_loop(self):
+        # redis_service.listen swallows cancellation, so the flag decides when to stop
+        while self._running:
+            try:
+                async for message in redis_service.listen(PERSONA_INVALIDATION_CHANNEL):
+                    if message.get("origin") == self._instance_id:
+                        continue
+                    if self._invalidate_local(message.get("key")):
+                        self.invalidations += 1
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Persona invalidation listener error: {e}")
+
+            if self._running:
+                # Invalidations may have been missed while unsubscribed
+                self.cache.clear()
+                await asyncio.sleep(1)
+
+    async def stop(self):
+        self._running = False
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+
+    def get_stats(self) -> dict:
+        lookups = self.local_hits + self.redis_hits + self.loads
+        return {
+            "size": len(self.cache),
+            "max_size": self.max_size,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "loads": self.loads,
+            "coalesced": self._single_flight.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "compilations": self.compilations,
+            "hit_rate": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
     
 
-cache_persona = CachePersona()
\ No newline at end of file
+cache_persona = CachePersona(
+    max_size=settings.PERSONA_CACHE_SIZE,
+    ttl=settings.PERSONA_CACHE_TTL,
+    redis_ttl=settings.PERSONA_REDIS_TTL
+)
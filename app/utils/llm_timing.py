@@ -0,0 +1,75 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Kafka header names. Workers may echo the worker_* ones on their response
+# for an exact split; without them the response record timestamp is used.
+HEADER_TRACE_ID = "trace_id"
+HEADER_STEP = "step"
+HEADER_DISPATCHED_AT = "dispatched_at"
+HEADER_WORKER_STARTED_AT = "worker_started_at"
+HEADER_WORKER_COMPLETED_AT = "worker_completed_at"
+
+# Kafka TimestampType.CREATE_TIME: the timestamp was set by the producing worker
+CREATE_TIME = 0
+
+
+def encode_headers(headers: Dict[str, Any]) -> List[Tuple[str, bytes]]:
+    return [(k, str(v).encode("utf-8")) for k, v in headers.items() if v is not None]
+
+
+def decode_headers(headers: Optional[List[Tuple[str, bytes]]]) -> Dict[str, str]:
+    decoded = {}
+    for key, value in headers or []:
+        try:
+            decoded[key] = value.decode("utf-8") if value is not None else ""
+        except (AttributeError, UnicodeDecodeError):
+            continue
+    return decoded
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def llm_timing_breakdown(
+    dispatched_at: Optional[float],
+    usage: Optional[Dict[str, Any]],
+    headers: Optional[Dict[str, str]] = None,
+    record_timestamp_ms: Optional[int] = None,
+    record_timestamp_type: Optional[int] = None,
+    received_at: Optional[float] = None,
+) -> Dict[str, Optional[float]]:
+    """
+    Split an LLM round trip into producer->worker queue, worker compute and
+    worker->orchestrator delivery, all in seconds.
+
+    `dispatched_at` and `received_at` are wall-clock times on this host. The
+    worker side comes from echoed headers when present, otherwise from the
+    response record's CreateTime minus the compute time in `usage`. Hosts
+    don't share a clock, so small negative values from skew are clamped to 0.
+    A part that can't be derived is None.
+    """
+    headers = headers or {}
+    received_at = received_at if received_at is not None else time.time()
+    compute = _as_float((usage or {}).get("total_duration"))
+
+    completed = _as_float(headers.get(HEADER_WORKER_COMPLETED_AT))
+    if completed is None and record_timestamp_ms and record_timestamp_type == CREATE_TIME:
+        completed = record_timestamp_ms / 1000.0
+
+    started = _as_float(headers.get(HEADER_WORKER_STARTED_AT))
+    if started is not None and completed is not None and compute is None:
+        compute = completed - started
+    if started is None and completed is not None and compute is not None:
+        started = completed - compute
+
+    queue = started - dispatched_at if started is not None and dispatched_at is not None else None
+    delivery = received_at - completed if completed is not None else None
+
+    def clamp(value: Optional[float]) -> Optional[float]:
+        return max(0.0, value) if value is not None else None
+
+    return {"queue": clamp(queue), "compute": clamp(compute), "delivery": clamp(delivery)}
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.mongo import mongo_service
+from app.services.redis_service import redis_service
+from app.utils.single_flight import LoadGenerations, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Fields of a connected person that the prompts use
+PERSON_PROFILE_PROJECTION = {"name": 1, "age": 1, "gender": 1, "address": 1, "country": 1, "tags": 1}
+
+
+def _jitter(ttl: float, ratio: float) -> float:
+    return ttl * (1 + random.uniform(-ratio, ratio))
+
+
+class PersonProfileCache:
+    """
+    Near-cache for person_profile:{user_id}:{person_id}.
+
+    A small per-process LRU sits in front of the Redis entry. Its TTL is
+    short, which bounds staleness on replicas that didn't serve an update.
+    Redis TTLs are jittered so entries written together don't expire
+    together. When a Redis entry is read within `refresh_ahead_ratio` of
+    expiry, it is served and reloaded from Mongo in the background. Misses
+    for the same profile share a single load.
+
+    `invalidate` bumps the key's generation. A load or refresh that was
+    already running when it did still returns its profile to its callers
+    but doesn't write it back to either tier.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 2000,
+        local_ttl: float = 30.0,
+        redis_ttl: int = 86400,
+        jitter_ratio: float = 0.1,
+        refresh_ahead_ratio: float = 0.1,
+    ):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.jitter_ratio = jitter_ratio
+        self.refresh_ahead_ratio = refresh_ahead_ratio
+
+        # cache_key -> (expires_at, profile)
+        self._local: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._single_flight = SingleFlight()
+        # cache_key -> background refresh-ahead task
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._generations = LoadGenerations()
+
+        # Metrics
+        self.local_hits: int = 0
+        self.redis_hits: int = 0
+        self.loads: int = 0
+        self.refreshes: int = 0
+        self.invalidations: int = 0
+
+    def _set_local(self, cache_key: str, profile: dict):
+        self._local[cache_key] = (time.monotonic() + _jitter(self.local_ttl, self.jitter_ratio), profile)
+        self._local.move_to_end(cache_key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    # --------------------------
+    # Loading
+    # --------------------------
+    async def _load_from_db(self, user_id: str, person_id: str, cache_key: str) -> Optional[dict]:
+        with self._generations.track(cache_key) as generation:
+            self.loads += 1
+            profile = await mongo_service.get_profile(user_id, person_id, PERSON_PROFILE_PROJECTION)
+            if not profile:
+                return None
+
+            # Convert _id to str if present to ensure JSON serialization
+            if "_id" in profile:
+                profile["_id"] = str(profile["_id"])
+
+            if not self._generations.is_current(cache_key, generation):
+                return profile
+            await redis_service.save_person_profile_cache(
+                user_id, person_id, profile, ttl=int(_jitter(self.redis_ttl, self.jitter_ratio))
+            )
+            if not self._generations.is_current(cache_key, generation):
+                # invalidate() ran during the write; its delete may have landed first
+                try:
+                    await redis_service.delete_person_profile_cache(user_id, person_id)
+                except Exception as e:
+                    logger.error(f"Failed to drop stale person profile cache for {person_id}: {e}")
+                return profile
+            self._set_local(cache_key, profile)
+            return profile
+
+    async def _load(self, user_id: str, person_id: str, cache_key: str) -> Optional[dict]:
+        with self._generations.track(cache_key) as generation:
+            profile, ttl = await redis_service.get_person_profile_with_ttl(user_id, person_id)
+            if not profile:
+                return await self._load_from_db(user_id, person_id, cache_key)
+
+            self.redis_hits += 1
+            if not self._generations.is_current(cache_key, generation):
+                return profile
+            self._set_local(cache_key, profile)
+            if 0 <= ttl < self.redis_ttl * self.refresh_ahead_ratio:
+                self._refresh_in_background(user_id, person_id, cache_key)
+            return profile
+
+    def _refresh_in_background(self, user_id: str, person_id: str, cache_key: str):
+        # Keyed apart from get()'s single-flight, which is still running this load
+        if cache_key in self._refreshing:
+            return
+        self.refreshes += 1
+        task = asyncio.create_task(self._load_from_db(user_id, person_id, cache_key))
+        self._refreshing[cache_key] = task
+        task.add_done_callback(lambda t: self._refresh_done(cache_key, t))
+
+    def _refresh_done(self, cache_key: str, task: asyncio.Task):
+        if self._refreshing.get(cache_key) is task:
+            del self._refreshing[cache_key]
+        if not task.cancelled() and task.exception():
+            logger.error(f"Person profile refresh failed for {cache_key}: {task.exception()}")
+
+    async def get(self, user_id: str, person_id: str) -> Optional[dict]:
+        cache_key = f"{user_id}:{person_id}"
+
+        entry = self._local.get(cache_key)
+        if entry and entry[0] > time.monotonic():
+            self._local.move_to_end(cache_key)
+            self.local_hits += 1
+            return entry[1]
+
+        return await self._single_flight.do(cache_key, lambda: self._load(user_id, person_id, cache_key))
+
+    async def invalidate(self, user_id: str, person_id: str):
+        """Drop a profile from both tiers after it was written."""
+        cache_key = f"{user_id}:{person_id}"
+        self.invalidations += 1
+        self._generations.invalidate(cache_key)
+        # Later gets start a fresh load instead of joining one that read the old profile
+        self._single_flight.forget(cache_key)
+        refresh = self._refreshing.pop(cache_key, None)
+        if refresh:
+            refresh.cancel()
+        self._local.pop(cache_key, None)
+        try:
+            await redis_service.delete_person_profile_cache(user_id, person_id)
+        except Exception as e:
+            logger.error(f"Failed to invalidate person profile cache for {person_id}: {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            "size": len(self._local),
+            "max_size": self.max_size,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "loads": self.loads,
+            "coalesced": self._single_flight.coalesced,
+            "refreshes": self.refreshes,
+            "invalidations": self.invalidations,
+        }
+
+
+person_profile_cache = PersonProfileCache(
+    max_size=settings.PERSON_PROFILE_CACHE_SIZE,
+    local_ttl=settings.PERSON_PROFILE_LOCAL_TTL,
+    redis_ttl=settings.PERSON_PROFILE_REDIS_TTL
+)
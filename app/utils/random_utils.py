@@ -1,4 +1,5 @@
 import secrets
+from collections.abc import Hashable
 
 def generate_random_id(user_id: str) -> str:
     return f"{user_id}-" + "-".join(
@@ -18,10 +19,68 @@ def deep_clean_tool_args(obj):
         return [deep_clean_tool_args(v) for v in obj if v not in ("", None)]
     return obj
 
-def validate_and_clean_tool_args(args: dict, tool_schema: dict) -> dict:
+def merge_tool_args(current_tool_args: dict, new_args: dict) -> dict:
+    """
+    Merge newly extracted tool args into the persisted args of the same tool.
+    None removes a key, `_reset` drops the persisted args, a `page` > 0 means
+    "next page" and any other filter change goes back to page 1.
+    """
+    final_tool_args = new_args.copy()  # Start with what LLM extracted
+
+    # 🔹 NEW: Normalize page intent
+    if "page" in final_tool_args:
+        prev_page = current_tool_args.get("page", 1)
+
+        if final_tool_args["page"] > 0:
+            # Next page intent
+            final_tool_args["page"] = prev_page + 1
+        elif final_tool_args["page"] == 0:
+            # page: 0 or anything else → reset
+            final_tool_args["page"] = 1
+
+    # 3. Check for Reset
+    if new_args.get("_reset"):  # Reset if _reset is present
+        current_tool_args = {}
+        final_tool_args.pop("_reset", None)
+
+    # 4. Merge Logic
+    # Start with current (baseline for this tool)
+    merged = current_tool_args.copy()
+
+    # Apply updates from LLM (new_args)
+    for k, v in final_tool_args.items():
+        if v is None:
+            # Explicit removal
+            merged.pop(k, None)
+        else:
+            # Update/Add
+            merged[k] = v
+
+    # 5. Check for Filter Changes (Reset Page)
+    # If any attribute changed EXCEPT 'page' or '_reset' or 'user_id', we must reset page to 1.
+    filters_changed = False
+    for k in final_tool_args:
+        if k in ["page", "_reset", "user_id"]:
+            continue
+        filters_changed = True
+        break
+
+    if filters_changed:
+        merged["page"] = 1
+
+    return merged
+
+def validate_and_clean_tool_args(args: dict, tool_schema: dict, enum_sets: dict = None) -> dict:
+    """
+    Drop unknown, empty and out-of-enum arguments.
+    `enum_sets` optionally maps top-level fields to precomputed sets of
+    allowed values, so membership checks don't scan the schema lists.
+    """
     if not isinstance(args, dict) or not isinstance(tool_schema, dict):
         return args
 
+    enum_sets = enum_sets or {}
+
     properties = tool_schema.get("properties", {})
     cleaned = {}
 
@@ -37,20 +96,21 @@ def validate_and_clean_tool_args(args: dict, tool_schema: dict) -> dict:
 
         # ✅ ENUM validation (supports list or single value)
         if "enum" in schema_def:
-            allowed = schema_def["enum"]
+            allowed = enum_sets.get(k) or schema_def["enum"]
 
             if isinstance(v, list):
-                valid_values = [item for item in v if item in allowed]
+                valid_values = [item for item in v if isinstance(item, Hashable) and item in allowed]
 
                 if not valid_values:
-                    print(f"⚠️ Invalid values for field '{k}', allowed: {allowed}")
+                    print(f"⚠️ Invalid values for field '{k}', allowed: {schema_def['enum']}")
                     continue
 
                 v = valid_values  # clean invalid values
 
             else:
-                if v not in allowed:
-                    print(f"⚠️ Invalid value '{v}' for field '{k}', allowed: {allowed}")
+                # Dicts/lists can't be looked up in the precomputed frozensets and are never valid enum values
+                if not isinstance(v, Hashable) or v not in allowed:
+                    print(f"⚠️ Invalid value '{v}' for field '{k}', allowed: {schema_def['enum']}")
                     continue
 
         # ✅ TYPE validation (optional but recommended)
@@ -0,0 +1,99 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATIONS_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "mcp", "recommendations.json")
+)
+
+GENDERS = ("female", "male")
+
+
+class RecommendationStore:
+    """
+    In-memory index over the recommendation archetypes JSON.
+
+    The file is parsed once and indexed by profile id and by (style, gender).
+    Every lookup stats the file and reloads it only when its mtime changes,
+    so edits to the JSON are picked up without a restart.
+    """
+
+    def __init__(self, path: str = RECOMMENDATIONS_PATH, response_extras: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.response_extras = response_extras or {}
+
+        self._mtime: Optional[float] = None
+        self.data: Dict[str, Dict[str, List[dict]]] = {}
+        self.by_id: Dict[str, dict] = {}
+        self.by_style_gender: Dict[Tuple[str, Optional[str]], List[dict]] = {}
+        self._responses: Dict[Tuple[str, Optional[str]], dict] = {}
+
+    def _maybe_reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            if self._mtime is not None:
+                logger.error(f"Recommendations file not found at: {self.path}")
+            self._mtime = None
+            return
+
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            # Keep serving the previous index if the new file is half-written
+            logger.error(f"Error loading recommendations: {e}")
+            return
+
+        self._build_index(data)
+        self._mtime = mtime
+        logger.info(f"Loaded {len(self.by_id)} recommendation profiles from {self.path}")
+
+    def _build_index(self, data: Dict[str, Dict[str, List[dict]]]):
+        by_id = {}
+        by_style_gender = {}
+        responses = {}
+
+        for style, genders in data.items():
+            combined = []
+            for gender in GENDERS:
+                profiles = genders.get(gender, [])
+                by_style_gender[(style, gender)] = profiles
+                combined.extend(profiles)
+            by_style_gender[(style, None)] = combined
+
+            for gender, profiles in genders.items():
+                for profile in profiles:
+                    if profile.get("id"):
+                        by_id[profile["id"]] = profile
+
+        for key, docs in by_style_gender.items():
+            if docs:
+                responses[key] = {"recommendation": True, "docs": docs, **self.response_extras}
+
+        self.data = data
+        self.by_id = by_id
+        self.by_style_gender = by_style_gender
+        self._responses = responses
+
+    def get_profiles(self, recommendation_ids: List[str]) -> List[dict]:
+        self._maybe_reload()
+        return [self.by_id[rid] for rid in recommendation_ids if rid in self.by_id]
+
+    def get_by_style(self, style: str, gender: Optional[str] = None) -> List[dict]:
+        self._maybe_reload()
+        return self.by_style_gender.get((style, gender), [])
+
+    def get_response(self, style: str, gender: Optional[str] = None) -> Optional[dict]:
+        """Precomputed tool response for a single style, or None when nothing matches."""
+        self._maybe_reload()
+        return self._responses.get((style, gender))
+
+
+recommendation_store = RecommendationStore()
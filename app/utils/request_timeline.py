@@ -0,0 +1,40 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+class RequestTimeline:
+    """
+    Monotonic stage timeline of one chat request.
+
+    Offsets and durations are in seconds relative to the moment the request
+    was accepted. A stage can appear more than once, for example one
+    tool_call per paginated retry.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.stages: List[Dict[str, Any]] = []
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def add(self, name: str, duration: float, started_at: Optional[float] = None, **extra):
+        started_at = started_at if started_at is not None else time.monotonic() - duration
+        self.stages.append({
+            "name": name,
+            "start": round(started_at - self.started_at, 4),
+            "duration": round(duration, 4),
+            **extra,
+        })
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - t0, started_at=t0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"total": round(self.elapsed(), 4), "stages": self.stages}
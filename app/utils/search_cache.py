@@ -0,0 +1,78 @@
+import json
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+
+class SearchResultCache:
+    """
+    Profile search results cached per tenant version.
+
+    Entries live at search_cache:{user_id}:{version}:{query_hash}. Any write
+    to a tenant's profiles INCRs search_version:{user_id}, which makes every
+    older entry unreachable in O(1). The stale entries just age out by TTL.
+    """
+
+    def __init__(self, ttl: int = 300):
+        self.ttl = ttl
+
+        # Metrics
+        self.hits: int = 0
+        self.misses: int = 0
+        self.bumps: int = 0
+
+    async def get_version(self, user_id: str) -> int:
+        try:
+            return await redis_service.get_search_version(user_id)
+        except Exception as e:
+            logger.error(f"Search version lookup failed for {user_id}: {e}")
+            return -1
+
+    async def get(self, user_id: str, version: int, query_hash: str) -> Optional[dict]:
+        if version < 0:
+            return None
+        try:
+            data = await redis_service.get_search_cache(user_id, version, query_hash)
+        except Exception as e:
+            logger.error(f"Search cache lookup failed: {e}")
+            data = None
+
+        if data:
+            self.hits += 1
+            return json.loads(data)
+        self.misses += 1
+        return None
+
+    async def put(self, user_id: str, version: int, query_hash: str, result: dict):
+        if version < 0:
+            return
+        try:
+            await redis_service.save_search_cache(
+                user_id, version, query_hash, json.dumps(result, default=str), ttl=self.ttl
+            )
+        except Exception as e:
+            logger.error(f"Search cache store failed: {e}")
+
+    async def bump(self, user_id: str):
+        """Invalidate every cached search of a tenant after its profiles changed."""
+        self.bumps += 1
+        try:
+            await redis_service.bump_search_version(user_id)
+        except Exception as e:
+            logger.error(f"Search version bump failed for {user_id}: {e}")
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bumps": self.bumps,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+search_result_cache = SearchResultCache(ttl=settings.SEARCH_CACHE_TTL)
@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator
+
+
+def canonical_hash(payload: Any) -> str:
+    """Stable sha256 of a JSON-able payload: dict keys sorted, no whitespace."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs `fn`. Callers that arrive while it is in
+    flight await the same result, or the same exception. A caller being
+    cancelled doesn't cancel the shared execution for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Metrics
+        self.executions: int = 0
+        self.coalesced: int = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._inflight.get(key)
+        if fut is None:
+            self.executions += 1
+            fut = asyncio.ensure_future(fn())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._done(key, f))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(fut)
+
+    def forget(self, key: str):
+        """Let the next caller for `key` start a new execution instead of joining the running one."""
+        self._inflight.pop(key, None)
+
+    def _done(self, key: str, fut: asyncio.Future):
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        # Consume it so waiter-less failures aren't logged as "never retrieved"
+        if not fut.cancelled():
+            fut.exception()
+
+    def get_stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+
+class LoadGenerations:
+    """
+    Per-key generations that let a cache drop loads that raced an invalidation.
+
+    A load runs inside `track(key)`, which yields the key's generation, and
+    checks `is_current(key, generation)` before writing its result back.
+    `invalidate(key)` bumps the generation of a key that is being loaded.
+    Keys are only tracked while a load for them is running.
+    """
+
+    def __init__(self):
+        self._loading: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+
+    @contextmanager
+    def track(self, key: str) -> Iterator[int]:
+        self._loading[key] = self._loading.get(key, 0) + 1
+        try:
+            yield self._generations.get(key, 0)
+        finally:
+            remaining = self._loading.pop(key) - 1
+            if remaining:
+                self._loading[key] = remaining
+            else:
+                self._generations.pop(key, None)
+
+    def is_current(self, key: str, generation: int) -> bool:
+        return self._generations.get(key, 0) == generation
+
+    def invalidate(self, key: str):
+        if key in self._loading:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self._loading)
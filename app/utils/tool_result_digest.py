@@ -0,0 +1,79 @@
+import json
+from typing import Any, Dict, Optional
+
+# Keys of tool_args that are plumbing rather than user-facing filters
+INTERNAL_ARG_KEYS = {"user_id", "page", "_reset", "k"}
+
+# Non-dict tool output (error strings etc.) is cut to this many characters
+MAX_RAW_RESULT_CHARS = 1000
+
+# Recommendation archetypes are described by the model, so each keeps a
+# bounded copy of its image_attributes
+MAX_RECOMMENDATIONS = 12
+MAX_ATTRIBUTES_PER_ITEM = 8
+MAX_ATTRIBUTE_CHARS = 40
+
+
+def _recommendation_digest(doc: Dict[str, Any]) -> Dict[str, Any]:
+    attributes = doc.get("image_attributes")
+    item = {"id": doc.get("id"), "name": doc.get("name")}
+    if isinstance(attributes, dict) and attributes:
+        item["image_attributes"] = {
+            key: str(value)[:MAX_ATTRIBUTE_CHARS]
+            for key, value in list(attributes.items())[:MAX_ATTRIBUTES_PER_ITEM]
+            if value not in (None, "")
+        }
+    return item
+
+
+def digest_tool_result(structured_result: Any, tool_args: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Reduce a tool result to what the summarize step actually uses.
+
+    The summarize prompt tells the model not to list profiles, so the hydrated
+    docs are replaced by counts. Kept verbatim: `instruction` and `message`
+    fields, celebrity confirmation images, and the recommendation archetypes
+    the model is asked to describe: name plus truncated image_attributes, at
+    most MAX_RECOMMENDATIONS of them. The full result still goes to the
+    client via the final status event.
+    """
+    if structured_result is None:
+        return json.dumps({"count": 0})
+
+    if not isinstance(structured_result, dict):
+        return str(structured_result)[:MAX_RAW_RESULT_CHARS]
+
+    docs = structured_result.get("docs") or []
+    digest: Dict[str, Any] = {
+        "count": structured_result.get("count", len(docs)),
+        "returned": len(docs),
+    }
+
+    if tool_args:
+        applied = {k: v for k, v in tool_args.items() if k not in INTERNAL_ARG_KEYS}
+        if applied:
+            digest["applied_filters"] = applied
+
+    for key in ("message", "instruction", "error"):
+        if structured_result.get(key):
+            digest[key] = structured_result[key]
+
+    celebrities = [
+        {
+            "correct_name": doc.get("correct_name"),
+            "image_url": doc.get("image_url"),
+            "needs_confirmation": doc.get("needs_confirmation", False),
+        }
+        for doc in docs
+        if isinstance(doc, dict) and doc.get("is_celebrity")
+    ]
+    if celebrities:
+        digest["celebrity_images"] = celebrities
+
+    if structured_result.get("recommendation"):
+        recommendations = [doc for doc in docs if isinstance(doc, dict)]
+        digest["recommendations"] = [_recommendation_digest(doc) for doc in recommendations[:MAX_RECOMMENDATIONS]]
+        if len(recommendations) > MAX_RECOMMENDATIONS:
+            digest["recommendations_omitted"] = len(recommendations) - MAX_RECOMMENDATIONS
+
+    return json.dumps(digest, default=str)
@@ -0,0 +1,44 @@
+import re
+from typing import List
+
+# Sentence end: terminal punctuation (optionally closed by a quote/bracket) followed by whitespace
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])[\"'”’)\]]*\s+")
+
+# Fragments shorter than this ("Hi!", "1.") are glued to the next sentence
+MIN_SEGMENT_CHARS = 12
+
+
+def split_for_tts(text: str, max_chars: int = 250) -> List[str]:
+    """
+    Split an answer into TTS segments.
+
+    The first segment is the first sentence alone so it can be voiced as
+    early as possible. Later sentences are packed into segments of up to
+    `max_chars` characters, which keeps the number of TTS calls low.
+    """
+    sentences = [s.strip() for s in _SENTENCE_END_RE.split(text or "") if s and s.strip()]
+    if not sentences:
+        return []
+
+    merged: List[str] = []
+    carry = ""
+    for sentence in sentences:
+        sentence = f"{carry} {sentence}".strip() if carry else sentence
+        if len(sentence) < MIN_SEGMENT_CHARS:
+            carry = sentence
+            continue
+        carry = ""
+        merged.append(sentence)
+    if carry:
+        if merged:
+            merged[-1] = f"{merged[-1]} {carry}"
+        else:
+            merged.append(carry)
+
+    segments = [merged[0]]
+    for sentence in merged[1:]:
+        if len(segments) > 1 and len(segments[-1]) + len(sentence) + 1 <= max_chars:
+            segments[-1] = f"{segments[-1]} {sentence}"
+        else:
+            segments.append(sentence)
+    return segments
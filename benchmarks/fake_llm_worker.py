@@ -0,0 +1,180 @@
+"""
+Fake LLM worker for load tests.
+
+Consumes the chat topic and answers each step with a canned response after a
+configurable delay, so the orchestrator can be benchmarked without a GPU.
+Responses carry a `usage` block and the worker_* timing headers the
+orchestrator uses to split queue, compute and delivery time.
+
+    python -m benchmarks.fake_llm_worker --bootstrap localhost:9092 \
+        --chat-topic bench-chat --latency summarize=0.8 --tool-ratio 0.5
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from typing import Dict, Optional
+
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+
+logger = logging.getLogger("fake_llm_worker")
+
+# Seconds of simulated generation per step
+DEFAULT_LATENCY: Dict[str, float] = {
+    "check_tool_required": 0.15,
+    "select_tool": 0.15,
+    "get_tool_args": 0.25,
+    "summarize": 0.8,
+    "custom": 0.5,
+}
+
+CANNED_ANSWER = (
+    "I found a few people who match what you are looking for. "
+    "Take a look at the profiles below and tell me if you want to narrow it down."
+)
+CANNED_NO_TOOL_ANSWER = "Happy to help! Tell me a bit more about who you'd like to meet."
+CANNED_TOOL_ARGS = {"gender": "female", "min_age": 25, "max_age": 35}
+
+
+class FakeLLMWorker:
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        chat_topic: str,
+        latency: Optional[Dict[str, float]] = None,
+        jitter: float = 0.1,
+        tool_ratio: float = 0.5,
+        concurrency: int = 64,
+        tokens_per_second: float = 40.0,
+    ):
+        self.bootstrap_servers = bootstrap_servers
+        self.chat_topic = chat_topic
+        self.latency = {**DEFAULT_LATENCY, **(latency or {})}
+        self.jitter = jitter
+        self.tool_ratio = tool_ratio
+        self.tokens_per_second = tokens_per_second
+        # Caps simulated generations in parallel, like a worker's batch size
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._producer: Optional[AIOKafkaProducer] = None
+        self._tasks = set()
+
+        # Metrics
+        self.handled: Dict[str, int] = {}
+
+    def _wants_tool(self, request_id: str) -> bool:
+        # Stable per request so every step of one request agrees
+        digest = hashlib.sha1(request_id.encode("utf-8")).digest()
+        return digest[0] / 255.0 < self.tool_ratio
+
+    def _answer(self, req: dict) -> dict:
+        step = req.get("step")
+        request_id = req.get("request_id", "")
+        resp = {"request_id": request_id, "step": step, "metadata": req.get("metadata")}
+
+        if step == "check_tool_required":
+            resp["decision"] = "tool" if self._wants_tool(request_id) else "no_tool"
+        elif step == "select_tool":
+            resp["selected_tool"] = "search_profiles"
+        elif step == "get_tool_args":
+            resp["tool_args"] = dict(CANNED_TOOL_ARGS)
+        elif step == "summarize":
+            resp["final_answer"] = CANNED_ANSWER if self._wants_tool(request_id) else CANNED_NO_TOOL_ANSWER
+        # "custom" (session summary updates) gets no custom_response, so the orchestrator skips the update
+        return resp
+
+    async def _handle(self, req: dict, headers: list):
+        step = req.get("step", "custom")
+        async with self._semaphore:
+            started = time.time()
+            base = self.latency.get(step, 0.2)
+            await asyncio.sleep(max(0.0, base * (1 + random.uniform(-self.jitter, self.jitter))))
+            compute = time.time() - started
+
+            resp = self._answer(req)
+            tokens = int(compute * self.tokens_per_second)
+            resp["usage"] = {"token_count": tokens, "total_duration": compute}
+
+        completed = time.time()
+        reply_headers = [
+            (k, v) for k, v in headers if k in ("trace_id", "step", "dispatched_at")
+        ] + [
+            ("worker_started_at", str(started).encode("utf-8")),
+            ("worker_completed_at", str(completed).encode("utf-8")),
+        ]
+        topic = req.get("response_topic")
+        if not topic:
+            return
+        await self._producer.send_and_wait(topic, resp, headers=reply_headers)
+        self.handled[step] = self.handled.get(step, 0) + 1
+
+    async def run(self):
+        self._producer = AIOKafkaProducer(
+            bootstrap_servers=self.bootstrap_servers,
+            value_serializer=lambda v: json.dumps(v).encode("utf-8")
+        )
+        consumer = AIOKafkaConsumer(
+            self.chat_topic,
+            bootstrap_servers=self.bootstrap_servers,
+            group_id="fake-llm-worker",
+            auto_offset_reset="latest",
+            value_deserializer=lambda m: json.loads(m.decode("utf-8"))
+        )
+        await self._producer.start()
+        await consumer.start()
+        logger.info(f"Fake LLM worker consuming {self.chat_topic}")
+        try:
+            async for msg in consumer:
+                req = msg.value
+                if req.get("type") == "ping":
+                    topic = req.get("response_topic")
+                    if topic:
+                        await self._producer.send_and_wait(topic, {"type": "pong", "source": "fake_llm_worker"})
+                    continue
+                task = asyncio.create_task(self._handle(req, msg.headers or []))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            await consumer.stop()
+            await self._producer.stop()
+
+
+def parse_latency(specs) -> Dict[str, float]:
+    latency = {}
+    for spec in specs or []:
+        step, _, seconds = spec.partition("=")
+        latency[step.strip()] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bootstrap", default="localhost:9092")
+    parser.add_argument("--chat-topic", default="bench-chat")
+    parser.add_argument("--latency", action="append", metavar="STEP=SECONDS", help="Override a step's latency, repeatable")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Relative +/- latency jitter")
+    parser.add_argument("--tool-ratio", type=float, default=0.5, help="Share of requests that run the search tool")
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s %(name)s - %(message)s")
+    worker = FakeLLMWorker(
+        args.bootstrap,
+        args.chat_topic,
+        latency=parse_latency(args.latency),
+        jitter=args.jitter,
+        tool_ratio=args.tool_ratio,
+        concurrency=args.concurrency,
+    )
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
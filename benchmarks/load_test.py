@@ -0,0 +1,291 @@
+"""
+Load test for the chat pipeline.
+
+Starts the API (uvicorn, app.main:app) against local stand-ins and drives
+POST /chat/{user_id}/request followed by the SSE status stream at a fixed
+concurrency. The stand-ins are:
+- Redis Stack, Mongo and Kafka from benchmarks/docker-compose.yml.
+- The fake LLM worker from benchmarks/fake_llm_worker.py, run in-process.
+- The repo's own MCP server, started by the app as usual.
+
+It reports throughput, latency percentiles (accepted, first event,
+final event) and the API process' CPU seconds per request.
+
+    docker compose -f benchmarks/docker-compose.yml up -d
+    python -m benchmarks.load_test --requests 200 --concurrency 20
+
+Pass --base-url to drive an already running server instead. Its CPU is
+then only reported when --server-pid is given.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.fake_llm_worker import FakeLLMWorker, parse_latency
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+MESSAGES = [
+    "Show me women between 25 and 35",
+    "Anyone who likes hiking?",
+    "Hi, how does this work?",
+    "Find me someone with a good sense of humour",
+    "Show me more like the last ones",
+]
+
+
+def standin_env(args) -> Dict[str, str]:
+    """Settings for the spawned API. Set explicitly so a local .env can't point it at real services."""
+    env = dict(os.environ)
+    env.update({
+        "PROJECT_NAME": "smrit-loadtest",
+        "MONGO_URI": args.mongo_uri,
+        "MONGO_DB_NAME": "bench",
+        "MONGO_CHAT_DB": "bench_chat",
+        "MONGO_PERSONALITY_DB": "bench_personality",
+        "REDIS_URL": args.redis_url,
+        "KAFKA_BOOTSTRAP_SERVERS": args.bootstrap,
+        "KAFKA_CHAT_TOPIC": args.chat_topic,
+        "KAFKA_RESPONSE_TOPIC": args.response_topic,
+        "KAFKA_STATUS_TOPIC": "bench-status",
+        "LOG_LEVEL": "WARNING",
+        "MCP_SERVER_SCRIPT": os.path.join(ROOT, "app", "mcp", "smrit_mcp_service.py"),
+    })
+    return env
+
+
+def cpu_seconds(pid: int) -> Optional[float]:
+    """utime + stime of a process from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # fields[0] is field 3 (state); utime and stime are fields 14 and 15
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def is_final_event(msg: dict) -> bool:
+    # Mirrors app.api.interaction._is_final_event
+    if msg.get("status") in ("AUDIO_READY", "AUDIO_FAILED"):
+        return True
+    if msg.get("final_answer") and not msg.get("audio_pending"):
+        return True
+    return bool(msg.get("error"))
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            r = await client.get("/api/v1/monitoring/metrics")
+            if r.status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"API not ready after {timeout}s")
+
+
+async def run_one(client: httpx.AsyncClient, user_id: str, message: str, timeout: float) -> dict:
+    result = {"ok": False, "accepted": None, "first_event": None, "total": None, "events": 0, "error": None}
+    t0 = time.monotonic()
+    try:
+        r = await client.post(f"/api/v1/chat/{user_id}/request", json={"message": message})
+        r.raise_for_status()
+        request_id = r.json()["request_id"]
+        result["accepted"] = time.monotonic() - t0
+
+        async with client.stream("GET", f"/api/v1/chat/status/{request_id}", timeout=timeout) as stream:
+            async for line in stream.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    msg = json.loads(line[5:].strip())
+                except json.JSONDecodeError:
+                    continue
+                result["events"] += 1
+                if result["first_event"] is None:
+                    result["first_event"] = time.monotonic() - t0
+                if is_final_event(msg):
+                    result["ok"] = not msg.get("error")
+                    if msg.get("error"):
+                        result["error"] = str(msg["error"])[:200]
+                    break
+        result["total"] = time.monotonic() - t0
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"[:200]
+    return result
+
+
+async def drive(base_url: str, total: int, concurrency: int, users: int, timeout: float, warmup: int, server_pid: Optional[int] = None) -> dict:
+    limits = httpx.Limits(max_connections=concurrency * 2 + 4, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        for i in range(warmup):
+            await run_one(client, f"bench-user-{i % users}", MESSAGES[i % len(MESSAGES)], timeout)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(total):
+            queue.put_nowait(i)
+        results = []
+
+        async def runner():
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                user_id = f"bench-user-{i % users}"
+                results.append(await run_one(client, user_id, random.choice(MESSAGES), timeout))
+
+        # Sampled around the timed section only, so startup and warmup aren't counted
+        cpu_before = cpu_seconds(server_pid) if server_pid else None
+        t0 = time.monotonic()
+        await asyncio.gather(*(runner() for _ in range(concurrency)))
+        elapsed = time.monotonic() - t0
+        cpu_after = cpu_seconds(server_pid) if server_pid else None
+        cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+
+        try:
+            server_metrics = (await client.get("/api/v1/monitoring/metrics")).json()
+        except Exception:
+            server_metrics = None
+
+    return {"results": results, "elapsed": elapsed, "cpu": cpu, "server_metrics": server_metrics}
+
+
+def summarize(run: dict) -> dict:
+    results = run["results"]
+    cpu = run["cpu"]
+    ok = [r for r in results if r["ok"]]
+
+    def dist(key):
+        values = [r[key] for r in ok if r[key] is not None]
+        return {
+            "mean": round(statistics.fmean(values), 4) if values else 0.0,
+            "p50": round(percentile(values, 0.50), 4),
+            "p90": round(percentile(values, 0.90), 4),
+            "p99": round(percentile(values, 0.99), 4),
+            "max": round(max(values), 4) if values else 0.0,
+        }
+
+    errors: Dict[str, int] = {}
+    for r in results:
+        if not r["ok"]:
+            errors[r["error"] or "no final event"] = errors.get(r["error"] or "no final event", 0) + 1
+
+    report = {
+        "requests": len(results),
+        "succeeded": len(ok),
+        "failed": len(results) - len(ok),
+        "elapsed_seconds": round(run["elapsed"], 3),
+        "throughput_rps": round(len(ok) / run["elapsed"], 3) if run["elapsed"] else 0.0,
+        "latency_seconds": {key: dist(key) for key in ("accepted", "first_event", "total")},
+        "server_cpu_seconds": round(cpu, 3) if cpu is not None else None,
+        "server_cpu_ms_per_request": round(cpu * 1000 / len(results), 2) if cpu is not None and results else None,
+        "errors": errors,
+    }
+    metrics = run.get("server_metrics") or {}
+    if metrics.get("llm"):
+        report["server_llm_breakdown"] = metrics["llm"].get("breakdown_by_step")
+    if metrics.get("stages"):
+        report["server_stages"] = metrics["stages"]
+    return report
+
+
+async def main_async(args) -> dict:
+    server = None
+    worker_task = None
+    server_pid = args.server_pid
+    base_url = args.base_url
+
+    if not args.no_worker:
+        worker = FakeLLMWorker(
+            args.bootstrap,
+            args.chat_topic,
+            latency=parse_latency(args.latency),
+            tool_ratio=args.tool_ratio,
+            concurrency=args.worker_concurrency,
+        )
+        worker_task = asyncio.create_task(worker.run())
+
+    try:
+        if not base_url:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+                cwd=ROOT,
+                env=standin_env(args),
+            )
+            server_pid = server.pid
+            base_url = f"http://localhost:{args.port}"
+
+        async with httpx.AsyncClient(base_url=base_url) as probe:
+            await wait_until_ready(probe, 120)
+        run = await drive(base_url, args.requests, args.concurrency, args.users, args.timeout, args.warmup, server_pid)
+        return summarize(run)
+
+    finally:
+        if server:
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        if worker_task:
+            worker_task.cancel()
+            try:
+                await worker_task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=20, help="Distinct user ids to spread requests over")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=90.0)
+    parser.add_argument("--base-url", help="Drive a running server instead of spawning one")
+    parser.add_argument("--server-pid", type=int, help="PID of the --base-url server, for CPU accounting")
+    parser.add_argument("--port", type=int, default=8000, help="The MCP server calls back on :8000")
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--bootstrap", default="localhost:9092")
+    parser.add_argument("--chat-topic", default="bench-chat")
+    parser.add_argument("--response-topic", default="bench-response")
+    parser.add_argument("--no-worker", action="store_true", help="Don't start the in-process fake LLM worker")
+    parser.add_argument("--latency", action="append", metavar="STEP=SECONDS", help="Fake worker step latency, repeatable")
+    parser.add_argument("--tool-ratio", type=float, default=0.5)
+    parser.add_argument("--worker-concurrency", type=int, default=64)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
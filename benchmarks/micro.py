@@ -0,0 +1,246 @@
+"""
+Microbenchmarks for the pure-Python work done on every chat request.
+
+Fixtures come from the repo: personas from agents.json, profiles and
+attributes from app/mcp/recommendations.json, and the real search tool
+schemas from the MCP server definition. Each case is timed with timeit
+(auto-ranged loop count, best and median of --repeat runs).
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter prompt --json bench_output.txt
+    python -m benchmarks.micro --compare bench_output.txt
+
+--compare prints the change against a previous --json report, so a
+regression or an optimization shows up as a percentage per case.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Settings() validates at import time. Nothing here touches the network,
+# so unset connection settings only need placeholder values.
+for _name in (
+    "PROJECT_NAME", "MONGO_URI", "MONGO_DB_NAME", "MONGO_CHAT_DB", "MONGO_PERSONALITY_DB",
+    "KAFKA_BOOTSTRAP_SERVERS", "KAFKA_CHAT_TOPIC", "KAFKA_RESPONSE_TOPIC", "KAFKA_STATUS_TOPIC",
+    "MCP_SERVER_SCRIPT", "ELEVEN_LABS_API_KEY", "AZURE_STORAGE_CONNECTION_STRING",
+    "AZURE_STORAGE_CONTAINER_NAME", "AZURE_DEPLOYMENT", "AZURE_API_KEY", "AZURE_API_VERSION",
+    "PERPLEXITY_API_KEY",
+):
+    os.environ.setdefault(_name, "bench")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://bench.invalid")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.api.schemas import SessionSummary  # noqa: E402
+from app.services import prompts  # noqa: E402
+from app.services.azure_openai_service import extract_json  # noqa: E402
+from app.services.mcp_service import MCPClient  # noqa: E402
+from app.services.redis_service import build_filter_query  # noqa: E402
+from app.utils.random_utils import merge_tool_args, persona_json_to_system_prompt, validate_and_clean_tool_args  # noqa: E402
+
+AGENTS_PATH = os.path.join(ROOT, "agents.json")
+RECOMMENDATIONS_PATH = os.path.join(ROOT, "app", "mcp", "recommendations.json")
+
+
+# --------------------------
+# Fixtures
+# --------------------------
+def load_personas() -> List[dict]:
+    with open(AGENTS_PATH) as f:
+        return [agent["personality"] for agent in json.load(f)["data"] if agent.get("personality")]
+
+
+def load_profiles() -> List[dict]:
+    with open(RECOMMENDATIONS_PATH) as f:
+        data = json.load(f)
+    return [
+        {**profile, "category": category}
+        for category, by_gender in data.items()
+        for profiles in by_gender.values()
+        for profile in profiles
+    ]
+
+
+def load_tool_schemas() -> List[dict]:
+    """Raw input schemas ($defs, anyOf) exactly as the MCP server lists them."""
+    from app.mcp.smrit_mcp_service import mcp
+    tools = asyncio.run(mcp.list_tools())
+    return [{"name": tool.name, "description": tool.description or "", "inputSchema": tool.inputSchema} for tool in tools]
+
+
+def build_fixtures() -> Dict[str, Any]:
+    rng = random.Random(7)
+    personas = load_personas()
+    profiles = load_profiles()
+    tools = load_tool_schemas()
+
+    client = MCPClient(server_path="", pool_size=1)
+    cleaned = {tool["name"]: client.clean_schema(tool["inputSchema"]) for tool in tools}
+    search_schema = cleaned.get("search_profiles") or next(iter(cleaned.values()))
+    enum_sets = {
+        name: frozenset(details["enum"])
+        for name, details in search_schema.get("properties", {}).items()
+        if isinstance(details, dict) and "enum" in details
+    }
+
+    attribute_values: Dict[str, set] = {}
+    for profile in profiles:
+        for key, value in (profile.get("image_attributes") or {}).items():
+            attribute_values.setdefault(key, set()).add(value)
+
+    # A 5-turn history like the one kept in Redis, with one tool turn
+    history = []
+    for i in range(5):
+        history.append({"role": "user", "content": f"Show me {rng.choice(profiles)['name'].lower()} profiles, around {25 + i} years old"})
+        history.append({"role": "assistant", "content": "Here are a few people you might like. Want me to narrow it down by city?"})
+    history.append({"role": "tool", "name": "search_profiles", "args": json.dumps({"gender": "female", "min_age": 25})})
+
+    # Tool args as the LLM extracts them: valid filters, some junk, some empty
+    llm_args = {
+        "user_id": "930",
+        "gender": ["female", "other"],
+        "min_age": 24,
+        "max_age": 32,
+        "location": "Mumbai",
+        "page": 1,
+        "hobby": "",
+        "unknown_field": "x",
+    }
+    for key, values in attribute_values.items():
+        if key in search_schema.get("properties", {}):
+            # Keep at least one allowed value, otherwise the validator logs on every call
+            allowed = sorted(v for v in values if key not in enum_sets or v in enum_sets[key])
+            if allowed:
+                llm_args[key] = allowed[:2]
+
+    filters = {
+        "gender": ["female"],
+        "age": {"min": 24, "max": 32},
+        **{key: sorted(values)[:2] for key, values in attribute_values.items() if key != "gender"},
+    }
+    geo_filter = {"latitude": 19.076, "longitude": 72.8777, "radius_km": 10}
+
+    tool_result = {"count": len(profiles), "docs": profiles[:10]}
+    llm_output = (
+        "Sure, here is the decision:\n```json\n"
+        + json.dumps({"decision": "tool", "tool_args": llm_args, "docs": profiles[:5]}, indent=2)
+        + "\n```\nLet me know if you need anything else."
+    )
+
+    session_summary = SessionSummary(
+        user_id="930",
+        important_points=["Prefers partners in Mumbai", "Likes hiking and indie music"],
+        user_details=["Software engineer", "Vegetarian"],
+    )
+    user_profile = {"name": "Asha", "age": 29, "gender": "female", "address": "Mumbai", "country": "India", "tags": ["hiking", "music", "travel"]}
+
+    return {
+        "personas": personas,
+        "tools": tools,
+        "client": client,
+        "search_schema": search_schema,
+        "search_schema_json": json.dumps(search_schema, indent=2),
+        "tool_descriptions": client.format_tool_descriptions_for_llm([
+            {"name": tool["name"], "description": tool["description"], "input_schema": cleaned[tool["name"]]}
+            for tool in tools
+        ]),
+        "enum_sets": enum_sets,
+        "history": history,
+        "history_str": prompts.format_history_for_prompt(history),
+        "llm_args": llm_args,
+        "persisted_args": {"user_id": "930", "gender": ["female"], "min_age": 25, "max_age": 30, "page": 2},
+        "filters": filters,
+        "geo_filter": geo_filter,
+        "tool_result": json.dumps(tool_result),
+        "llm_output": llm_output,
+        "session_summary": session_summary,
+        "user_profile": user_profile,
+        "personality": persona_json_to_system_prompt(personas[0]),
+    }
+
+
+# --------------------------
+# Cases
+# --------------------------
+def build_cases(fx: Dict[str, Any]) -> List[Tuple[str, Callable[[], Any]]]:
+    client = fx["client"]
+    tools = fx["tools"]
+    schema = fx["search_schema"]
+    personas = fx["personas"]
+
+    return [
+        ("redis.build_filter_query", lambda: build_filter_query(fx["filters"], fx["geo_filter"])),
+        ("redis.build_filter_query[empty]", lambda: build_filter_query(None, None)),
+        ("validate_and_clean_tool_args", lambda: validate_and_clean_tool_args(fx["llm_args"], schema)),
+        ("validate_and_clean_tool_args[enum_sets]", lambda: validate_and_clean_tool_args(fx["llm_args"], schema, fx["enum_sets"])),
+        ("merge_tool_args", lambda: merge_tool_args(fx["persisted_args"], fx["llm_args"])),
+        ("merge_tool_args[next_page]", lambda: merge_tool_args(fx["persisted_args"], {"page": 1})),
+        ("format_history_for_prompt", lambda: prompts.format_history_for_prompt(fx["history"])),
+        ("prompts.get_tool_check_prompt", lambda: prompts.get_tool_check_prompt(fx["history_str"], fx["tool_descriptions"])),
+        ("prompts.get_tool_selection_prompt", lambda: prompts.get_tool_selection_prompt(fx["tool_descriptions"], fx["history_str"])),
+        ("prompts.get_tool_args_prompt", lambda: prompts.get_tool_args_prompt("search_profiles", "", fx["search_schema_json"], fx["history_str"])),
+        ("prompts.get_tool_summary_prompt", lambda: prompts.get_tool_summary_prompt(
+            fx["history_str"], True, fx["tool_result"], fx["personality"], fx["session_summary"], fx["user_profile"])),
+        ("prompts.get_no_tool_summary_prompt", lambda: prompts.get_no_tool_summary_prompt(
+            fx["history_str"], fx["personality"], fx["session_summary"], fx["user_profile"], fx["tool_descriptions"])),
+        ("prompts.get_clarification_summary_prompt", lambda: prompts.get_clarification_summary_prompt(
+            fx["history_str"], fx["personality"], fx["session_summary"], fx["user_profile"], fx["tool_descriptions"])),
+        ("persona_json_to_system_prompt", lambda: [persona_json_to_system_prompt(p) for p in personas]),
+        ("mcp.clean_schema", lambda: [client.clean_schema(tool["inputSchema"]) for tool in tools]),
+        ("extract_json[fenced]", lambda: extract_json(fx["llm_output"])),
+        ("extract_json[raw]", lambda: extract_json(fx["tool_result"])),
+    ]
+
+
+def run_case(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "best_us": round(min(runs) * 1e6, 3),
+        "median_us": round(statistics.median(runs) * 1e6, 3),
+        "loops": number,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="Only run cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    parser.add_argument("--compare", help="Previous --json report to compare against")
+    args = parser.parse_args()
+
+    cases = build_cases(build_fixtures())
+    if args.filter:
+        cases = [(name, fn) for name, fn in cases if args.filter in name]
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    width = max(len(name) for name, _ in cases)
+    print(f"{'case':<{width}}  {'best µs':>10}  {'median µs':>10}  {'vs base':>8}")
+    for name, fn in cases:
+        res = results[name] = run_case(fn, args.repeat)
+        delta = ""
+        if name in baseline and baseline[name].get("best_us"):
+            delta = f"{(res['best_us'] / baseline[name]['best_us'] - 1) * 100:+.1f}%"
+        print(f"{name:<{width}}  {res['best_us']:>10.2f}  {res['median_us']:>10.2f}  {delta:>8}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
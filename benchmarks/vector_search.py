@@ -0,0 +1,343 @@
+"""
+Vector search benchmark: RediSearch FLAT vs HNSW vs NumPy brute force.
+
+Generates synthetic profiles with 512-d normalized embeddings, drawn from a
+mixture of clusters, and skewed tag distributions. They are loaded as the
+same RedisJSON documents save_profile writes (profile_document), then
+indexed with the production schema (profile_index_schema). FLAT and every
+HNSW variant index the same documents, so the data is loaded only once per
+size.
+
+For every configuration, with and without a tag/age pre-filter, it reports:
+- KNN latency (mean/p50/p95).
+- recall@k against exact NumPy results.
+- Index memory from FT.INFO.
+The NumPy baselines are a full matmul and a matmul over the pre-selected rows.
+
+    docker compose -f benchmarks/docker-compose.yml up -d redis
+    python -m benchmarks.vector_search --sizes 10000,100000 --ef 10,50,200
+
+1M profiles need roughly 10 GB of Redis memory, because the embeddings are
+also kept as JSON arrays in the documents.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import redis.asyncio as redis
+from redis.commands.search.index_definition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
+
+# The app's Settings() validates at import time; only REDIS_URL matters here
+for _name in (
+    "PROJECT_NAME", "MONGO_URI", "MONGO_DB_NAME", "MONGO_CHAT_DB", "MONGO_PERSONALITY_DB",
+    "KAFKA_BOOTSTRAP_SERVERS", "KAFKA_CHAT_TOPIC", "KAFKA_RESPONSE_TOPIC", "KAFKA_STATUS_TOPIC",
+    "LOG_LEVEL", "MCP_SERVER_SCRIPT", "ELEVEN_LABS_API_KEY", "AZURE_STORAGE_CONNECTION_STRING",
+    "AZURE_STORAGE_CONTAINER_NAME", "AZURE_OPENAI_ENDPOINT", "AZURE_DEPLOYMENT", "AZURE_API_KEY",
+    "AZURE_API_VERSION", "PERPLEXITY_API_KEY",
+):
+    os.environ.setdefault(_name, "bench")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+
+from app.services.redis_service import build_filter_query, profile_document, profile_index_schema  # noqa: E402
+
+DIM = 512
+BENCH_USER = "vecbench"
+
+# value -> weight; skewed like a real user base rather than uniform
+TAG_DISTRIBUTIONS: Dict[str, Dict[str, float]] = {
+    "gender": {"female": 0.48, "male": 0.52},
+    "ethnicity": {"indian": 0.62, "asian": 0.14, "white": 0.12, "black": 0.06, "hispanic": 0.04, "middle_eastern": 0.02},
+    "religion": {"hindu": 0.55, "muslim": 0.15, "christian": 0.12, "sikh": 0.06, "jain": 0.04, "buddhist": 0.03, "none": 0.05},
+    "diet": {"vegetarian": 0.38, "non_vegetarian": 0.5, "vegan": 0.05, "eggetarian": 0.07},
+    "hair_length": {"short": 0.45, "medium": 0.3, "long": 0.25},
+    "attire": {"casual": 0.5, "formal": 0.2, "traditional": 0.3},
+    "emotion": {"happy": 0.6, "neutral": 0.3, "serious": 0.1},
+    "marital_status": {"never_married": 0.85, "divorced": 0.1, "widowed": 0.05},
+}
+TAGS = ["hiking", "music", "travel", "cooking", "reading", "fitness", "movies", "gaming", "art", "dance", "photography", "yoga"]
+CITIES = [(19.076, 72.8777), (28.6139, 77.209), (12.9716, 77.5946), (13.0827, 80.2707), (22.5726, 88.3639), (17.385, 78.4867)]
+
+# The pre-filter used in the "filtered" runs: selects roughly 15% of profiles
+BENCH_FILTERS = {"gender": "female", "religion": "hindu", "age": {"min": 24, "max": 32}}
+
+
+# --------------------------
+# Synthetic data
+# --------------------------
+def make_embeddings(n: int, rng: np.random.Generator, clusters: int = 256, spread: float = 0.35) -> np.ndarray:
+    """Unit vectors around `clusters` centroids, like face embeddings of similar-looking people."""
+    centers = rng.standard_normal((clusters, DIM)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    assignment = rng.integers(0, clusters, n)
+    vectors = centers[assignment] + spread * rng.standard_normal((n, DIM)).astype(np.float32) / np.sqrt(DIM) * 4
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def make_attributes(n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    attrs = {}
+    for field, dist in TAG_DISTRIBUTIONS.items():
+        values = list(dist)
+        p = np.array(list(dist.values()), dtype=np.float64)
+        attrs[field] = np.array(values)[rng.choice(len(values), n, p=p / p.sum())]
+    attrs["age"] = np.clip(rng.normal(30, 6, n), 18, 65).astype(np.int32)
+    attrs["city"] = rng.integers(0, len(CITIES), n)
+    return attrs
+
+
+def make_document(i: int, attrs: Dict[str, np.ndarray], rng: np.random.Generator, embedding: np.ndarray) -> dict:
+    lat, lon = CITIES[int(attrs["city"][i])]
+    profile = {
+        "id": f"p{i}",
+        "customId": f"bench-{i}",
+        "name": f"profile_{i}",
+        "age": int(attrs["age"][i]),
+        "image_url": f"https://example.invalid/{i}.jpg",
+        "image_attributes": {field: str(attrs[field][i]) for field in TAG_DISTRIBUTIONS},
+        "tags": [TAGS[j] for j in rng.choice(len(TAGS), 3, replace=False)],
+        "geo_location": {"latitude": lat + rng.normal(0, 0.05), "longitude": lon + rng.normal(0, 0.05)},
+    }
+    return profile_document(profile, embedding.tolist())
+
+
+def filter_mask(attrs: Dict[str, np.ndarray]) -> np.ndarray:
+    mask = np.ones(len(attrs["age"]), dtype=bool)
+    for field, value in BENCH_FILTERS.items():
+        if isinstance(value, dict):
+            mask &= (attrs[field] >= value["min"]) & (attrs[field] <= value["max"])
+        else:
+            mask &= attrs[field] == value
+    return mask
+
+
+# --------------------------
+# Helpers
+# --------------------------
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+def exact_topk(vectors: np.ndarray, queries: np.ndarray, k: int, rows: Optional[np.ndarray] = None) -> List[List[int]]:
+    """Ground truth: cosine similarity is a dot product on unit vectors."""
+    base = vectors if rows is None else vectors[rows]
+    scores = queries @ base.T
+    top = np.argpartition(-scores, min(k, base.shape[0] - 1), axis=1)[:, :k]
+    result = []
+    for qi, idx in enumerate(top):
+        idx = idx[np.argsort(-scores[qi, idx])]
+        result.append([int(rows[j]) if rows is not None else int(j) for j in idx])
+    return result
+
+
+def recall(found: List[List[int]], truth: List[List[int]], k: int) -> float:
+    hits = sum(len(set(f[:k]) & set(t[:k])) for f, t in zip(found, truth))
+    total = sum(min(k, len(t)) for t in truth)
+    return round(hits / total, 4) if total else 1.0
+
+
+async def load_documents(client, prefix: str, vectors: np.ndarray, attrs: Dict[str, np.ndarray], rng: np.random.Generator, batch: int):
+    for start in range(0, len(vectors), batch):
+        pipe = client.json().pipeline(transaction=False)
+        for i in range(start, min(start + batch, len(vectors))):
+            pipe.set(f"{prefix}p{i}", "$", make_document(i, attrs, rng, vectors[i]))
+        await pipe.execute()
+
+
+async def wait_indexed(client, index_name: str, timeout: float = 3600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = await client.ft(index_name).info()
+        if str(info.get("indexing", "0")) in ("0", "0.0") and float(info.get("percent_indexed", 1)) >= 1:
+            return info
+        await asyncio.sleep(0.5)
+    raise TimeoutError(f"{index_name} still indexing after {timeout}s")
+
+
+def index_memory(info: dict) -> Dict[str, float]:
+    keys = ("vector_index_sz_mb", "inverted_sz_mb", "total_index_memory_sz_mb", "doc_table_size_mb")
+    return {key: round(float(info[key]), 2) for key in keys if key in info}
+
+
+async def redis_knn(client, index_name: str, queries: np.ndarray, k: int, filter_str: str, ef: Optional[int]) -> Tuple[List[List[int]], List[float]]:
+    # Same query shape as RedisService.search, plus EF_RUNTIME for HNSW
+    ef_clause = f" EF_RUNTIME {ef}" if ef else ""
+    q = Query(f"({filter_str})=>[KNN {k} @embeddings $vec_blob{ef_clause} AS score]") \
+        .sort_by("score").dialect(2).return_fields("id", "score").paging(0, k)
+    found, samples = [], []
+    for vector in queries:
+        t0 = time.perf_counter()
+        res = await client.ft(index_name).search(q, query_params={"vec_blob": vector.tobytes()})
+        samples.append(time.perf_counter() - t0)
+        found.append([int(doc.id.rsplit(":p", 1)[1]) for doc in res.docs])
+    return found, samples
+
+
+def numpy_knn(vectors: np.ndarray, queries: np.ndarray, k: int, mask: Optional[np.ndarray], preselect: bool) -> Tuple[List[List[int]], List[float]]:
+    """One query at a time, like a request. `preselect` gathers the filtered rows first instead of masking scores."""
+    rows = np.flatnonzero(mask) if mask is not None else None
+    found, samples = [], []
+    for vector in queries:
+        t0 = time.perf_counter()
+        if mask is None:
+            scores = vectors @ vector
+            idx = np.argpartition(-scores, k)[:k]
+            idx = idx[np.argsort(-scores[idx])]
+        elif preselect:
+            sub = vectors[rows]
+            scores = sub @ vector
+            kk = min(k, len(rows) - 1)
+            idx = np.argpartition(-scores, kk)[:k]
+            idx = rows[idx[np.argsort(-scores[idx])]]
+        else:
+            scores = vectors @ vector
+            scores[~mask] = -np.inf
+            idx = np.argpartition(-scores, k)[:k]
+            idx = idx[np.argsort(-scores[idx])]
+        samples.append(time.perf_counter() - t0)
+        found.append([int(i) for i in idx])
+    return found, samples
+
+
+# --------------------------
+# Runner
+# --------------------------
+async def bench_size(client, n: int, args) -> List[dict]:
+    rng = np.random.default_rng(args.seed + n)
+    vectors = make_embeddings(n, rng)
+    attrs = make_attributes(n, rng)
+    mask = filter_mask(attrs)
+    # Queries near existing profiles, as an uploaded photo of a real person would be
+    picks = rng.integers(0, n, args.queries)
+    queries = vectors[picks] + 0.05 * rng.standard_normal((args.queries, DIM)).astype(np.float32) / np.sqrt(DIM) * 4
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+    truth = {
+        "none": exact_topk(vectors, queries, args.k),
+        "filtered": exact_topk(vectors, queries, args.k, np.flatnonzero(mask)),
+    }
+    filter_strs = {"none": "*", "filtered": build_filter_query(BENCH_FILTERS)}
+    rows: List[dict] = []
+
+    def add(engine: str, variant: str, found, samples, memory: Dict[str, float], build_s: Optional[float] = None):
+        rows.append({
+            "size": n,
+            "engine": engine,
+            "filter": variant,
+            "selectivity": round(float(mask.mean()), 4) if variant == "filtered" else 1.0,
+            **latency_summary(samples),
+            f"recall@{args.k}": recall(found, truth[variant], args.k),
+            "memory_mb": memory,
+            "build_s": build_s,
+        })
+        print(json.dumps(rows[-1]))
+
+    # NumPy
+    numpy_memory = {"matrix_mb": round(vectors.nbytes / 2**20, 2)}
+    for variant in ("none", "filtered"):
+        found, samples = numpy_knn(vectors, queries, args.k, mask if variant == "filtered" else None, preselect=False)
+        add("numpy", variant, found, samples, numpy_memory)
+    found, samples = numpy_knn(vectors, queries, args.k, mask, preselect=True)
+    add("numpy[preselect]", "filtered", found, samples, numpy_memory)
+
+    if args.numpy_only:
+        return rows
+
+    prefix = f"doc:{BENCH_USER}{n}:"
+    await cleanup(client, n)
+    used_before = (await client.info("memory"))["used_memory"]
+    t0 = time.monotonic()
+    await load_documents(client, prefix, vectors, attrs, np.random.default_rng(args.seed), args.batch)
+    load_s = time.monotonic() - t0
+    docs_mb = round(((await client.info("memory"))["used_memory"] - used_before) / 2**20, 2)
+    print(json.dumps({"size": n, "documents_loaded_s": round(load_s, 2), "documents_mb": docs_mb}))
+
+    configs: List[Tuple[str, str, Optional[dict], List[Optional[int]]]] = [("flat", "FLAT", None, [None])]
+    configs.append(("hnsw", "HNSW", {"M": args.m, "EF_CONSTRUCTION": args.ef_construction}, args.ef))
+
+    for label, algorithm, params, ef_values in configs:
+        index_name = f"idx:{BENCH_USER}{n}:{label}"
+        t0 = time.monotonic()
+        await client.ft(index_name).create_index(
+            profile_index_schema(algorithm, params),
+            definition=IndexDefinition(prefix=[prefix], index_type=IndexType.JSON)
+        )
+        info = await wait_indexed(client, index_name)
+        build_s = round(time.monotonic() - t0, 2)
+        memory = index_memory(info)
+
+        for ef in ef_values:
+            engine = f"redis[{label}]" if ef is None else f"redis[{label},ef={ef}]"
+            for variant in ("none", "filtered"):
+                found, samples = await redis_knn(client, index_name, queries, args.k, filter_strs[variant], ef)
+                add(engine, variant, found, samples, memory, build_s)
+
+        await client.ft(index_name).dropindex(delete_documents=False)
+
+    if not args.keep:
+        await cleanup(client, n)
+    return rows
+
+
+async def cleanup(client, n: int):
+    for label in ("flat", "hnsw"):
+        try:
+            await client.ft(f"idx:{BENCH_USER}{n}:{label}").dropindex(delete_documents=False)
+        except Exception:
+            pass
+    cursor = 0
+    while True:
+        cursor, keys = await client.scan(cursor, match=f"doc:{BENCH_USER}{n}:*", count=5000)
+        if keys:
+            await client.unlink(*keys)
+        if cursor == 0:
+            break
+
+
+async def main_async(args) -> List[dict]:
+    client = redis.from_url(args.redis_url, decode_responses=True)
+    try:
+        rows = []
+        for n in args.sizes:
+            rows.extend(await bench_size(client, n, args))
+        return rows
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated profile counts, e.g. 10000,100000,1000000")
+    parser.add_argument("--ef", default="10,50,100,200", help="HNSW EF_RUNTIME values")
+    parser.add_argument("--m", type=int, default=16, help="HNSW M")
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5, help="Matches RedisService.search's default k")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=500, help="Documents per pipeline when loading")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--redis-url", default=os.environ["REDIS_URL"])
+    parser.add_argument("--numpy-only", action="store_true", help="Skip Redis, only run the NumPy baselines")
+    parser.add_argument("--keep", action="store_true", help="Leave the benchmark documents in Redis")
+    parser.add_argument("--output", help="Write all result rows as JSON to this file")
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(",") if s]
+    args.ef = [int(e) for e in args.ef.split(",") if e]
+
+    rows = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import importlib
+import os
+
+import pytest
+
+# Settings() validates at import time; nothing in these tests touches the network
+APP_ENV = {
+    **{
+        name: "test"
+        for name in (
+            "PROJECT_NAME", "MONGO_URI", "MONGO_DB_NAME", "MONGO_CHAT_DB", "MONGO_PERSONALITY_DB",
+            "KAFKA_BOOTSTRAP_SERVERS", "KAFKA_CHAT_TOPIC", "KAFKA_RESPONSE_TOPIC", "KAFKA_STATUS_TOPIC",
+            "MCP_SERVER_SCRIPT", "ELEVEN_LABS_API_KEY", "AZURE_STORAGE_CONNECTION_STRING",
+            "AZURE_STORAGE_CONTAINER_NAME", "AZURE_DEPLOYMENT", "AZURE_API_KEY", "AZURE_API_VERSION",
+            "PERPLEXITY_API_KEY",
+        )
+    },
+    "REDIS_URL": "redis://localhost:6379",
+    "AZURE_OPENAI_ENDPOINT": "https://test.invalid",
+}
+
+
+@pytest.fixture
+def import_app(monkeypatch):
+    """
+    Import an app module with placeholder settings, restored after the test.
+    Skips when one of the app's dependencies isn't installed.
+    """
+    for name, value in APP_ENV.items():
+        if name not in os.environ:
+            monkeypatch.setenv(name, value)
+
+    def load(module: str):
+        try:
+            return importlib.import_module(module)
+        except ModuleNotFoundError as e:
+            if e.name and e.name.split(".")[0] == "app":
+                raise
+            pytest.skip(f"{e.name} is not installed")
+
+    return load
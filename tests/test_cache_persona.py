@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+UPDATED_AT = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def persona_doc(name: str, updated_at: datetime = UPDATED_AT) -> dict:
+    return {
+        "persona_id": "p1",
+        "user_id": "u1",
+        "voice_id": "voice-1",
+        "personality": {"identity": {"name": name, "languages": ["English"]}},
+        "created_at": UPDATED_AT,
+        "updated_at": updated_at,
+    }
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.published = []
+
+    async def get_persona_cache(self, cache_key):
+        return self.store.get(cache_key)
+
+    async def save_persona_cache(self, cache_key, data, ttl):
+        self.store[cache_key] = data
+
+    async def delete_persona_cache(self, cache_key):
+        self.store.pop(cache_key, None)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+class FakePersonalityService:
+    def __init__(self, doc):
+        self.doc = doc
+        self.calls = 0
+        self.block = False
+        self.release = asyncio.Event()
+
+    async def get(self, user_id, personality_id):
+        self.calls += 1
+        # Reads the document as it is when the query starts
+        doc = dict(self.doc) if self.doc else None
+        if self.block:
+            await self.release.wait()
+        return doc
+
+
+@pytest.fixture
+def make_cache(import_app, monkeypatch):
+    module = import_app("app.utils.cache_persona")
+
+    def make(redis: FakeRedis, personalities: FakePersonalityService):
+        monkeypatch.setattr(module, "redis_service", redis)
+        monkeypatch.setattr(module, "personality_service", personalities)
+        return module.CachePersona(max_size=10, ttl=300, redis_ttl=3600)
+
+    return make
+
+
+async def _until(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition never became true")
+
+
+def test_concurrent_misses_share_one_load(make_cache):
+    async def run():
+        redis, personalities = FakeRedis(), FakePersonalityService(persona_doc("Mira"))
+        cache = make_cache(redis, personalities)
+
+        personas = await asyncio.gather(*(cache.get_persona("u1", "p1") for _ in range(5)))
+
+        assert personalities.calls == 1
+        assert cache.get_stats()["coalesced"] == 4
+        assert all(p["personality"]["identity"]["name"] == "Mira" for p in personas)
+        assert "u1:p1" in redis.store
+
+    asyncio.run(run())
+
+
+def test_redis_tier_returns_the_same_types_as_mongo(make_cache):
+    async def run():
+        redis, personalities = FakeRedis(), FakePersonalityService(persona_doc("Mira"))
+        from_db = await make_cache(redis, personalities).get_persona("u1", "p1")
+        # A second process only finds it in Redis
+        from_redis = await make_cache(redis, personalities).get_persona("u1", "p1")
+
+        assert personalities.calls == 1
+        assert isinstance(from_db["updated_at"], datetime)
+        assert from_redis == from_db
+
+    asyncio.run(run())
+
+
+def test_update_during_load_keeps_the_new_persona(make_cache):
+    async def run():
+        redis, personalities = FakeRedis(), FakePersonalityService(persona_doc("Old"))
+        cache = make_cache(redis, personalities)
+
+        personalities.block = True
+        pending = asyncio.create_task(cache.get_persona("u1", "p1"))
+        await _until(lambda: personalities.calls)
+
+        personalities.block = False
+        personalities.doc = persona_doc("New", datetime(2026, 1, 2))
+        updated = await cache.update_persona("u1", "p1")
+        personalities.release.set()
+
+        assert (await pending)["personality"]["identity"]["name"] == "Old"
+        assert updated["personality"]["identity"]["name"] == "New"
+        # Neither tier was overwritten by the older load
+        assert (await cache.get_persona("u1", "p1"))["personality"]["identity"]["name"] == "New"
+        assert "New" in redis.store["u1:p1"]
+        assert personalities.calls == 2
+
+    asyncio.run(run())
+
+
+def test_delete_during_load_does_not_resurrect(make_cache):
+    async def run():
+        redis, personalities = FakeRedis(), FakePersonalityService(persona_doc("Old"))
+        cache = make_cache(redis, personalities)
+
+        personalities.block = True
+        pending = asyncio.create_task(cache.get_persona("u1", "p1"))
+        await _until(lambda: personalities.calls)
+
+        personalities.doc = None
+        await cache.delete_persona("u1", "p1")
+        personalities.release.set()
+        await pending
+
+        assert "u1:p1" not in redis.store
+        assert "u1:p1" not in cache.cache
+        with pytest.raises(ValueError):
+            await cache.get_persona("u1", "p1")
+
+    asyncio.run(run())
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+PROFILE = {"name": "Asha", "age": 29}
+UPDATED = {"name": "Asha", "age": 30}
+
+
+class FakeRedis:
+    def __init__(self, profile=None, ttl: int = -2):
+        self.profile = profile
+        self.ttl = ttl
+        self.saves = 0
+
+    async def get_person_profile_with_ttl(self, user_id, person_id):
+        return (dict(self.profile), self.ttl) if self.profile else (None, -2)
+
+    async def save_person_profile_cache(self, user_id, person_id, profile, ttl):
+        self.saves += 1
+        self.profile, self.ttl = dict(profile), ttl
+
+    async def delete_person_profile_cache(self, user_id, person_id):
+        self.profile, self.ttl = None, -2
+
+
+class FakeMongo:
+    def __init__(self, profile):
+        self.profile = profile
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def get_profile(self, user_id, person_id, projection):
+        self.calls += 1
+        # Reads the document as it is when the query starts
+        profile = dict(self.profile)
+        await self.release.wait()
+        return profile
+
+
+@pytest.fixture
+def make_cache(import_app, monkeypatch):
+    module = import_app("app.utils.person_profile_cache")
+
+    def make(redis: FakeRedis, mongo: FakeMongo):
+        monkeypatch.setattr(module, "redis_service", redis)
+        monkeypatch.setattr(module, "mongo_service", mongo)
+        # local_ttl=0 sends every get() to Redis
+        return module.PersonProfileCache(local_ttl=0, redis_ttl=1000, refresh_ahead_ratio=0.1)
+
+    return make
+
+
+async def _until(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition never became true")
+
+
+def test_near_expiry_hit_refreshes_once(make_cache):
+    async def run():
+        redis, mongo = FakeRedis(PROFILE, ttl=10), FakeMongo(UPDATED)
+        cache = make_cache(redis, mongo)
+
+        results = await asyncio.gather(*(cache.get("u1", "p1") for _ in range(5)))
+        assert all(r == PROFILE for r in results)
+        # A later hit while the refresh is still loading doesn't start another
+        assert await cache.get("u1", "p1") == PROFILE
+        await _until(lambda: mongo.calls)
+
+        mongo.release.set()
+        await asyncio.gather(*cache._refreshing.values())
+
+        assert mongo.calls == 1
+        assert cache.refreshes == 1
+        assert redis.profile == UPDATED
+        assert not cache._refreshing
+
+    asyncio.run(run())
+
+
+def test_fresh_hit_does_not_refresh(make_cache):
+    async def run():
+        redis, mongo = FakeRedis(PROFILE, ttl=900), FakeMongo(UPDATED)
+        cache = make_cache(redis, mongo)
+
+        assert await cache.get("u1", "p1") == PROFILE
+        await asyncio.sleep(0)
+
+        assert mongo.calls == 0
+        assert cache.refreshes == 0
+
+    asyncio.run(run())
+
+
+def test_invalidate_during_load_drops_the_write_back(make_cache):
+    async def run():
+        redis, mongo = FakeRedis(), FakeMongo(PROFILE)
+        cache = make_cache(redis, mongo)
+
+        pending = asyncio.create_task(cache.get("u1", "p1"))
+        await _until(lambda: mongo.calls)
+        await cache.invalidate("u1", "p1")
+        mongo.profile = UPDATED
+        mongo.release.set()
+
+        # The caller that asked first still gets what was read
+        assert await pending == PROFILE
+        assert redis.saves == 0
+        assert "u1:p1" not in cache._local
+        assert not len(cache._generations)
+
+        # The next get loads the updated profile instead of a cached old one
+        assert await cache.get("u1", "p1") == UPDATED
+        assert redis.profile == UPDATED
+
+    asyncio.run(run())
+
+
+def test_invalidate_cancels_pending_refresh(make_cache):
+    async def run():
+        redis, mongo = FakeRedis(PROFILE, ttl=10), FakeMongo(PROFILE)
+        cache = make_cache(redis, mongo)
+
+        assert await cache.get("u1", "p1") == PROFILE
+        await _until(lambda: mongo.calls)
+        refresh = cache._refreshing["u1:p1"]
+
+        await cache.invalidate("u1", "p1")
+        mongo.release.set()
+        await asyncio.gather(refresh, return_exceptions=True)
+
+        assert refresh.cancelled()
+        assert redis.saves == 0
+        assert redis.profile is None
+        assert "u1:p1" not in cache._local
+
+    asyncio.run(run())
@@ -0,0 +1,55 @@
+from app.services import prompt_assembler as module
+from app.services.prompt_assembler import CHARS_PER_TOKEN, PromptAssembler
+from app.services.prompts import get_about_agent_prompt
+
+
+class Summary:
+    """Stand-in for SessionSummary: the fields and model_copy the assembler uses."""
+
+    def __init__(self, important_points, user_details):
+        self.important_points = important_points
+        self.user_details = user_details
+
+    def model_copy(self, update):
+        return Summary(update.get("important_points", self.important_points), update.get("user_details", self.user_details))
+
+    def __str__(self):
+        return f"important_points={self.important_points} user_details={self.user_details}"
+
+
+def render(history_str, session_summary, tool_text):
+    return get_about_agent_prompt(history_str, "You are Mira.", session_summary, "", tool_text)
+
+
+def record_sizes(monkeypatch):
+    recorded = {}
+    monkeypatch.setattr(
+        module.metrics_service, "record_prompt_size",
+        lambda step, total, sections, trimmed: recorded.update(total=total, sections=sections, trimmed=trimmed)
+    )
+    return recorded
+
+
+def test_summary_section_is_sized_from_the_rendered_text(monkeypatch):
+    recorded = record_sizes(monkeypatch)
+    summary = Summary(["Likes hiking"] * 5, ["Vegetarian"] * 5)
+
+    prompt = PromptAssembler().assemble("summarize", render, [{"role": "user", "content": "Who are you?"}], summary, "tools")
+
+    rendered = len(prompt) - len(render(module.format_history_for_prompt([{"role": "user", "content": "Who are you?"}]), None, "tools"))
+    assert recorded["sections"]["summary"] == rendered // CHARS_PER_TOKEN + 1
+    assert not recorded["trimmed"]
+
+
+def test_dropped_summary_renders_empty(monkeypatch):
+    recorded = record_sizes(monkeypatch)
+    summary = Summary(["x" * 2000], ["y" * 2000])
+    history = [{"role": "user", "content": "Who are you?"}]
+
+    base = PromptAssembler().assemble("summarize", render, history, None, "tools", budget=10_000)
+    prompt = PromptAssembler().assemble("summarize", render, history, summary, "tools", budget=len(base) // CHARS_PER_TOKEN + 50)
+
+    assert recorded["trimmed"]
+    assert recorded["sections"]["summary"] == 0
+    assert "None" not in prompt
+    assert prompt == base
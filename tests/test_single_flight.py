@@ -0,0 +1,117 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.utils.single_flight import LoadGenerations, SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def run():
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def search():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"docs": [1, 2]}
+
+        waiters = [asyncio.create_task(flight.do("q", search)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == 1
+        assert all(r == {"docs": [1, 2]} for r in results)
+        assert flight.get_stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+    asyncio.run(run())
+
+
+def test_waiters_share_the_error():
+    async def run():
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0)
+            raise ValueError("search failed")
+
+        results = await asyncio.gather(*(flight.do("q", failing) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.executions == 1
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_run():
+    async def run():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def search():
+            await release.wait()
+            return "result"
+
+        first = asyncio.create_task(flight.do("q", search))
+        second = asyncio.create_task(flight.do("q", search))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "result"
+        assert first.cancelled()
+
+    asyncio.run(run())
+
+
+def test_forget_starts_a_new_execution():
+    async def run():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        versions = iter(["old", "new"])
+
+        async def load():
+            value = next(versions)
+            await release.wait()
+            return value
+
+        stale = asyncio.create_task(flight.do("k", load))
+        await asyncio.sleep(0)
+        flight.forget("k")
+        fresh = asyncio.create_task(flight.do("k", load))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await stale == "old"
+        assert await fresh == "new"
+        assert flight.executions == 2
+
+    asyncio.run(run())
+
+
+def test_load_generations_only_track_running_loads():
+    generations = LoadGenerations()
+    generations.invalidate("k")
+
+    with generations.track("k") as generation:
+        generations.invalidate("k")
+        assert not generations.is_current("k", generation)
+        with generations.track("k") as newer:
+            assert generations.is_current("k", newer)
+
+    assert len(generations) == 0
+    with generations.track("k") as generation:
+        assert generation == 0
+
+
+def test_search_key_ignores_filter_order_and_empty_filters(import_app):
+    profiles = import_app("app.api.profiles")
+
+    def request(filters):
+        return SimpleNamespace(filters=filters, geo_filter=None, image_url=None, k=10, page=1)
+
+    key = profiles.search_query_key("u1", request({"gender": ["female", "other"], "hobby": ""}))
+
+    assert key == profiles.search_query_key("u1", request({"gender": ["other", "female"]}))
+    assert key != profiles.search_query_key("u2", request({"gender": ["other", "female"]}))
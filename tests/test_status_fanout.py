@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+
+class FakePubSub:
+    def __init__(self):
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def psubscribe(self, pattern):
+        pass
+
+    async def punsubscribe(self, pattern):
+        pass
+
+    async def close(self):
+        pass
+
+    async def listen(self):
+        while True:
+            message = await self.messages.get()
+            if message is None:
+                # Connection dropped
+                return
+            yield message
+
+    def publish(self, request_id: str, data: dict):
+        self.messages.put_nowait({"type": "pmessage", "channel": f"chat_status:{request_id}", "data": json.dumps(data)})
+
+
+class FakeRedis:
+    def __init__(self):
+        self.pubsubs = []
+        self.streams = {}
+        self.client = self
+
+    def pubsub(self):
+        self.pubsubs.append(FakePubSub())
+        return self.pubsubs[-1]
+
+    def add_event(self, request_id: str, data: dict) -> dict:
+        events = self.streams.setdefault(request_id, [])
+        event = {**data, "event_id": f"{len(events) + 1}-0"}
+        events.append(event)
+        return event
+
+    async def get_status_events(self, request_id, after_id=None):
+        after = int(after_id.split("-")[0]) if after_id else 0
+        return [e for e in self.streams.get(request_id, []) if int(e["event_id"].split("-")[0]) > after]
+
+
+@pytest.fixture
+def fanout(import_app, monkeypatch):
+    module = import_app("app.services.status_fanout")
+    redis = FakeRedis()
+    monkeypatch.setattr(module, "redis_service", redis)
+    service = module.StatusFanoutService(queue_size=10)
+    service.reconnect_delay = 0
+    return service, redis
+
+
+async def _get(queue: asyncio.Queue) -> dict:
+    return await asyncio.wait_for(queue.get(), timeout=1)
+
+
+def test_one_subscription_fans_out_per_request(fanout):
+    async def run():
+        service, redis = fanout
+        first = await service.subscribe("r1")
+        second = await service.subscribe("r1")
+        other = await service.subscribe("r2")
+
+        redis.pubsubs[0].publish("r1", redis.add_event("r1", {"status": "RECEIVED"}))
+
+        assert (await _get(first))["status"] == "RECEIVED"
+        assert (await _get(second))["status"] == "RECEIVED"
+        assert other.empty()
+        assert len(redis.pubsubs) == 1
+        await service.stop()
+
+    asyncio.run(run())
+
+
+def test_resubscribe_replays_events_published_during_the_gap(fanout):
+    async def run():
+        service, redis = fanout
+        queue = await service.subscribe("r1")
+
+        pubsub = redis.pubsubs[0]
+        pubsub.publish("r1", redis.add_event("r1", {"status": "RECEIVED"}))
+        assert (await _get(queue))["event_id"] == "1-0"
+
+        # Published while the connection is down: in the stream, never on pub/sub
+        pubsub.messages.put_nowait(None)
+        redis.add_event("r1", {"status": "LLM_SUMMARIZING"})
+        redis.add_event("r1", {"final_answer": "Hi"})
+
+        replayed = [await _get(queue), await _get(queue)]
+        assert [e["event_id"] for e in replayed] == ["2-0", "3-0"]
+        assert replayed[-1]["final_answer"] == "Hi"
+        assert service.reconnects == 1
+        assert service.messages_replayed == 2
+        await service.stop()
+
+    asyncio.run(run())
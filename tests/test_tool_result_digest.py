@@ -0,0 +1,42 @@
+import json
+
+from app.utils.tool_result_digest import MAX_ATTRIBUTE_CHARS, MAX_RECOMMENDATIONS, digest_tool_result
+
+
+def recommendation(i: int) -> dict:
+    return {
+        "id": f"trad_f_{i}",
+        "name": f"Look {i}",
+        "image_url": f"https://example.invalid/{i}.jpg",
+        "image_attributes": {"attire": "traditional", "hair_length": "long", "emotion": "x" * 100},
+    }
+
+
+def test_recommendations_keep_bounded_attributes():
+    result = {"recommendation": True, "docs": [recommendation(i) for i in range(3)], "instruction": "Describe them"}
+
+    digest = json.loads(digest_tool_result(result))
+
+    first = digest["recommendations"][0]
+    assert first["name"] == "Look 0"
+    assert first["image_attributes"]["attire"] == "traditional"
+    assert len(first["image_attributes"]["emotion"]) == MAX_ATTRIBUTE_CHARS
+    assert "image_url" not in first
+    assert digest["instruction"] == "Describe them"
+
+
+def test_recommendations_are_capped():
+    result = {"recommendation": True, "docs": [recommendation(i) for i in range(MAX_RECOMMENDATIONS + 3)]}
+
+    digest = json.loads(digest_tool_result(result))
+
+    assert len(digest["recommendations"]) == MAX_RECOMMENDATIONS
+    assert digest["recommendations_omitted"] == 3
+
+
+def test_search_docs_are_reduced_to_counts():
+    result = {"count": 40, "docs": [{"name": "A", "bio": "long text"}] * 5}
+
+    digest = json.loads(digest_tool_result(result, {"user_id": "1", "gender": "female", "page": 2}))
+
+    assert digest == {"count": 40, "returned": 5, "applied_filters": {"gender": "female"}}